@@ -0,0 +1,54 @@
+import argparse
+import time
+import numpy as np
+import my_assignment_1
+
+# Above this size the per-point loop takes minutes, so it is skipped
+LOOP_MAX_POINTS = 100000
+
+def time_call(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def rotate3D_loop(thetas, axis_of_rotation, p_points):
+    return [my_assignment_1.rotate3D(theta, axis_of_rotation, p_point) for theta, p_point in zip(thetas, p_points)]
+
+def benchmark_batch_rotation(sizes):
+    print("Per-point loop vs batch rotate3D (one angle per point, axis 'z'):")
+    print(f"{'points':>10} {'loop (s)':>12} {'batch (s)':>12} {'speedup':>10}")
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        thetas = rng.uniform(-np.pi, np.pi, n)
+        p_points = rng.normal(size=(n, 3))
+        batch_time = time_call(my_assignment_1.rotate3D, thetas, 'z', p_points)
+        if n <= LOOP_MAX_POINTS:
+            loop_time = time_call(rotate3D_loop, thetas, 'z', p_points)
+            print(f"{n:>10d} {loop_time:>12.4f} {batch_time:>12.4f} {loop_time / batch_time:>9.0f}x")
+        else:
+            print(f"{n:>10d} {'skipped':>12} {batch_time:>12.4f} {'-':>10}")
+
+def rotate3D_many_times_per_step(rotation_list, p_point):
+    q_point = p_point
+    for theta, axis_of_rotation in rotation_list:
+        q_point = my_assignment_1.rotate3D(theta, axis_of_rotation, q_point)
+    return q_point
+
+def benchmark_rotation_chain(num_queries=10000, chain_length=10):
+    print(f"Re-rotating per step vs compiled chain ({num_queries} single-point queries, {chain_length} rotations):")
+    rng = np.random.default_rng(0)
+    rotation_list = [[theta, axis] for theta, axis in zip(rng.uniform(-np.pi, np.pi, chain_length), "xyz" * chain_length)]
+    p_points = rng.normal(size=(num_queries, 3))
+    per_step_time = time_call(lambda: [rotate3D_many_times_per_step(rotation_list, p) for p in p_points])
+    chain_time = time_call(lambda: [my_assignment_1.rotate3D_many_times(rotation_list, p) for p in p_points])
+    batch_time = time_call(my_assignment_1.rotate3D_many_times, rotation_list, p_points)
+    print(f"  per step: {per_step_time:.4f} s, compiled chain: {chain_time:.4f} s, compiled chain batch: {batch_time:.4f} s")
+
+
+######################### MAIN ##########################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for assignment 1")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6, 10**7])
+    args = parser.parse_args()
+    benchmark_batch_rotation(args.sizes)
+    benchmark_rotation_chain()
@@ -0,0 +1,73 @@
+import math
+import numpy as np
+import my_assignment_1
+
+TOLERANCE  = 0.001
+
+def unit_test(test_number, q_points, q_points_des):
+    error = np.max(np.linalg.norm(q_points - q_points_des, axis=-1))
+    if q_points.shape == q_points_des.shape and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output shape ", q_points.shape)
+    return False
+
+def rotate2D_loop(thetas, p_points):
+    return np.array([my_assignment_1.rotate2D(theta, p_point) for theta, p_point in zip(thetas, p_points)])
+
+def rotate3D_loop(thetas, axis_of_rotation, p_points):
+    return np.array([my_assignment_1.rotate3D(theta, axis_of_rotation, p_point) for theta, p_point in zip(thetas, p_points)])
+
+def rotate3D_many_times_loop(rotation_list, p_points):
+    q_points = []
+    for p_point in p_points:
+        q_point = p_point
+        for theta, axis_of_rotation in rotation_list:
+            q_point = my_assignment_1.rotate3D(theta, axis_of_rotation, q_point)
+        q_points.append(q_point)
+    return np.array(q_points)
+
+rng = np.random.default_rng(0)
+thetas = rng.uniform(-2*math.pi, 2*math.pi, 50)
+points_2d = rng.normal(size=(50, 2))
+points_3d = rng.normal(size=(50, 3))
+rotation_list = [[0.3, 'z'], [-1.2, 'x'], [2.5, 'y'], [math.pi/2, 'z']]
+
+# format is q_points from the batch path, q_points expected
+test_input_output_list = [
+# one angle, many points
+[my_assignment_1.rotate2D(math.pi/2, np.array([[1,0], [0,1], [2,0]])), np.array([[0,1], [-1,0], [0,2]])],
+# many angles, one point
+[my_assignment_1.rotate2D(np.array([0, math.pi/2, -math.pi]), np.array([1,0])), np.array([[1,0], [0,1], [-1,0]])],
+# one angle per point
+[my_assignment_1.rotate2D(thetas, points_2d), rotate2D_loop(thetas, points_2d)],
+[my_assignment_1.rotate3D(math.pi/2, 'z', np.array([[1,0,0], [0,1,0]])), np.array([[0,1,0], [-1,0,0]])],
+[my_assignment_1.rotate3D(np.array([math.pi/2, -math.pi/2]), 'y', np.array([1,0,0])), np.array([[0,0,-1], [0,0,1]])],
+[my_assignment_1.rotate3D(thetas, 'x', points_3d), rotate3D_loop(thetas, 'x', points_3d)],
+[my_assignment_1.rotate3D(thetas, 'y', points_3d), rotate3D_loop(thetas, 'y', points_3d)],
+[my_assignment_1.rotate3D(thetas, 'z', points_3d), rotate3D_loop(thetas, 'z', points_3d)],
+# compiled rotation chains
+[my_assignment_1.rotate3D_many_times(rotation_list, points_3d), rotate3D_many_times_loop(rotation_list, points_3d)],
+[my_assignment_1.compile_rotation_chain(rotation_list).apply(points_3d[0]), rotate3D_many_times_loop(rotation_list, points_3d[:1])[0]],
+[my_assignment_1.rotate3D_many_times([], points_3d), points_3d],
+# cached chains are shared between lookups, so they must be read-only
+[np.array([float(my_assignment_1.compile_rotation_chain(rotation_list).matrix.flags.writeable)]), np.array([0.0])],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for assignment 1 batch rotations:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    q_points = row[0]
+    q_points_des = row[1]
+    if unit_test(test_number, q_points, q_points_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
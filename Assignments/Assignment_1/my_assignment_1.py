@@ -1,38 +1,73 @@
+import functools
 import numpy as np
 
 # q2 part a
+# theta may be a scalar or an array of angles and p_point a single point (2,)
+# or a point cloud (N, 2); they broadcast against each other, so one call
+# rotates a whole cloud without building a matrix per point.
 def rotate2D(theta, p_point):
-    R = np.array([[np.cos(theta), -np.sin(theta)],
-                  [np.sin(theta),  np.cos(theta)]])
-    q_point = np.matmul(R, p_point)
+    c = np.cos(theta)
+    s = np.sin(theta)
+    p_point = np.asarray(p_point)
+    x = p_point[..., 0]
+    y = p_point[..., 1]
+    q_point = np.stack([c * x - s * y,
+                        s * x + c * y], axis=-1)
     return q_point
 
 # q2 part b
+# Same broadcasting rules as rotate2D, with (N, 3) point clouds.
 def rotate3D(theta, axis_of_rotation, p_point):
     c = np.cos(theta)
     s = np.sin(theta)
+    p_point = np.asarray(p_point)
+    x = p_point[..., 0]
+    y = p_point[..., 1]
+    z = p_point[..., 2]
 
     if axis_of_rotation == 'z':
-        R = np.array([[ c, -s,  0],
-                      [ s,  c,  0],
-                      [ 0,  0,  1]])
+        x, y = c * x - s * y, s * x + c * y
     elif axis_of_rotation == 'y':
-        R = np.array([[ c,  0,  s],
-                      [ 0,  1,  0],
-                      [-s,  0,  c]])
+        x, z = c * x + s * z, -s * x + c * z
     elif axis_of_rotation == 'x':
-        R = np.array([[ 1,  0,  0],
-                      [ 0,  c, -s],
-                      [ 0,  s,  c]])
+        y, z = c * y - s * z, s * y + c * z
+    else:
+        raise ValueError(f"axis_of_rotation must be 'x', 'y' or 'z', got {axis_of_rotation!r}")
 
-    q_point = np.matmul(R, p_point)
+    x, y, z = np.broadcast_arrays(x, y, z)
+    q_point = np.stack([x, y, z], axis=-1)
     return q_point
 
 # q2 part c
+# The chain is compiled once into a single 3x3 matrix (see RotationChain), so
+# repeated queries against the same rotation_list cost one matmul.
 def rotate3D_many_times(rotation_list, p_point):
-    q_point = p_point
-    for rotation in rotation_list:
-        theta = rotation[0]
-        axis = rotation[1]
-        q_point = rotate3D(theta, axis, q_point)
-    return q_point
\ No newline at end of file
+    return compile_rotation_chain(rotation_list).apply(p_point)
+
+class RotationChain:
+    """A list of [theta, axis] rotations pre-multiplied into one 3x3 matrix."""
+
+    def __init__(self, rotation_list):
+        # Rotating the basis vectors through the chain gives the rows of the
+        # transposed chain matrix
+        basis = np.eye(3)
+        for rotation in rotation_list:
+            theta = rotation[0]
+            axis = rotation[1]
+            basis = rotate3D(theta, axis, basis)
+        self.matrix = basis.T
+        # Shared by every lookup of the same chain through the cache
+        self.matrix.flags.writeable = False
+
+    def apply(self, p_point):
+        """Rotate a single point (3,) or a point cloud (N, 3)."""
+        return np.asarray(p_point) @ self.matrix.T
+
+@functools.lru_cache(maxsize=128)
+def _compile_rotation_chain(rotation_key):
+    return RotationChain(rotation_key)
+
+def compile_rotation_chain(rotation_list):
+    """Return the (cached) RotationChain for rotation_list."""
+    rotation_key = tuple((float(rotation[0]), rotation[1]) for rotation in rotation_list)
+    return _compile_rotation_chain(rotation_key)
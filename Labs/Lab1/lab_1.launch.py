@@ -1,7 +1,8 @@
 from launch import LaunchDescription
-from launch.actions import RegisterEventHandler
+from launch.actions import DeclareLaunchArgument, ExecuteProcess, RegisterEventHandler
+from launch.conditions import IfCondition, UnlessCondition
 from launch.event_handlers import OnProcessExit
-from launch.substitutions import Command, FindExecutable, PathJoinSubstitution
+from launch.substitutions import Command, FindExecutable, LaunchConfiguration, PathJoinSubstitution
 
 from launch_ros.actions import Node
 from launch_ros.substitutions import FindPackageShare
@@ -9,6 +10,13 @@ import os
 
 
 def generate_launch_description():
+    # all_joints:=true loads the 12-joint effort / kp / kd controllers instead
+    # of the two single-joint ones, and is passed on to lab_1.py (started
+    # with control_node:=true) as its all_joints parameter
+    all_joints = LaunchConfiguration("all_joints")
+    all_joints_arg = DeclareLaunchArgument("all_joints", default_value="false", description="control all 12 joints")
+    control_node_arg = DeclareLaunchArgument("control_node", default_value="false", description="start the lab_1.py control node")
+
     # Get URDF via xacro
     robot_description_content = Command(
         [
@@ -94,27 +102,62 @@ def generate_launch_description():
         ],
     )
 
+    all_joints_controller_spawner = Node(
+        package="controller_manager",
+        executable="spawner",
+        arguments=[
+            "forward_effort_controller",
+            "forward_kp_controller",
+            "forward_kd_controller",
+            "--controller-manager",
+            "/controller_manager",
+            "--controller-manager-timeout",
+            "30",
+        ],
+    )
+
     # Delay start of robot_controller after `joint_state_broadcaster`
     delay_robot_controller_spawner_after_joint_state_broadcaster_spawner = RegisterEventHandler(
         event_handler=OnProcessExit(
             target_action=joint_state_broadcaster_spawner,
             on_exit=[robot_controller_spawner],
-        )
+        ),
+        condition=UnlessCondition(all_joints),
     )
     delay_robot_controller_spawner_after_joint_state_broadcaster_spawner_lead = RegisterEventHandler(
         event_handler=OnProcessExit(
             target_action=joint_state_broadcaster_spawner,
             on_exit=[robot_controller_spawner_lead],
-        )
+        ),
+        condition=UnlessCondition(all_joints),
+    )
+    delay_all_joints_controller_spawner_after_joint_state_broadcaster_spawner = RegisterEventHandler(
+        event_handler=OnProcessExit(
+            target_action=joint_state_broadcaster_spawner,
+            on_exit=[all_joints_controller_spawner],
+        ),
+        condition=IfCondition(all_joints),
+    )
+
+    # Run from this directory, where lab_1.py writes its timing file
+    lab_1_node = ExecuteProcess(
+        cmd=["python3", "lab_1.py", "--ros-args", "-p", ["all_joints:=", all_joints]],
+        cwd=os.path.dirname(__file__),
+        output="both",
+        condition=IfCondition(LaunchConfiguration("control_node")),
     )
 
     nodes = [
+        all_joints_arg,
+        control_node_arg,
         control_node,
         robot_state_pub_node,
         joint_state_broadcaster_spawner,
         imu_sensor_broadcaster_spawner,
         delay_robot_controller_spawner_after_joint_state_broadcaster_spawner,
         delay_robot_controller_spawner_after_joint_state_broadcaster_spawner_lead,
+        delay_all_joints_controller_spawner_after_joint_state_broadcaster_spawner,
+        lab_1_node,
     ]
 
     return LaunchDescription(nodes)
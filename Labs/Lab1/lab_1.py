@@ -1,14 +1,28 @@
 import rclpy
+from rclpy.executors import ExternalShutdownException
 from rclpy.node import Node
+from rclpy.time import Time
 from sensor_msgs.msg import JointState
 from std_msgs.msg import Float64MultiArray
 import numpy as np
+import os
+import sys
 import time
 from collections import deque
 import signal
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from lab_common.instrumentation import LatencyRecorder, LoopTimingMonitor
+from lab_common.joint_state_index import JointIndexCache
+from lab_common.stats_logger import ThrottledStatsLogger
+from lab_1_control import (
+    MAX_TORQUE, DEAD_BAND_SIZE, JOINT_NAMES, apply_dead_band, follower_gains, follower_targets, make_leg_tracking_pid,
+)
+
 JOINT_NAME = "leg_front_l_3" 
 JOINT_NAME_LEAD = "leg_front_r_3" 
+# Position of JOINT_NAME in the 12-joint arrays
+JOINT_INDEX = JOINT_NAMES.index(JOINT_NAME)
 
 ####
 ####
@@ -19,8 +33,8 @@ KD = 0.1  # YOUR KD VALUE
 ####
 LOOP_RATE = 200  # Hz
 DELTA_T = 1 / LOOP_RATE
-MAX_TORQUE = 2.0
-DEAD_BAND_SIZE = 0.095
+# Control loop timing histograms are written here when the node stops
+TIMING_FILENAME = "lab_1_timing.npz"
 PENDULUM_CONTROL = False
 LEG_TRACKING_CONTROL = not PENDULUM_CONTROL
 
@@ -39,7 +53,6 @@ class JointStateSubscriber(Node):
         # Publisher to the /forward_command_controller/commands topic
         self.command_publisher = self.create_publisher(Float64MultiArray, "/forward_command_controller/commands", 10)
         self.command_publisher_lead = self.create_publisher(Float64MultiArray, "/forward_command_controller_lead/commands", 10)
-        self.print_counter = 0
         self.calculated_torque = 0
         self.joint_pos = 0
         self.joint_vel = 0
@@ -48,15 +61,39 @@ class JointStateSubscriber(Node):
         self.target_joint_pos = 0
         self.target_joint_vel = 0
         # self.torque_history = deque(maxlen=DELAY)
-        self.last_joint_error = 0.0
-        self.sum_joint_error = 0.0
+        # KI is per tick at LOOP_RATE; the controller integrates over seconds
+        self.pid = make_leg_tracking_pid(KP, KI, KD, LOOP_RATE)
+        # Joint name -> index in JointState, resolved once per name list
+        self.joint_index_cache = JointIndexCache([JOINT_NAME, JOINT_NAME_LEAD])
+        # all_joints:=true tracks all 12 joints at once (each left-leg joint
+        # mirrors its right-leg joint) through forward_effort_controller,
+        # which lab_1.launch.py loads for the same argument
+        self.all_joints = self.declare_parameter("all_joints", False).value
+        if self.all_joints:
+            # One PID over arrays of 12 gains and states; the lead joints get zero gains
+            self.joint_positions = np.zeros(len(JOINT_NAMES))
+            self.joint_velocities = np.zeros(len(JOINT_NAMES))
+            self.all_joints_index_cache = JointIndexCache(JOINT_NAMES)
+            self.all_joints_pid = make_leg_tracking_pid(follower_gains(KP), follower_gains(KI), follower_gains(KD), LOOP_RATE)
+            self.effort_publisher = self.create_publisher(Float64MultiArray, "/forward_effort_controller/commands", 10)
+            self.kp_publisher = self.create_publisher(Float64MultiArray, "/forward_kp_controller/commands", 10)
+            self.kd_publisher = self.create_publisher(Float64MultiArray, "/forward_kd_controller/commands", 10)
+            # Periodically set the position gains to 0 so only the effort commands act
+            self.create_timer(0.1, self.publish_zero_gains)
+        self.joint_info_latency = LatencyRecorder("get_joint_info")
+        # Header stamp of the last JointState, to measure how old it is when acted on
+        self.joint_state_stamp = None
+        self.loop_timing = LoopTimingMonitor("control_loop")
+        self.create_timer(5.0, self.report_callback_latency)
+        # Position / torque summaries are formatted and printed off the control thread
+        self.stats_logger = ThrottledStatsLogger("control_loop", ["pos", "target_pos", "torque"], emit=self.get_logger().info)
 
         # Create a timer to run control_loop at the specified frequency
         self.create_timer(1.0 / LOOP_RATE, self.control_loop)
 
     def get_target_joint_info(self):
         target_joint_pos = -self.joint_pos_lead
-        target_joint_vel = 0
+        target_joint_vel = -self.joint_vel_lead
         
         return target_joint_pos, target_joint_vel
 
@@ -72,60 +109,58 @@ class JointStateSubscriber(Node):
     def calculate_torque_for_leg_tracking(self, joint_pos, joint_vel, target_joint_pos, target_joint_vel):
         ####
         #### YOUR CODE HERE
-        # P: proportional error
-        error = target_joint_pos - joint_pos
-
-        # D: derivative of error
-        error_derivative = (error - self.last_joint_error) / DELTA_T
-        self.last_joint_error = error
-
-        # I: integral of error (with anti-windup)
-        self.sum_joint_error += error
-        self.sum_joint_error = np.clip(self.sum_joint_error, -0.3, 0.3)
+        # PID torque on the measured time step; the filtered derivative term
+        # damps joint_pos against the target velocity instead of differentiating the target
+        torque = self.pid.update(target_joint_pos, joint_pos, setpoint_rate=target_joint_vel)
 
-        # PID torque
-        torque = KP * error + KD * error_derivative + KI * self.sum_joint_error
-
-
-        # Leave this code unchanged
-        if torque > 0:
-            torque = max(torque, DEAD_BAND_SIZE)
-        elif torque < 0:
-            torque = min(torque, -DEAD_BAND_SIZE)
+        # Dead band compensation, applied by apply_dead_band (lab_1_control.py)
+        torque = apply_dead_band(torque, DEAD_BAND_SIZE)
         
         return torque
 
+    def calculate_torques_for_all_joints(self, joint_positions, joint_velocities):
+        """Torques (12,) for every joint in JOINT_NAMES order, in one pass of array operations"""
+        target_positions, target_velocities = follower_targets(joint_positions, joint_velocities)
+        self.target_joint_pos = target_positions[JOINT_INDEX]
+        self.joint_pos = joint_positions[JOINT_INDEX]
+        torques = self.all_joints_pid.update(target_positions, joint_positions, setpoint_rate=target_velocities)
+        return apply_dead_band(torques, DEAD_BAND_SIZE)
+
     def print_info(self):
-        """Print joint information every 2 control loops"""
-     
-            
-        if self.print_counter == 0:
-            self.get_logger().info(
-                f"Pos: {self.joint_pos:.2f}, Target Pos: {self.target_joint_pos:.2f}, Tor: {self.calculated_torque:.2f}"
-            )
-        self.print_counter += 1
-        self.print_counter %= 2
+        """Record joint information; a summary is printed once a second"""
+        self.stats_logger.record(self.joint_pos, self.target_joint_pos, self.calculated_torque)
 
     def get_joint_info(self, msg):
         """Callback function to process incoming JointState messages"""
-        joint_index = msg.name.index(JOINT_NAME)
-        joint_pos = msg.position[joint_index]
-        joint_vel = msg.velocity[joint_index]
-
-        joint_index_lead = msg.name.index(JOINT_NAME_LEAD)
-        joint_pos_lead = msg.position[joint_index_lead]
-        joint_vel_lead = msg.velocity[joint_index_lead]
+        start = time.perf_counter()
+        self.joint_index_cache.update(msg.name)
+        joint_pos, joint_pos_lead = self.joint_index_cache.select(msg.position)
+        joint_vel, joint_vel_lead = self.joint_index_cache.select(msg.velocity)
         
         self.joint_pos = joint_pos
         self.joint_vel = joint_vel        
         self.joint_pos_lead = joint_pos_lead
         self.joint_vel_lead = joint_vel_lead
+        if self.all_joints:
+            self.all_joints_index_cache.update(msg.name)
+            self.joint_positions = self.all_joints_index_cache.select(msg.position)
+            self.joint_velocities = self.all_joints_index_cache.select(msg.velocity)
+        self.joint_state_stamp = msg.header.stamp
+        self.joint_info_latency.record(time.perf_counter() - start)
 
         return joint_pos, joint_vel, joint_pos_lead, joint_vel_lead
 
+    def report_callback_latency(self):
+        self.get_logger().info(self.joint_info_latency.summary())
+        self.get_logger().info(self.loop_timing.summary())
+
     def control_loop(self):
         """Control control loop to calculate and publish torque commands"""
-        if PENDULUM_CONTROL:
+        tick_start = self.loop_timing.start_tick()
+        if self.all_joints:
+            torques = self.calculate_torques_for_all_joints(self.joint_positions, self.joint_velocities)
+            self.calculated_torque = torques[JOINT_INDEX]
+        elif PENDULUM_CONTROL:
             self.calculated_torque = self.calculate_torque_for_pendulum_control(self.joint_pos)
         elif LEG_TRACKING_CONTROL: 
             self.target_joint_pos, self.target_joint_vel = self.get_target_joint_info()
@@ -134,7 +169,15 @@ class JointStateSubscriber(Node):
             self.calculated_torque = 0
             
         self.print_info()
-        self.publish_torque(self.calculated_torque)
+        if self.all_joints:
+            self.publish_joint_torques(torques)
+        else:
+            self.publish_torque(self.calculated_torque)
+        sensor_age = None
+        if self.joint_state_stamp is not None:
+            # On the node clock, so the age includes the time before get_joint_info ran
+            sensor_age = (self.get_clock().now() - Time.from_msg(self.joint_state_stamp)).nanoseconds * 1e-9
+        self.loop_timing.end_tick(tick_start, sensor_age)
 
     def publish_torque(self, torque=0.0):
         # Create a Float64MultiArray message with zero kp and kd values
@@ -149,6 +192,15 @@ class JointStateSubscriber(Node):
         self.command_publisher.publish(command_msg)
         self.command_publisher_lead.publish(command_msg_lead)
 
+    def publish_joint_torques(self, torques):
+        # All 12 efforts in one message, in JOINT_NAMES order
+        torques = np.clip(torques, -MAX_TORQUE, MAX_TORQUE)
+        self.effort_publisher.publish(Float64MultiArray(data=torques.tolist()))
+
+    def publish_zero_gains(self):
+        self.kp_publisher.publish(Float64MultiArray(data=[0.0] * len(JOINT_NAMES)))
+        self.kd_publisher.publish(Float64MultiArray(data=[0.0] * len(JOINT_NAMES)))
+
 
 def main(args=None):
     rclpy.init(args=args)
@@ -160,13 +212,24 @@ def main(args=None):
     def _handle_sigint(sig, frame):
         joint_state_subscriber.get_logger().info("SIGINT received: sending zero torque and shutting down...")
         joint_state_subscriber.publish_torque(0.0)
+        if joint_state_subscriber.all_joints:
+            joint_state_subscriber.publish_joint_torques(np.zeros(len(JOINT_NAMES)))
         time.sleep(0.1) 
         joint_state_subscriber.publish_torque(0.0)
+        if joint_state_subscriber.all_joints:
+            joint_state_subscriber.publish_joint_torques(np.zeros(len(JOINT_NAMES)))
         rclpy.shutdown()
 
     signal.signal(signal.SIGINT, _handle_sigint)
 
-    rclpy.spin(joint_state_subscriber)
+    try:
+        rclpy.spin(joint_state_subscriber)
+    except ExternalShutdownException:
+        pass
+    finally:
+        # However the node stops, keep the timing of the run
+        joint_state_subscriber.stats_logger.close()
+        joint_state_subscriber.loop_timing.save(TIMING_FILENAME)
   
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+import argparse
+import timeit
+import numpy as np
+from lab_1_control import (
+    INTEGRAL_LIMIT, JOINT_NAMES, PIDController, apply_dead_band, follower_gains, follower_targets, make_leg_tracking_pid,
+)
+from lab_1_sim import rms_tracking_error, rms_torque_step, simulate_tracking
+
+# Defaults match lab_1.py
+LOOP_RATE = 200
+DELTA_T = 1 / LOOP_RATE
+KP = 0.1
+KI = 0.1
+KD = 0.1
+
+class FixedStepPID:
+    """The previous lab_1.py controller: assumes every tick is DELTA_T apart."""
+
+    def __init__(self, kp, ki, kd):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.last_error = 0.0
+        self.sum_error = 0.0
+
+    def update(self, setpoint, measurement, now=None, setpoint_rate=0.0):
+        error = setpoint - measurement
+        error_derivative = (error - self.last_error) / DELTA_T
+        self.last_error = error
+        self.sum_error = np.clip(self.sum_error + error, -INTEGRAL_LIMIT, INTEGRAL_LIMIT)
+        return self.kp * error + self.kd * error_derivative + self.ki * self.sum_error
+
+def make_controllers(kp, ki, kd):
+    """Label -> factory of each controller compared by the benchmark."""
+    return {
+        "fixed DELTA_T": lambda: FixedStepPID(kp, ki, kd),
+        "measured dt": lambda: PIDController(kp, ki / DELTA_T, kd, integral_limit=INTEGRAL_LIMIT * DELTA_T, derivative_on_measurement=False),
+        "measured dt + filtered D(meas)": lambda: make_leg_tracking_pid(kp, ki, kd, LOOP_RATE),
+    }
+
+def benchmark_jitter(jitters, kp=KP, ki=KI, kd=KD, num_seeds=3, duration=5.0):
+    print(f"Leg tracking vs timer jitter (kp={kp}, ki={ki}, kd={kd}, {num_seeds} seeds of {duration} s):")
+    print(f"  {'controller':<32} {'jitter':>8} {'rms error':>10} {'torque step':>12}")
+    for label, make_controller in make_controllers(kp, ki, kd).items():
+        for jitter in jitters:
+            results = [simulate_tracking(make_controller(), duration=duration, loop_rate=LOOP_RATE, jitter=jitter, seed=seed) for seed in range(num_seeds)]
+            error = np.mean([rms_tracking_error(result) for result in results])
+            torque_step = np.mean([rms_torque_step(result) for result in results])
+            print(f"  {label:<32} {jitter * 1e3:>6.1f}ms {error:>10.4f} {torque_step:>12.4f}")
+
+
+def benchmark_multi_joint(number=20000):
+    print(f"PID cost per control tick ({number} ticks):")
+    rng = np.random.default_rng(0)
+    joint_positions = rng.uniform(-1, 1, len(JOINT_NAMES))
+    joint_velocities = rng.uniform(-1, 1, len(JOINT_NAMES))
+    clock = iter(DELTA_T * np.arange(1, 4 * number + 10)).__next__
+
+    single = make_leg_tracking_pid(KP, KI, KD, LOOP_RATE)
+    single.clock = clock
+    def single_tick():
+        apply_dead_band(single.update(-joint_positions[0], joint_positions[3], setpoint_rate=-joint_velocities[0]))
+
+    per_joint = [make_leg_tracking_pid(KP, KI, KD, LOOP_RATE) for _ in JOINT_NAMES]
+    def per_joint_tick():
+        now = clock()
+        target_positions, target_velocities = follower_targets(joint_positions, joint_velocities)
+        for joint, pid in enumerate(per_joint):
+            apply_dead_band(pid.update(target_positions[joint], joint_positions[joint], now, target_velocities[joint]))
+
+    vectorized = make_leg_tracking_pid(follower_gains(KP), follower_gains(KI), follower_gains(KD), LOOP_RATE)
+    vectorized.clock = clock
+    def vectorized_tick():
+        target_positions, target_velocities = follower_targets(joint_positions, joint_velocities)
+        apply_dead_band(vectorized.update(target_positions, joint_positions, setpoint_rate=target_velocities))
+
+    for label, tick in [("1 joint", single_tick), ("12 joints, one PID each", per_joint_tick), ("12 joints, vectorized PID", vectorized_tick)]:
+        seconds = timeit.timeit(tick, number=number)
+        print(f"  {label:<32} {seconds / number * 1e6:>10.2f} us/tick")
+
+# Name -> function of the parsed command line arguments
+BENCHMARKS = {
+    "jitter": lambda args: benchmark_jitter(args.jitter, args.kp, args.ki, args.kd, args.seeds),
+    "multi_joint": lambda args: benchmark_multi_joint(),
+}
+
+
+######################### MAIN ##########################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for lab 1")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark", help=f"any of {sorted(BENCHMARKS)} (default: all)")
+    parser.add_argument("--jitter", type=float, nargs="+", default=[0.0, 0.001, 0.002, 0.005], help="std of tick lateness (s)")
+    parser.add_argument("--kp", type=float, default=KP)
+    parser.add_argument("--ki", type=float, default=KI, help="per tick, as in lab_1.py")
+    parser.add_argument("--kd", type=float, default=KD)
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {sorted(unknown)}")
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        BENCHMARKS[name](args)
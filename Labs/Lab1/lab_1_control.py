@@ -0,0 +1,120 @@
+import time
+import numpy as np
+
+# Torque limits of the joint motors (N m)
+MAX_TORQUE = 2.0
+DEAD_BAND_SIZE = 0.095
+# Leg tracking PID settings: anti-windup bound on the per-tick error sum and
+# time constant (s) of the low-pass filter on the derivative term
+INTEGRAL_LIMIT = 0.3
+DERIVATIVE_FILTER_TAU = 0.01
+
+# The 12 Pupper joints in joint_state_broadcaster order (see lab_1.yaml)
+LEG_NAMES = ["leg_front_r", "leg_front_l", "leg_back_r", "leg_back_l"]
+JOINT_NAMES = [f"{leg_name}_{joint}" for leg_name in LEG_NAMES for joint in (1, 2, 3)]
+# Each left-leg joint follows the matching right-leg joint, mirrored; the
+# right legs lead and are not actuated
+LEAD_JOINT_INDEX = np.array([JOINT_NAMES.index(name.replace("_l_", "_r_")) for name in JOINT_NAMES])
+FOLLOWER_JOINTS = np.array([name != JOINT_NAMES[lead] for name, lead in zip(JOINT_NAMES, LEAD_JOINT_INDEX)])
+MIRROR_SIGN = -1.0
+
+
+class PIDController:
+    """
+    PID controller driven by measured time steps.
+
+    Every update() measures dt on a monotonic clock (or takes the time it is
+    given, e.g. from a simulation), so a late tick integrates and
+    differentiates over the time that actually passed instead of a nominal
+    period. The derivative acts on the measurement rather than the error,
+    so steps in the setpoint do not kick the output; when the setpoint
+    moves, pass its known rate (e.g. the lead leg's velocity) as
+    setpoint_rate. The derivative is smoothed by a first-order low-pass
+    filter with time constant derivative_filter_tau (seconds, 0 disables
+    the filter).
+
+    Gains are in SI units: ki multiplies the integral of the error over
+    time in seconds, and integral_limit bounds that integral (anti-windup).
+
+    Gains, setpoints and measurements may also be NumPy arrays, e.g. one
+    entry per joint, in which case every joint is updated in the same few
+    array operations.
+    """
+
+    def __init__(self, kp, ki, kd, derivative_filter_tau=0.0, integral_limit=np.inf, derivative_on_measurement=True, clock=time.monotonic):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.derivative_filter_tau = derivative_filter_tau
+        self.integral_limit = integral_limit
+        self.derivative_on_measurement = derivative_on_measurement
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """Forget the integral, the derivative filter and the last sample."""
+        self.integral = 0.0
+        self.derivative = 0.0
+        self.last_time = None
+        self.last_error = None
+        self.last_measurement = None
+
+    def update(self, setpoint, measurement, now=None, setpoint_rate=0.0):
+        """Return the control output for one sample; now defaults to clock()."""
+        if now is None:
+            now = self.clock()
+        error = setpoint - measurement
+        if self.last_time is not None and now > self.last_time:
+            dt = now - self.last_time
+            # minimum / maximum rather than np.clip, which is slow on scalars
+            self.integral = np.minimum(np.maximum(self.integral + error * dt, -self.integral_limit), self.integral_limit)
+            if self.derivative_on_measurement:
+                raw_derivative = setpoint_rate - (measurement - self.last_measurement) / dt
+            else:
+                raw_derivative = (error - self.last_error) / dt
+            # First-order low-pass; alpha = 1 (no filtering) when tau = 0
+            alpha = dt / (self.derivative_filter_tau + dt)
+            self.derivative += alpha * (raw_derivative - self.derivative)
+        self.last_time = now
+        self.last_error = error
+        self.last_measurement = measurement
+        return self.kp * error + self.ki * self.integral + self.kd * self.derivative
+
+
+def make_leg_tracking_pid(kp, ki, kd, loop_rate, derivative_filter_tau=DERIVATIVE_FILTER_TAU, integral_limit=INTEGRAL_LIMIT):
+    """
+    PIDController for lab_1.py style gains.
+
+    ki and integral_limit are per control tick at loop_rate, as with a
+    per-tick error sum; they are converted to the controller's seconds.
+    Gains may be per-joint arrays (see follower_gains).
+    """
+    delta_t = 1.0 / loop_rate
+    return PIDController(
+        kp, np.asarray(ki) / delta_t, kd,
+        derivative_filter_tau=derivative_filter_tau,
+        integral_limit=integral_limit * delta_t,
+    )
+
+
+def apply_dead_band(torque, dead_band_size=DEAD_BAND_SIZE):
+    """Push non-zero torques (a scalar or an array) out of the motor's dead band, keeping their sign."""
+    if np.ndim(torque) == 0:
+        if torque > 0:
+            return max(torque, dead_band_size)
+        if torque < 0:
+            return min(torque, -dead_band_size)
+        return torque
+    torque = np.asarray(torque, dtype=float)
+    pushed = np.where(torque != 0, np.copysign(np.maximum(np.abs(torque), dead_band_size), torque), 0.0)
+    return pushed[()]
+
+
+def follower_gains(gain):
+    """Per-joint gain array: gain on the follower (left-leg) joints, 0 on the lead joints."""
+    return np.where(FOLLOWER_JOINTS, gain, 0.0)
+
+
+def follower_targets(joint_positions, joint_velocities):
+    """Target positions and velocities of all joints: each mirrors its lead joint."""
+    return MIRROR_SIGN * joint_positions[LEAD_JOINT_INDEX], MIRROR_SIGN * joint_velocities[LEAD_JOINT_INDEX]
@@ -0,0 +1,64 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from lab_1_control import make_leg_tracking_pid
+from lab_1_sim import simulate_tracking, step_response_metrics, step_target
+
+def evaluate_gains(gain_sets, step_size=0.5, duration=3.0, loop_rate=200, jitter=0.0, settle_band=0.05, seed=0):
+    """
+    Step response metrics of a batch of (kp, ki, kd) gain sets.
+
+    All gain sets are simulated together as one batch (see simulate_tracking);
+    ki is per tick, as in lab_1.py. Returns (B, 3) settling time, overshoot
+    and final error.
+    """
+    gain_sets = np.asarray(gain_sets, dtype=float)
+    controller = make_leg_tracking_pid(gain_sets[:, 0], gain_sets[:, 1], gain_sets[:, 2], loop_rate)
+    result = simulate_tracking(
+        controller, duration=duration, loop_rate=loop_rate, jitter=jitter,
+        target=step_target(step_size), seed=seed, initial_position=np.zeros(len(gain_sets)),
+    )
+    return np.stack(step_response_metrics(result, step_size, settle_band), axis=-1)
+
+def sweep_gains(gain_sets, batch_size=256, max_workers=None, **simulation_options):
+    """Evaluate gain_sets (M, 3) in batches spread over a process pool; returns (M, 3) metrics."""
+    gain_sets = np.asarray(gain_sets, dtype=float)
+    batches = [gain_sets[start:start + batch_size] for start in range(0, len(gain_sets), batch_size)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(evaluate_gains, batch, **simulation_options) for batch in batches]
+        return np.concatenate([future.result() for future in futures])
+
+
+######################### MAIN ##########################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated step response of the lab 1 leg tracking PID over a grid of gains")
+    parser.add_argument("--kp", type=float, nargs="+", default=list(np.linspace(0.1, 3.0, 30)))
+    parser.add_argument("--ki", type=float, nargs="+", default=[0.0, 0.01, 0.05, 0.1], help="per tick, as in lab_1.py")
+    parser.add_argument("--kd", type=float, nargs="+", default=list(np.linspace(0.0, 0.2, 21)))
+    parser.add_argument("--step", type=float, default=0.5, help="target step (rad)")
+    parser.add_argument("--duration", type=float, default=3.0, help="simulated time per gain set (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="std of tick lateness (s)")
+    parser.add_argument("--settle-band", type=float, default=0.05, help="settling band as a fraction of the step")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=20, help="number of gain sets to print")
+    args = parser.parse_args()
+
+    gain_sets = np.array(list(itertools.product(args.kp, args.ki, args.kd)))
+    start = time.perf_counter()
+    metrics = sweep_gains(
+        gain_sets, batch_size=args.batch_size, max_workers=args.workers,
+        step_size=args.step, duration=args.duration, jitter=args.jitter, settle_band=args.settle_band,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {len(gain_sets)} gain sets x {args.duration} s in {elapsed:.2f} s "
+          f"({len(gain_sets) * args.duration / elapsed:.0f}x real time, {args.workers} workers)")
+
+    # Fastest settling first, then least overshoot
+    order = np.lexsort((metrics[:, 1], metrics[:, 0]))
+    print(f"  {'kp':>7} {'ki':>7} {'kd':>7} {'settling':>10} {'overshoot':>10} {'final err':>10}")
+    for kp, ki, kd, settling_time, overshoot, final_error in np.hstack([gain_sets, metrics])[order[:args.top]]:
+        print(f"  {kp:>7.3f} {ki:>7.3f} {kd:>7.3f} {settling_time:>9.3f}s {overshoot:>9.1f}% {final_error:>10.4f}")
@@ -0,0 +1,132 @@
+import math
+import numpy as np
+from lab_1_control import MAX_TORQUE, apply_dead_band
+
+# Rough model of the leg_front_l_3 joint (lower leg) with the leg in the air
+JOINT_INERTIA = 2e-3  # kg m^2
+JOINT_DAMPING = 0.02  # N m s / rad
+COULOMB_FRICTION = 0.08  # N m, overcome by the motor dead band
+# Longest integration step of the plant between control ticks
+PLANT_DT = 1e-3
+
+
+class JointPlant:
+    """
+    Single joint: inertia, viscous damping and Coulomb friction.
+
+    Damping and friction are integrated implicitly, so the joint sticks
+    when the applied torque cannot overcome friction and PLANT_DT can be
+    far coarser than an explicit scheme would allow. position and velocity
+    may be arrays to simulate a batch of independent joints at once.
+    """
+
+    def __init__(self, position=0.0, velocity=0.0, inertia=JOINT_INERTIA, damping=JOINT_DAMPING, friction=COULOMB_FRICTION):
+        self.position = position
+        self.velocity = velocity
+        self.inertia = inertia
+        self.damping = damping
+        self.friction = friction
+
+    def step(self, torque, duration):
+        """Hold torque for duration seconds, in steps of at most PLANT_DT."""
+        num_steps = max(math.ceil(duration / PLANT_DT - 1e-9), 1)
+        dt = duration / num_steps
+        damping_factor = 1.0 / (1.0 + dt * self.damping / self.inertia)
+        friction_step = dt * self.friction / self.inertia
+        torque_step = dt * torque / self.inertia
+        for _ in range(num_steps):
+            velocity = self.velocity + torque_step
+            # Friction can at most bring the joint to rest within one step
+            self.velocity = np.copysign(np.maximum(np.abs(velocity) - friction_step, 0.0), velocity) * damping_factor
+            self.position = self.position + self.velocity * dt
+
+
+def tick_times(duration, loop_rate=200, jitter=0.0, rng=None):
+    """
+    Wake-up times of a timer at loop_rate over duration seconds.
+
+    Each tick is late by |N(0, jitter)| seconds relative to its nominal time
+    (timers do not accumulate lateness), and ticks stay in order.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    nominal = np.arange(0.0, duration, 1.0 / loop_rate)
+    times = nominal + np.abs(rng.normal(0.0, jitter, size=nominal.shape))
+    return np.maximum.accumulate(times)
+
+
+def lead_leg_target(t, amplitude=0.5, frequency=0.5):
+    """Target position and velocity: the mirrored lead leg swinging sinusoidally."""
+    omega = 2 * np.pi * frequency
+    return amplitude * np.sin(omega * t), amplitude * omega * np.cos(omega * t)
+
+
+def simulate_tracking(controller, duration=5.0, loop_rate=200, jitter=0.0, sensor_noise=1e-3, target=lead_leg_target, seed=0, initial_position=0.0):
+    """
+    Run controller against a JointPlant the way lab_1.py drives the robot.
+
+    controller needs update(setpoint, measurement, now, setpoint_rate) and
+    returns the raw PID torque; the dead band and torque limit are applied
+    here as in the node. target(t) returns the target position and
+    velocity. Returns a dict of (N,) arrays: time, target, position, torque.
+
+    For a batch, give the controller (B,) gain arrays and initial_position
+    a (B,) array; position and torque are then (N, B) and all B runs
+    advance together, one array operation per step.
+    """
+    rng = np.random.default_rng(seed)
+    times = tick_times(duration, loop_rate, jitter, rng)
+    plant = JointPlant(position=initial_position, velocity=np.zeros_like(initial_position))
+    targets, target_rates = target(times)
+    # Every run in a batch sees the same noise, so a run does not depend on the batch it is in
+    noise = rng.normal(0.0, sensor_noise, size=times.shape)
+    positions = np.empty(times.shape + np.shape(initial_position))
+    torques = np.empty_like(positions)
+    torque = 0.0
+    for k, now in enumerate(times):
+        if k > 0 and now > times[k - 1]:
+            plant.step(torque, now - times[k - 1])
+        positions[k] = plant.position
+        torque = apply_dead_band(controller.update(targets[k], plant.position + noise[k], now, target_rates[k]))
+        torque = np.minimum(np.maximum(torque, -MAX_TORQUE), MAX_TORQUE)
+        torques[k] = torque
+    return {"time": times, "target": targets, "position": positions, "torque": torques}
+
+
+def rms_tracking_error(result, settle_time=1.0):
+    """RMS of target - position after the initial transient."""
+    steady = result["time"] >= settle_time
+    return float(np.sqrt(np.mean((result["target"][steady] - result["position"][steady]) ** 2)))
+
+
+def rms_torque_step(result, settle_time=1.0):
+    """RMS change of the commanded torque between ticks (chatter) after the transient."""
+    steady = result["time"] >= settle_time
+    return float(np.sqrt(np.mean(np.diff(result["torque"][steady]) ** 2)))
+
+
+def step_target(step_size=0.5):
+    """Target that jumps from 0 to step_size at the first tick and holds."""
+    def target(t):
+        return np.full_like(t, step_size), np.zeros_like(t)
+    return target
+
+
+def step_response_metrics(result, step_size, settle_band=0.05):
+    """
+    Settling time (s), overshoot (% of the step) and final error (rad).
+
+    The response has settled once it stays within settle_band * step_size
+    of the target; settling time is inf if it is outside the band at the
+    end of the run. Works on single runs and on (N, B) batches, returning
+    (B,) arrays for the latter.
+    """
+    time = result["time"]
+    position = result["position"]
+    error = np.abs(position - step_size)
+    outside = error > settle_band * abs(step_size)
+    # Index of the first tick after the last one outside the band
+    first_settled = len(time) - np.argmax(outside[::-1], axis=0)
+    settling_time = np.where(outside.any(axis=0), time[np.minimum(first_settled, len(time) - 1)] - time[0], 0.0)
+    settling_time = np.where(outside[-1], np.inf, settling_time)
+    overshoot = np.maximum(np.max(np.sign(step_size) * position, axis=0) - abs(step_size), 0.0) / abs(step_size) * 100
+    return settling_time, overshoot, error[-1]
@@ -0,0 +1,93 @@
+import numpy as np
+from lab_1_control import PIDController, apply_dead_band, follower_gains, follower_targets, DEAD_BAND_SIZE, JOINT_NAMES
+from lab_1_benchmark import FixedStepPID, DELTA_T
+
+TOLERANCE = 1e-9
+
+def unit_test(test_number, output, output_des):
+    error = np.max(np.abs(np.asarray(output) - np.asarray(output_des)))
+    if np.shape(output) == np.shape(output_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", output)
+    return False
+
+def run_controller(controller, setpoints, measurements, times, setpoint_rates=None):
+    if setpoint_rates is None:
+        setpoint_rates = np.zeros(len(times))
+    return np.array([controller.update(*sample) for sample in zip(setpoints, measurements, times, setpoint_rates)])
+
+rng = np.random.default_rng(0)
+num_ticks = 200
+times = DELTA_T * np.arange(num_ticks)
+setpoints = 0.5 * np.sin(times)
+measurements = setpoints + rng.normal(0, 0.05, num_ticks)
+late_times = times + np.where(np.arange(num_ticks) % 2 == 1, 0.5 * DELTA_T, 0.0)
+
+# At exactly DELTA_T per tick, P + D on the error matches the fixed-step controller
+# once its first tick (which differentiates against a zero last error) has passed
+fixed_step_output = run_controller(FixedStepPID(0.1, 0.0, 0.1), setpoints, measurements, times)
+measured_dt_output = run_controller(PIDController(0.1, 0.0, 0.1, derivative_on_measurement=False), setpoints, measurements, times)
+
+# A constant setpoint: derivative on the measurement equals derivative on the error
+constant_setpoints = np.full(num_ticks, 0.3)
+on_error_output = run_controller(PIDController(1.0, 0.0, 0.1, derivative_on_measurement=False), constant_setpoints, measurements, late_times)
+on_measurement_output = run_controller(PIDController(1.0, 0.0, 0.1), constant_setpoints, measurements, late_times)
+
+# Integral over measured time: 1 s of unit error gives ki * 1, clipped by integral_limit
+integral_controller = PIDController(0.0, 2.0, 0.0)
+integral_output = run_controller(integral_controller, np.ones(11), np.zeros(11), np.linspace(0.0, 1.0, 11))
+clipped_output = run_controller(PIDController(0.0, 2.0, 0.0, integral_limit=0.25), np.ones(11), np.zeros(11), np.linspace(0.0, 1.0, 11))
+
+# A ramp measured at uneven times has a constant derivative
+ramp_times = np.cumsum(rng.uniform(0.5, 1.5, 50) * DELTA_T)
+ramp_output = run_controller(PIDController(0.0, 0.0, 1.0), np.zeros(50), -0.2 * ramp_times, ramp_times)
+# With a derivative filter the same ramp is approached from 0 and never overshoots
+filtered_ramp_output = run_controller(PIDController(0.0, 0.0, 1.0, derivative_filter_tau=0.01), np.zeros(50), -0.2 * ramp_times, ramp_times)
+
+# The 12-joint controller matches one scalar controller per joint; lead joints get no torque
+joint_trajectory = rng.uniform(-1, 1, size=(num_ticks, len(JOINT_NAMES)))
+joint_velocity_trajectory = rng.uniform(-1, 1, size=(num_ticks, len(JOINT_NAMES)))
+vectorized_pid = PIDController(follower_gains(0.1), follower_gains(20.0), follower_gains(0.1), derivative_filter_tau=0.01, integral_limit=0.0015)
+scalar_pids = [PIDController(kp, ki, kd, derivative_filter_tau=0.01, integral_limit=0.0015) for kp, ki, kd in zip(follower_gains(0.1), follower_gains(20.0), follower_gains(0.1))]
+vectorized_output = []
+scalar_output = []
+for now, positions, velocities in zip(late_times, joint_trajectory, joint_velocity_trajectory):
+    targets, target_rates = follower_targets(positions, velocities)
+    vectorized_output.append(apply_dead_band(vectorized_pid.update(targets, positions, now, target_rates)))
+    scalar_output.append([apply_dead_band(pid.update(target, position, now, target_rate)) for pid, target, position, target_rate in zip(scalar_pids, targets, positions, target_rates)])
+vectorized_output = np.array(vectorized_output)
+lead_joints = [JOINT_NAMES.index(name) for name in JOINT_NAMES if "_r_" in name]
+
+# format is output, expected output
+test_input_output_list = [
+[measured_dt_output[1:], fixed_step_output[1:]],
+[on_measurement_output, on_error_output],
+[integral_output[-1], 2.0],
+[clipped_output[-1], 0.5],
+[ramp_output[1:], np.full(49, 0.2)],
+[int(np.all(np.diff(filtered_ramp_output) >= 0) and filtered_ramp_output.max() <= 0.2 + TOLERANCE), 1],
+[[apply_dead_band(0.01), apply_dead_band(-0.01), apply_dead_band(0.0), apply_dead_band(0.5)], [DEAD_BAND_SIZE, -DEAD_BAND_SIZE, 0.0, 0.5]],
+[apply_dead_band(np.array([0.01, -0.01, 0.0, 0.5])), [DEAD_BAND_SIZE, -DEAD_BAND_SIZE, 0.0, 0.5]],
+[vectorized_output, np.array(scalar_output)],
+[vectorized_output[:, lead_joints], np.zeros((num_ticks, len(lead_joints)))],
+[follower_targets(np.arange(12.0), np.zeros(12))[0], -np.array([0, 1, 2, 0, 1, 2, 6, 7, 8, 6, 7, 8.0])],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 1 PID controller:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    output = row[0]
+    output_des = row[1]
+    if unit_test(test_number, output, output_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
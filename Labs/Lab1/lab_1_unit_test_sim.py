@@ -0,0 +1,69 @@
+import numpy as np
+from lab_1_control import make_leg_tracking_pid
+from lab_1_sim import JointPlant, simulate_tracking, step_response_metrics, COULOMB_FRICTION, JOINT_INERTIA
+from lab_1_gain_sweep import evaluate_gains
+
+TOLERANCE = 1e-9
+
+def unit_test(test_number, output, output_des):
+    error = np.max(np.abs(np.asarray(output) - np.asarray(output_des)))
+    if np.shape(output) == np.shape(output_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", output)
+    return False
+
+# A torque below the friction level leaves a joint at rest where it is
+stuck_plant = JointPlant(position=0.2)
+stuck_plant.step(0.9 * COULOMB_FRICTION, 1.0)
+
+# Without friction and damping the joint accelerates at torque / inertia
+free_plant = JointPlant(friction=0.0, damping=0.0)
+free_plant.step(0.01, 0.5)
+
+# A spinning joint with no torque comes to rest and stays there
+coasting_plant = JointPlant(velocity=5.0)
+coasting_plant.step(0.0, 2.0)
+
+# A batch of runs matches the same runs simulated one by one
+gains = np.array([[0.5, 0.0, 0.02], [2.0, 0.05, 0.08], [0.1, 0.1, 0.1]])
+batch_result = simulate_tracking(make_leg_tracking_pid(gains[:, 0], gains[:, 1], gains[:, 2], 200), duration=1.0, jitter=0.001, initial_position=np.zeros(3))
+single_positions = np.stack([
+    simulate_tracking(make_leg_tracking_pid(kp, ki, kd, 200), duration=1.0, jitter=0.001)["position"] for kp, ki, kd in gains
+], axis=-1)
+
+# Step metrics of a hand-made response: 20% overshoot, inside the 5% band from t = 0.3 s
+times = np.linspace(0.0, 1.0, 11)
+response = np.array([0.0, 0.5, 1.2, 1.01, 0.98, 1.02, 1.0, 1.0, 1.0, 1.0, 1.0])
+settling_time, overshoot, final_error = step_response_metrics({"time": times, "position": response}, 1.0)
+# Still outside the band at the end of the run: never settles
+unsettled = step_response_metrics({"time": times, "position": np.linspace(0.0, 0.5, 11)}, 1.0)
+
+# format is output, expected output
+test_input_output_list = [
+[[stuck_plant.position, stuck_plant.velocity], [0.2, 0.0]],
+[[free_plant.velocity, free_plant.position], [0.01 / JOINT_INERTIA * 0.5, 0.5 * 0.01 / JOINT_INERTIA * 0.5 ** 2 * (1 + 1 / 500)]],
+[[coasting_plant.velocity, int(coasting_plant.position > 0)], [0.0, 1]],
+[batch_result["position"], single_positions],
+[[settling_time, overshoot, final_error], [0.3, 20.0, 0.0]],
+[[int(np.isinf(unsettled[0])), unsettled[1]], [1, 0.0]],
+[evaluate_gains(gains[:1], duration=1.0), evaluate_gains(gains, duration=1.0)[:1]],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 1 simulator:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    output = row[0]
+    output_des = row[1]
+    if unit_test(test_number, output, output_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
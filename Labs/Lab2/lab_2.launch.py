@@ -1,7 +1,8 @@
 from launch import LaunchDescription
-from launch.actions import RegisterEventHandler
+from launch.actions import DeclareLaunchArgument, ExecuteProcess, RegisterEventHandler
+from launch.conditions import IfCondition
 from launch.event_handlers import OnProcessExit
-from launch.substitutions import Command, FindExecutable, PathJoinSubstitution
+from launch.substitutions import Command, FindExecutable, LaunchConfiguration, PathJoinSubstitution
 
 from launch_ros.actions import Node
 from launch_ros.substitutions import FindPackageShare
@@ -10,6 +11,29 @@ import os
 
 
 def generate_launch_description():
+    # fk_node:=true also starts lab_2.py (and latency_probe:=true the latency
+    # probe), subscribing to joint_states with the joint_states_qos profile
+    # (default / sensor_data, see lab_common/qos.py). rclpy has no
+    # intra-process transport, so this is as close as the Python FK node gets
+    # to being composed with the C++ nodes.
+    fk_node_arg = DeclareLaunchArgument("fk_node", default_value="false", description="start the lab_2.py FK node")
+    latency_probe_arg = DeclareLaunchArgument("latency_probe", default_value="false", description="start lab_2_latency_probe.py")
+    # Same default as the nodes (lab_common.qos.DEFAULT_JOINT_STATES_QOS)
+    joint_states_qos_arg = DeclareLaunchArgument(
+        "joint_states_qos", default_value="sensor_data", choices=["default", "sensor_data"], description="QoS of the joint_states subscriptions"
+    )
+    fk_trigger_arg = DeclareLaunchArgument(
+        "fk_trigger", default_value="timer", choices=["timer", "joint_states"], description="run FK on the 50 Hz timer or per new joint state"
+    )
+    fk_model_arg = DeclareLaunchArgument(
+        "fk_model", default_value="closed_form", choices=["closed_form", "urdf"], description="FK from the closed form or from the robot_description URDF"
+    )
+    stream_to_rerun_arg = DeclareLaunchArgument(
+        "stream_to_rerun", default_value="false", description="stream lab_2.py FK results to a rerun viewer"
+    )
+    rerun_port_arg = DeclareLaunchArgument("rerun_port", default_value="9876", description="port of the rerun viewer")
+    joint_states_qos_parameter = ["joint_states_qos:=", LaunchConfiguration("joint_states_qos")]
+
     # Get URDF via xacro
     robot_description_content = Command(
         [
@@ -102,7 +126,35 @@ def generate_launch_description():
         output="both",
     )
 
+    # Run from this directory, where lab_2.py finds its sound and writes its log
+    fk_node = ExecuteProcess(
+        cmd=[
+            "python3", "lab_2.py", "--ros-args",
+            "-p", joint_states_qos_parameter,
+            "-p", ["fk_trigger:=", LaunchConfiguration("fk_trigger")],
+            "-p", ["fk_model:=", LaunchConfiguration("fk_model")],
+            "-p", ["stream_to_rerun:=", LaunchConfiguration("stream_to_rerun")],
+            "-p", ["rerun_port:=", LaunchConfiguration("rerun_port")],
+        ],
+        cwd=os.path.dirname(__file__),
+        output="both",
+        condition=IfCondition(LaunchConfiguration("fk_node")),
+    )
+    latency_probe = ExecuteProcess(
+        cmd=["python3", "lab_2_latency_probe.py", "--ros-args", "-p", joint_states_qos_parameter],
+        cwd=os.path.dirname(__file__),
+        output="both",
+        condition=IfCondition(LaunchConfiguration("latency_probe")),
+    )
+
     nodes = [
+        fk_node_arg,
+        latency_probe_arg,
+        joint_states_qos_arg,
+        fk_trigger_arg,
+        fk_model_arg,
+        stream_to_rerun_arg,
+        rerun_port_arg,
         control_node,
         robot_state_pub_node,
         joint_state_broadcaster_spawner,
@@ -110,6 +162,8 @@ def generate_launch_description():
         kp_spawner,
         kd_spawner,
         foxglove_bridge,
+        fk_node,
+        latency_probe,
     ]
 
     return LaunchDescription(nodes)
@@ -6,104 +6,109 @@ from visualization_msgs.msg import Marker
 import numpy as np
 import math
 import pygame
-import pickle
+import os
+import sys
 import time
+from lab_2_kinematic_tree import KinematicTree, UrdfLegKinematics, load_package_robot_description
+from lab_2_kinematics import LegKinematics, FRONT_LEFT_HIP_OFFSET, BACK_LEFT_HIP_OFFSET
+from lab_2_logger import StreamingLogWriter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from lab_common.instrumentation import LatencyRecorder
+from lab_common.joint_state_index import JointIndexCache
+from lab_common.qos import DEFAULT_JOINT_STATES_QOS, JOINT_STATES_QOS
+from lab_common.stats_logger import ThrottledStatsLogger
 
 # Set up the sound
 pygame.mixer.init()
 sound = pygame.mixer.Sound('./car_crash.mp3')
 
-# Set up the logging
-logging_names_list = ['time_stamp','theta1_f', 'theta2_f', 'theta3_f', 'theta1_b', 'theta2_b', 'theta3_b', 'end_effector_position_f', 'end_effector_position_b']
+# Set up the logging: (name, width) of each logged field
+logging_fields_list = [('time_stamp', 1), ('theta1_f', 1), ('theta2_f', 1), ('theta3_f', 1), ('theta1_b', 1), ('theta2_b', 1), ('theta3_b', 1), ('end_effector_position_f', 3), ('end_effector_position_b', 3)]
 
 class ForwardKinematics(Node):
 
     def __init__(self):
         super().__init__("forward_kinematics")
-        self.joint_subscription = self.create_subscription(JointState, "joint_states", self.listener_callback, 10)
+        joint_states_qos = self.declare_parameter("joint_states_qos", DEFAULT_JOINT_STATES_QOS).value
+        self.joint_subscription = self.create_subscription(JointState, "joint_states", self.listener_callback, JOINT_STATES_QOS[joint_states_qos])
         self.joint_subscription  # prevent unused variable warning
 
         self.position_publisher = self.create_publisher(Float64MultiArray, "leg_front_l_end_effector_position", 10)
         self.marker_publisher = self.create_publisher(Marker, "marker", 10)
 
         self.joint_positions = None
-        timer_period = 0.02  # publish FK information and marker at 50Hz
-        self.timer = self.create_timer(timer_period, self.timer_callback)
+        # Stamp of the JointState the current joint_positions came from
+        self.joint_state_stamp = None
+        # Extract the positions of the joints related to leg_front_l and leg_back_l
+        self.joint_index_cache = JointIndexCache(["leg_front_l_1", "leg_front_l_2", "leg_front_l_3", "leg_back_l_1", "leg_back_l_2", "leg_back_l_3"])
+        self.listener_latency = LatencyRecorder("listener_callback")
+        self.create_timer(5.0, self.report_callback_latency)
+        # fk_model:=urdf runs FK on the pupper_v3_description URDF (the same
+        # robot_description lab_2.launch.py gives robot_state_publisher)
+        # instead of the closed form; either way the constant link transforms
+        # are precomputed once per leg
+        if self.declare_parameter("fk_model", "closed_form").value == "urdf":
+            kinematic_tree = KinematicTree(load_package_robot_description("pupper_v3_description", "description/pupper_v3.urdf.xacro"))
+            self.leg_kinematics_f = UrdfLegKinematics(kinematic_tree, ["leg_front_l_1", "leg_front_l_2", "leg_front_l_3"])
+            self.leg_kinematics_b = UrdfLegKinematics(kinematic_tree, ["leg_back_l_1", "leg_back_l_2", "leg_back_l_3"])
+        else:
+            self.leg_kinematics_f = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+            self.leg_kinematics_b = LegKinematics(BACK_LEFT_HIP_OFFSET)
+        # stream_to_rerun:=true streams foot positions and link frames to a
+        # rerun viewer listening on rerun_port (start one with `rerun`)
+        self.rerun_bridge = None
+        if self.declare_parameter("stream_to_rerun", False).value:
+            from lab_2_rerun_bridge import RerunStreamBridge
+            from vis_tool import Visualizer
+            rerun_port = self.declare_parameter("rerun_port", 9876).value
+            self.rerun_bridge = RerunStreamBridge(
+                Visualizer(app_name="lab_2", spawn=False, port=rerun_port),
+                [("leg_front_l", self.leg_kinematics_f), ("leg_back_l", self.leg_kinematics_b)],
+                emit=self.get_logger().warning,
+            )
+        # End-effector summaries are formatted and printed off the timer thread
+        self.stats_logger = ThrottledStatsLogger("end_effector_f", ["x", "y", "z"], emit=self.get_logger().info)
+        # fk_trigger:=joint_states runs FK once per new JointState instead of on the timer
+        self.event_driven = self.declare_parameter("fk_trigger", "timer").value == "joint_states"
+        if self.event_driven:
+            # Triggers coalesce until the executor gets to the callback, so a
+            # burst of joint states costs a single FK pass on the newest one
+            self.fk_guard_condition = self.create_guard_condition(self.joint_state_changed_callback)
+            self.last_fk_joint_positions = None
+        else:
+            timer_period = 0.02  # publish FK information and marker at 50Hz
+            self.timer = self.create_timer(timer_period, self.timer_callback)
 
         self.kp_publisher = self.create_publisher(Float64MultiArray, "/forward_kp_controller/commands", 10)
         self.kd_publisher = self.create_publisher(Float64MultiArray, "/forward_kd_controller/commands", 10)
 
-        # Open file for writing
-        self.filename = "lab_2_data.pkl"
-        self.data_dictionary = {}
-        for name in logging_names_list:
-            self.data_dictionary[name] = []
+        # Open file for writing; records are appended in chunks by a background thread
+        self.filename = "lab_2_data.bin"
+        self.data_logger = StreamingLogWriter(self.filename, logging_fields_list)
         self.start_time = time.time()
 
         # Periodically set gains to 0 so legs go limp
         self.create_timer(0.1, self.publish_zero_gains)
 
     def log_data(self, time_stamp, theta1_f, theta2_f, theta3_f, theta1_b, theta2_b, theta3_b, end_effector_position_f, end_effector_position_b):
-        self.data_dictionary['time_stamp'].append(time_stamp)
-        self.data_dictionary['theta1_f'].append(theta1_f)
-        self.data_dictionary['theta2_f'].append(theta2_f)
-        self.data_dictionary['theta3_f'].append(theta3_f)
-        self.data_dictionary['theta1_b'].append(theta1_b)
-        self.data_dictionary['theta2_b'].append(theta2_b)
-        self.data_dictionary['theta3_b'].append(theta3_b)
-        self.data_dictionary['end_effector_position_f'].append(end_effector_position_f)
-        self.data_dictionary['end_effector_position_b'].append(end_effector_position_b)
-        with open(self.filename, 'wb') as file_handle:
-            pickle.dump(self.data_dictionary, file_handle)
+        self.data_logger.log(time_stamp, theta1_f, theta2_f, theta3_f, theta1_b, theta2_b, theta3_b, end_effector_position_f, end_effector_position_b)
 
     def publish_zero_gains(self):
         self.kp_publisher.publish(Float64MultiArray(data=[0.0] * 12))
         self.kd_publisher.publish(Float64MultiArray(data=[0.0] * 12))
 
     def listener_callback(self, msg):
-        # Extract the positions of the joints related to leg_front_l
-        joints_of_interest = ["leg_front_l_1", "leg_front_l_2", "leg_front_l_3","leg_back_l_1", "leg_back_l_2", "leg_back_l_3"]
-        self.joint_positions = [msg.position[msg.name.index(joint)] for joint in joints_of_interest]
-
-    def rotation_x(self, angle):
-        return np.array(
-            [
-                [1, 0, 0, 0],
-                [0, np.cos(angle), -np.sin(angle), 0],
-                [0, np.sin(angle), np.cos(angle), 0],
-                [0, 0, 0, 1],
-            ]
-        )
-
-    def rotation_y(self, angle):
-        return np.array(
-            [
-                [np.cos(angle), 0, np.sin(angle), 0],
-                [0, 1, 0, 0],
-                [-np.sin(angle), 0, np.cos(angle), 0],
-                [0, 0, 0, 1],
-            ]
-        )
-
-    def rotation_z(self, angle):
-        return np.array(
-            [
-                [np.cos(angle), -np.sin(angle), 0, 0],
-                [np.sin(angle), np.cos(angle), 0, 0],
-                [0, 0, 1, 0],
-                [0, 0, 0, 1],
-            ]
-        )
-
-    def translation(self, x, y, z):
-        return np.array(
-            [
-                [1, 0, 0, x],
-                [0, 1, 0, y],
-                [0, 0, 1, z],
-                [0, 0, 0, 1],
-            ]
-        )
+        start = time.perf_counter()
+        self.joint_index_cache.update(msg.name)
+        self.joint_positions = self.joint_index_cache.select(msg.position)
+        self.joint_state_stamp = msg.header.stamp
+        if self.event_driven:
+            self.fk_guard_condition.trigger()
+        self.listener_latency.record(time.perf_counter() - start)
+
+    def report_callback_latency(self):
+        self.get_logger().info(self.listener_latency.summary())
 
     # FK for forward left leg
     def forward_kinematics_f(self, theta1=None, theta2=None, theta3=None):
@@ -115,73 +120,27 @@ class ForwardKinematics(Node):
             theta2 = self.joint_positions[1]
             theta3 = self.joint_positions[2]
 
-        # Stanford Pupper V3 Dimensions
-        # Link 2 (Upper Leg) Offsets
-        l2_x, l2_y, l2_z = 0.0, -0.0494, 0.0685
-        # Link 3 (Lower Leg) Offsets
-        l3_x, l3_y, l3_z = 0.06231, 0.06216, 0.018
-
-        # T_0_1 (base_link to leg_front_l_1)
-        T_0_1 = self.translation(0.07500, 0.0445, 0) @ self.rotation_x(1.57080) @ self.rotation_z(theta1)
-
-        # T_1_2 (leg_front_l_1 to leg_front_l_2)
-        T_1_2 = self.translation(0, 0, 0.04) @ self.rotation_z(-1.57080) @ self.rotation_y(1.57080) @ self.rotation_x(1.57080) @ self.rotation_z(theta2)
-
-        # T_2_3 (leg_front_l_2 to leg_front_l_3)
-        T_2_3 = self.translation(l2_x, l2_y, l2_z) @ self.rotation_z(3.14159) @ self.rotation_y(1.57080) @ self.rotation_z(theta3)
-
-        # T_3_ee (leg_front_l_3 to end-effector)
-        T_3_ee = self.translation(l3_x, l3_y, l3_z)
-
-        # Compute the final transformation
-        T_0_ee = T_0_1 @ T_1_2 @ T_2_3 @ T_3_ee
-
-        # Extract the end-effector position
-        end_effector_position = T_0_ee[0:3, 3]
-        end_effector_position[1] = -end_effector_position[1]
-        end_effector_position[2] = -end_effector_position[2]
-
-        return end_effector_position
+        return self.leg_kinematics_f.forward_kinematics(theta1, theta2, theta3)
 
     # FK for back left leg
     def forward_kinematics_b(self, theta1=None, theta2=None, theta3=None):
-
-        ## TODO: Implement the FK for the back left leg, similar to forward_kinematics_f
         # If no angles are provided, use the current joint positions from the robot
         if theta1 is None or theta2 is None or theta3 is None:
             if self.joint_positions is None:
                 return np.array([0.0, 0.0, 0.0])
-            theta1 = self.joint_positions[0]
-            theta2 = self.joint_positions[1]
-            theta3 = self.joint_positions[2]
-
-        # Stanford Pupper V3 Dimensions
-        # Link 2 (Upper Leg) Offsets
-        l2_x, l2_y, l2_z = 0.0, -0.0494, 0.0685
-        # Link 3 (Lower Leg) Offsets
-        l3_x, l3_y, l3_z = 0.06231, 0.06216, 0.018
-
-        # T_0_1 (base_link to leg_front_l_1)
-        T_0_1 = self.translation(-0.07500, 0.0445, 0) @ self.rotation_x(1.57080) @ self.rotation_z(theta1)
+            theta1 = self.joint_positions[3]
+            theta2 = self.joint_positions[4]
+            theta3 = self.joint_positions[5]
 
-        # T_1_2 (leg_front_l_1 to leg_front_l_2)
-        T_1_2 = self.translation(0, 0, 0.04) @ self.rotation_z(-1.57080) @ self.rotation_y(1.57080) @ self.rotation_x(1.57080) @ self.rotation_z(theta2)
+        return self.leg_kinematics_b.forward_kinematics(theta1, theta2, theta3)
 
-        # T_2_3 (leg_front_l_2 to leg_front_l_3)
-        T_2_3 = self.translation(l2_x, l2_y, l2_z) @ self.rotation_z(3.14159) @ self.rotation_y(1.57080) @ self.rotation_z(theta3)
-
-        # T_3_ee (leg_front_l_3 to end-effector)
-        T_3_ee = self.translation(l3_x, l3_y, l3_z)
-
-        # Compute the final transformation
-        T_0_ee = T_0_1 @ T_1_2 @ T_2_3 @ T_3_ee
-
-        # Extract the end-effector position
-        end_effector_position = T_0_ee[0:3, 3]
-        end_effector_position[1] = -end_effector_position[1]
-        end_effector_position[2] = -end_effector_position[2]
-
-        return end_effector_position
+    def joint_state_changed_callback(self):
+        """Run FK for the newest joint state, unless its angles are the ones already published."""
+        if self.last_fk_joint_positions is not None and np.array_equal(self.joint_positions, self.last_fk_joint_positions):
+            return
+        # joint_positions is replaced, never modified, by listener_callback
+        self.last_fk_joint_positions = self.joint_positions
+        self.timer_callback()
 
     def timer_callback(self):
         """Timer callback for publishing end-effector marker and position."""
@@ -198,10 +157,13 @@ class ForwardKinematics(Node):
             
             time_stamp = time.time() - self.start_time
             self.log_data(time_stamp, theta1_f, theta2_f, theta3_f, theta1_b, theta2_b, theta3_b, end_effector_position_f, end_effector_position_b)
+            if self.rerun_bridge is not None:
+                self.rerun_bridge.push(time_stamp, self.joint_positions, (end_effector_position_f, end_effector_position_b))
             
             marker = Marker()
             marker.header.frame_id = "/base_link"
-            marker.header.stamp = self.get_clock().now().to_msg()
+            # Stamped with the joint state it was computed from, so subscribers can measure its age
+            marker.header.stamp = self.joint_state_stamp
             marker.type = marker.SPHERE
             marker.id = 0
             marker.color.r = 0.0
@@ -219,15 +181,21 @@ class ForwardKinematics(Node):
             position = Float64MultiArray()
             position.data = end_effector_position_f
             self.position_publisher.publish(position)
-            self.get_logger().info(
-                f"End-Effector Position: x={end_effector_position_f[0]:.2f}, y={end_effector_position_f[1]:.2f}, z={end_effector_position_f[2]:.2f}"
-            )
+            self.stats_logger.record(*end_effector_position_f)
 
 
 def main(args=None):
     rclpy.init(args=args)
     forward_kinematics = ForwardKinematics()
-    rclpy.spin(forward_kinematics)
+    try:
+        rclpy.spin(forward_kinematics)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        forward_kinematics.data_logger.close()
+        forward_kinematics.stats_logger.close()
+        if forward_kinematics.rerun_bridge is not None:
+            forward_kinematics.rerun_bridge.close()
 
 
 if __name__ == "__main__":
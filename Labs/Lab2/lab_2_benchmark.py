@@ -0,0 +1,383 @@
+import argparse
+import json
+import math
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import numpy as np
+from lab_2_logger import StreamingLogWriter, convert_to_columnar, write_columnar_log
+from lab_2_kinematics import LegKinematics, LegTransformChain, QuadrupedKinematics, forward_kinematics_chain, FRONT_LEFT_HIP_OFFSET, LEG_HIP_OFFSETS, L1_Z, L2_OFFSET, L3_OFFSET
+from lab_2_kinematic_tree import KinematicTree, UrdfLegKinematics
+from lab_2_inverse_kinematics import LegInverseKinematics
+from lab_2_workspace_map import WorkspaceMap, build_workspace_map
+from lab_2_se3 import rotation_z, sincos
+
+def report(label, seconds, number):
+    print(f"  {label:<32} {seconds / number * 1e6:>10.2f} us/call")
+
+def benchmark_fk(number=20000):
+    print(f"Single-leg FK latency ({number} calls):")
+    rng = np.random.default_rng(0)
+    theta1, theta2, theta3 = (float(theta) for theta in rng.uniform(-1, 1, 3))
+    leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+    report("4x4 transform chain", timeit.timeit(lambda: forward_kinematics_chain(theta1, theta2, theta3), number=number), number)
+    report("closed form", timeit.timeit(lambda: leg_kinematics.forward_kinematics(theta1, theta2, theta3), number=number), number)
+
+def benchmark_fk_batch(num_samples=100000):
+    print(f"Four-leg FK over a {num_samples}-sample trajectory:")
+    rng = np.random.default_rng(0)
+    trajectory = rng.uniform(-1, 1, size=(num_samples, 12))
+    quadruped_kinematics = QuadrupedKinematics()
+
+    start = time.perf_counter()
+    for joint_angles in trajectory:
+        for leg, leg_angles in zip(quadruped_kinematics.legs, joint_angles.reshape(4, 3)):
+            leg.forward_kinematics(*leg_angles)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    quadruped_kinematics.forward_kinematics(trajectory)
+    batch_time = time.perf_counter() - start
+    print(f"  closed-form loop: {loop_time * 1e3:.1f} ms, batched: {batch_time * 1e3:.1f} ms")
+
+def finite_difference_jacobian(fk, theta1, theta2, theta3, step=1e-6):
+    """Forward differences: the FK position plus one extra FK call per joint."""
+    position = fk(theta1, theta2, theta3)
+    columns = (
+        fk(theta1 + step, theta2, theta3),
+        fk(theta1, theta2 + step, theta3),
+        fk(theta1, theta2, theta3 + step),
+    )
+    return position, (np.array(columns) - position).T / step
+
+def benchmark_jacobian(number=20000, num_samples=100000):
+    print(f"Leg Jacobian latency ({number} calls):")
+    rng = np.random.default_rng(0)
+    theta1, theta2, theta3 = (float(theta) for theta in rng.uniform(-1, 1, 3))
+    leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+    report("finite differences, 4x4 chain", timeit.timeit(lambda: finite_difference_jacobian(forward_kinematics_chain, theta1, theta2, theta3), number=number), number)
+    report("finite differences, closed form", timeit.timeit(lambda: finite_difference_jacobian(leg_kinematics.forward_kinematics, theta1, theta2, theta3), number=number), number)
+    report("analytic, with FK", timeit.timeit(lambda: leg_kinematics.forward_kinematics_jacobian(theta1, theta2, theta3), number=number), number)
+
+    trajectory = rng.uniform(-1, 1, size=(num_samples, 3))
+    start = time.perf_counter()
+    leg_kinematics.forward_kinematics_jacobian_batch(trajectory)
+    batch_time = time.perf_counter() - start
+    print(f"  analytic, {num_samples}-sample batch: {batch_time * 1e3:.1f} ms ({batch_time / num_samples * 1e9:.0f} ns/sample)")
+
+def benchmark_ik(number=5000, num_samples=100000, num_ticks=500):
+    print("Leg IK:")
+    rng = np.random.default_rng(0)
+    leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+    leg_ik = LegInverseKinematics(leg_kinematics)
+    targets = leg_kinematics.forward_kinematics_batch(rng.uniform(-1, 1, size=(num_samples, 3)))
+    report("analytic, one target", timeit.timeit(lambda: leg_ik.solve(targets[0]), number=number), number)
+    _, info = leg_ik.solve_batch(targets)
+    print(f"  analytic, {num_samples}-target batch: {info['latency'] * 1e3:.1f} ms ({info['latency'] / num_samples * 1e9:.0f} ns/target)")
+
+    # Damped least squares alone along a 50 Hz trajectory, cold vs warm started
+    time_stamps = np.arange(num_ticks) * 0.02
+    trajectory = np.stack([0.3 * np.sin(time_stamps), 0.5 + 0.3 * np.cos(time_stamps), -1.0 + 0.2 * np.sin(2 * time_stamps)], axis=-1)
+    trajectory_targets = leg_kinematics.forward_kinematics_batch(trajectory)
+    for label, seeds in [("cold start (zero seed)", np.zeros(3)), ("warm start (previous tick)", np.roll(trajectory, 1, axis=0))]:
+        start = time.perf_counter()
+        _, iterations = leg_ik.damped_least_squares(trajectory_targets, seeds)
+        elapsed = time.perf_counter() - start
+        print(f"  DLS {label:<28} {iterations.mean():5.1f} iterations (max {iterations.max()}), {elapsed / num_ticks * 1e6:.1f} us/target batched")
+
+def benchmark_workspace(number=5000):
+    print("Leg workspace map:")
+    rng = np.random.default_rng(0)
+    leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+    targets = leg_kinematics.forward_kinematics_batch(rng.uniform(-1, 1, size=(number, 3)))
+    with tempfile.TemporaryDirectory() as map_directory:
+        start = time.perf_counter()
+        build_workspace_map(leg_kinematics, map_directory)
+        build_time = time.perf_counter() - start
+        map_size = sum(os.path.getsize(os.path.join(map_directory, name)) for name in os.listdir(map_directory))
+        start = time.perf_counter()
+        workspace_map = WorkspaceMap(map_directory)
+        load_time = time.perf_counter() - start
+        print(f"  build: {build_time:.2f} s, {map_size / 1e6:.1f} MB on disk, memmap load: {load_time * 1e3:.2f} ms")
+
+        start = time.perf_counter()
+        for target in targets:
+            workspace_map.is_reachable(target)
+        report("is_reachable, one point", time.perf_counter() - start, number)
+        start = time.perf_counter()
+        workspace_map.is_reachable(targets)
+        report("is_reachable, batched", time.perf_counter() - start, number)
+        start = time.perf_counter()
+        for target in targets:
+            workspace_map.nearest_configuration(target)
+        report("nearest_configuration", time.perf_counter() - start, number)
+        # Brute force over every stored sample, for comparison
+        start = time.perf_counter()
+        for target in targets[:100]:
+            np.argmin(np.sum((workspace_map.positions - target) ** 2, axis=-1))
+        report("full scan of the samples", time.perf_counter() - start, 100)
+
+# The transform helpers as they were before lab_2_se3: np.cos / np.sin on
+# Python floats and a new array per call, constant angles included
+def legacy_rotation(axis, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    rotation = {"x": [[1, 0, 0], [0, c, -s], [0, s, c]], "y": [[c, 0, s], [0, 1, 0], [-s, 0, c]], "z": [[c, -s, 0], [s, c, 0], [0, 0, 1]]}[axis]
+    return np.array([rotation[0] + [0], rotation[1] + [0], rotation[2] + [0], [0, 0, 0, 1]])
+
+def legacy_translation(x, y, z):
+    return np.array([[1, 0, 0, x], [0, 1, 0, y], [0, 0, 1, z], [0, 0, 0, 1]])
+
+def legacy_forward_kinematics_chain(theta1, theta2, theta3, hip_offset=FRONT_LEFT_HIP_OFFSET):
+    T_0_1 = legacy_translation(*hip_offset) @ legacy_rotation("x", 1.57080) @ legacy_rotation("z", theta1)
+    T_1_2 = legacy_translation(0, 0, 0.04) @ legacy_rotation("z", -1.57080) @ legacy_rotation("y", 1.57080) @ legacy_rotation("x", 1.57080) @ legacy_rotation("z", theta2)
+    T_2_3 = legacy_translation(0.0, -0.0494, 0.0685) @ legacy_rotation("z", 3.14159) @ legacy_rotation("y", 1.57080) @ legacy_rotation("z", theta3)
+    T_0_ee = T_0_1 @ T_1_2 @ T_2_3 @ legacy_translation(0.06231, 0.06216, 0.018)
+    return T_0_ee[0:3, 3] * (1, -1, -1)
+
+def benchmark_se3(number=20000):
+    print(f"SE(3) helpers ({number} calls):")
+    rng = np.random.default_rng(0)
+    joint_angles = rng.uniform(-1, 1, 6)
+    theta1, theta2, theta3 = joint_angles[0:3].tolist()
+    buffer = rotation_z(0.0)
+    report("legacy rotation_z", timeit.timeit(lambda: legacy_rotation("z", theta1), number=number), number)
+    report("rotation_z", timeit.timeit(lambda: rotation_z(theta1), number=number), number)
+    report("rotation_z into a buffer", timeit.timeit(lambda: rotation_z(theta1, out=buffer), number=number), number)
+    report("sin/cos of 6 angles, math loop", timeit.timeit(lambda: [(math.cos(angle), math.sin(angle)) for angle in joint_angles.tolist()], number=number), number)
+    report("sin/cos of 6 angles, sincos", timeit.timeit(lambda: sincos(joint_angles), number=number), number)
+    transform_chain = LegTransformChain(FRONT_LEFT_HIP_OFFSET)
+    leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+    report("legacy 4x4 chain FK", timeit.timeit(lambda: legacy_forward_kinematics_chain(theta1, theta2, theta3), number=number), number)
+    report("forward_kinematics_chain", timeit.timeit(lambda: forward_kinematics_chain(theta1, theta2, theta3), number=number), number)
+    report("LegTransformChain (all frames)", timeit.timeit(lambda: transform_chain.update(theta1, theta2, theta3), number=number), number)
+    report("LegKinematics closed form", timeit.timeit(lambda: leg_kinematics.forward_kinematics(theta1, theta2, theta3), number=number), number)
+
+LOG_FIELDS = [('time_stamp', 1), ('theta1_f', 1), ('theta2_f', 1), ('theta3_f', 1), ('theta1_b', 1), ('theta2_b', 1), ('theta3_b', 1), ('end_effector_position_f', 3), ('end_effector_position_b', 3)]
+
+def make_log_dictionary(num_samples):
+    """A data_dictionary as the pickle logger used to build it, with one entry per tick."""
+    rng = np.random.default_rng(0)
+    data_dictionary = {name: rng.normal(size=num_samples).tolist() for name, width in LOG_FIELDS if width == 1}
+    data_dictionary['time_stamp'] = (0.02 * np.arange(num_samples)).tolist()
+    for name, width in LOG_FIELDS:
+        if width == 3:
+            data_dictionary[name] = list(rng.normal(size=(num_samples, 3)))
+    return data_dictionary
+
+def benchmark_log(run_lengths=(1000, 10000, 50000), num_ticks=5000):
+    print("Per-tick logging cost:")
+    with tempfile.TemporaryDirectory() as log_dir:
+        for num_samples in run_lengths:
+            data_dictionary = make_log_dictionary(num_samples)
+            start = time.perf_counter()
+            with open(os.path.join(log_dir, 'lab_2_data.pkl'), 'wb') as file_handle:
+                pickle.dump(data_dictionary, file_handle)
+            print(f"  full pickle rewrite after {num_samples:>6d} ticks: {(time.perf_counter() - start) * 1e3:>8.2f} ms/tick")
+
+        writer = StreamingLogWriter(os.path.join(log_dir, 'lab_2_data.bin'), LOG_FIELDS)
+        end_effector_position = np.array([0.1, 0.2, 0.3])
+        start = time.perf_counter()
+        for i in range(num_ticks):
+            writer.log(0.02 * i, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, end_effector_position, end_effector_position)
+        elapsed = time.perf_counter() - start
+        writer.close()
+        print(f"  streaming log, any run length:        {elapsed / num_ticks * 1e3:>8.4f} ms/tick")
+
+# Runs in a fresh interpreter so peak RSS only reflects one load
+LOAD_LOG_SCRIPT = """
+import json, resource, sys, time
+import numpy as np
+from lab_2_data_load import DataLoader
+start = time.perf_counter()
+if sys.argv[1]:
+    data_loader = DataLoader(sys.argv[1])
+    if len(sys.argv) > 2:
+        data_dictionary = data_loader.query(float(sys.argv[2]), float(sys.argv[3]))
+    else:
+        data_dictionary = data_loader.load()
+    # Touch what plot_leg_path uses
+    np.asarray(data_dictionary['time_stamp']).sum() + np.asarray(data_dictionary['end_effector_position_f'])[:, 2].sum()
+elapsed = time.perf_counter() - start
+try:
+    # ru_maxrss survives exec on Linux and would include the parent's peak
+    with open("/proc/self/status") as status:
+        max_rss_mb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM")) / 1024
+except OSError:
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"seconds": elapsed, "max_rss_mb": max_rss_mb}))
+"""
+
+def measure_load(filename, *window):
+    output = subprocess.run(
+        [sys.executable, "-c", LOAD_LOG_SCRIPT, filename, *[str(t) for t in window]],
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+def print_load(label, result):
+    print(f"  {label:<28} {result['seconds'] * 1e3:>7.1f} ms peak RSS {result['max_rss_mb']:>7.1f} MB")
+
+def benchmark_log_load(num_samples=50 * 3600):
+    print(f"Loading {num_samples} samples (1 h at 50 Hz):")
+    with tempfile.TemporaryDirectory() as log_dir:
+        pickle_filename = os.path.join(log_dir, 'lab_2_data.pkl')
+        with open(pickle_filename, 'wb') as file_handle:
+            pickle.dump(make_log_dictionary(num_samples), file_handle)
+        columnar_filename = os.path.join(log_dir, 'lab_2_data.col')
+        convert_to_columnar(pickle_filename, columnar_filename)
+
+        print_load("imports only", measure_load(""))
+        print_load("pickle", measure_load(pickle_filename))
+        print_load("columnar (memmap)", measure_load(columnar_filename))
+
+def benchmark_log_query(num_hours=4):
+    num_samples = 50 * 3600 * num_hours
+    print(f"One minute out of a {num_hours} h columnar log ({num_samples} samples):")
+    with tempfile.TemporaryDirectory() as log_dir:
+        columnar_filename = os.path.join(log_dir, 'lab_2_data.col')
+        rng = np.random.default_rng(0)
+        write_columnar_log(columnar_filename, {
+            'time_stamp': 0.02 * np.arange(num_samples),
+            'end_effector_position_f': rng.normal(size=(num_samples, 3)),
+        })
+        print_load("imports only", measure_load(""))
+        print_load("full run", measure_load(columnar_filename))
+        print_load("t in [120 s, 180 s]", measure_load(columnar_filename, 120.0, 180.0))
+
+def benchmark_rerun_replay(num_samples=50 * 3600, per_call_samples=20000):
+    # rerun is only needed for this benchmark
+    from vis_tool import Visualizer
+    print(f"Replaying {num_samples} samples (1 h at 50 Hz) of foot positions into rerun:")
+    rng = np.random.default_rng(0)
+    time_stamp = 0.02 * np.arange(num_samples)
+    end_effector_position = rng.normal(size=(num_samples, 3))
+    with tempfile.TemporaryDirectory() as log_dir:
+        vis = Visualizer(save_path=os.path.join(log_dir, 'per_call.rrd'))
+        start = time.perf_counter()
+        for i in range(per_call_samples):
+            vis.logPoints(end_effector_position[i:i + 1], log_path='/foot', log_time=time_stamp[i])
+        per_call_time = (time.perf_counter() - start) * num_samples / per_call_samples
+
+        vis = Visualizer(save_path=os.path.join(log_dir, 'batched.rrd'))
+        start = time.perf_counter()
+        vis.logPointsTimeSeries(time_stamp, end_effector_position[:, None, :], log_path='/foot')
+        batch_time = time.perf_counter() - start
+    print(f"  per-call logPoints: {per_call_time:.2f} s (extrapolated from {per_call_samples} calls)")
+    print(f"  logPointsTimeSeries: {batch_time:.2f} s")
+
+def benchmark_rerun_frames(num_ticks=500, num_frames=16):
+    from vis_tool import Visualizer
+    print(f"Logging {num_frames} coordinate frames per tick for {num_ticks} ticks into rerun:")
+    rng = np.random.default_rng(0)
+    world_T_frames = np.tile(np.eye(4), (num_frames, 1, 1))
+    world_T_frames[:, 0:3, 3] = rng.normal(size=(num_frames, 3))
+    log_paths = [f"pupper/frame_{k}" for k in range(num_frames)]
+    with tempfile.TemporaryDirectory() as log_dir:
+        vis = Visualizer(save_path=os.path.join(log_dir, 'per_frame.rrd'))
+        start = time.perf_counter()
+        for tick in range(num_ticks):
+            for world_T_frame, log_path in zip(world_T_frames, log_paths):
+                vis.logCoordinateFrame(world_T_frame, log_path, log_time=0.02 * tick)
+        per_frame_time = time.perf_counter() - start
+
+        vis = Visualizer(save_path=os.path.join(log_dir, 'batched.rrd'))
+        start = time.perf_counter()
+        for tick in range(num_ticks):
+            vis.logCoordinateFrames(world_T_frames, "pupper/frames", log_time=0.02 * tick)
+        batch_time = time.perf_counter() - start
+    print(f"  logCoordinateFrame per frame: {per_frame_time / num_ticks * 1e3:.2f} ms/tick")
+    print(f"  logCoordinateFrames:          {batch_time / num_ticks * 1e3:.2f} ms/tick")
+
+def benchmark_rerun_bridge(num_ticks=2000, tick_period=0.001):
+    from lab_2_rerun_bridge import RerunStreamBridge
+    from lab_2_kinematics import BACK_LEFT_HIP_OFFSET
+    from vis_tool import Visualizer
+    print(f"Streaming {num_ticks} FK ticks at {1 / tick_period:.0f} Hz through RerunStreamBridge:")
+    rng = np.random.default_rng(0)
+    joint_angles = rng.uniform(-1, 1, size=(num_ticks, 6))
+    legs = [("leg_front_l", LegKinematics(FRONT_LEFT_HIP_OFFSET)), ("leg_back_l", LegKinematics(BACK_LEFT_HIP_OFFSET))]
+    with tempfile.TemporaryDirectory() as log_dir:
+        bridge = RerunStreamBridge(Visualizer(save_path=os.path.join(log_dir, 'bridge.rrd')), legs, capacity=64)
+        push_times = np.empty(num_ticks)
+        for tick in range(num_ticks):
+            foot_positions = (legs[0][1].forward_kinematics(*joint_angles[tick, 0:3]), legs[1][1].forward_kinematics(*joint_angles[tick, 3:6]))
+            start = time.perf_counter()
+            bridge.push(tick * tick_period, joint_angles[tick], foot_positions)
+            push_times[tick] = time.perf_counter() - start
+            time.sleep(tick_period)
+        bridge.close()
+    print(f"  push: mean {push_times.mean() * 1e6:.2f} us, max {push_times.max() * 1e6:.2f} us")
+    print(f"  logged {bridge.num_logged} frames, dropped {bridge.num_dropped}")
+
+def quadruped_urdf():
+    """Four copies of the lab 2 leg chain as URDF joints (no mirroring, for timing only)."""
+    joints = []
+    for leg_name, hip_offset in LEG_HIP_OFFSETS.items():
+        chain = [
+            ("body", hip_offset, "1.5708 0 0", "revolute"),
+            (f"{leg_name}_1", (0, 0, L1_Z), "1.5708 1.5708 -1.5708", "revolute"),
+            (f"{leg_name}_2", L2_OFFSET, "0 1.5708 3.14159", "revolute"),
+            (f"{leg_name}_3", L3_OFFSET, "0 0 0", "fixed"),
+        ]
+        for (parent, xyz, rpy, joint_type), child in zip(chain, [f"{leg_name}_1", f"{leg_name}_2", f"{leg_name}_3", f"{leg_name}_foot"]):
+            joints.append(
+                f'<link name="{child}"/><joint name="{child}" type="{joint_type}"><parent link="{parent}"/><child link="{child}"/>'
+                f'<origin xyz="{" ".join(map(str, xyz))}" rpy="{rpy}"/><axis xyz="0 0 1"/></joint>'
+            )
+    return f'<robot name="pupper"><link name="body"/>{"".join(joints)}</robot>'
+
+def benchmark_urdf_fk(number=2000, num_samples=10000):
+    print("URDF kinematic tree vs hand-written four-leg FK:")
+    tree = KinematicTree(quadruped_urdf())
+    quadruped_kinematics = QuadrupedKinematics()
+    rng = np.random.default_rng(0)
+    joint_angles = rng.uniform(-1, 1, size=12)
+    trajectory = rng.uniform(-1, 1, size=(num_samples, 12))
+    report("tree, all link poses", timeit.timeit(lambda: tree.link_poses(joint_angles), number=number), number)
+    report("QuadrupedKinematics, feet only", timeit.timeit(lambda: quadruped_kinematics.forward_kinematics(joint_angles), number=number), number)
+    urdf_leg = UrdfLegKinematics(tree, ["leg_front_l_1", "leg_front_l_2", "leg_front_l_3"])
+    leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+    report("tree, one foot (link_point)", timeit.timeit(lambda: urdf_leg.forward_kinematics(*joint_angles[3:6]), number=number), number)
+    report("LegKinematics, one foot", timeit.timeit(lambda: leg_kinematics.forward_kinematics(*joint_angles[3:6]), number=number), number)
+    start = time.perf_counter()
+    tree.link_poses(trajectory)
+    tree_time = time.perf_counter() - start
+    start = time.perf_counter()
+    quadruped_kinematics.forward_kinematics(trajectory)
+    batch_time = time.perf_counter() - start
+    print(f"  {num_samples}-sample trajectory: tree {tree_time * 1e3:.1f} ms, QuadrupedKinematics {batch_time * 1e3:.1f} ms")
+
+BENCHMARKS = {
+    "fk": benchmark_fk,
+    "fk_batch": benchmark_fk_batch,
+    "ik": benchmark_ik,
+    "jacobian": benchmark_jacobian,
+    "log": benchmark_log,
+    "log_load": benchmark_log_load,
+    "log_query": benchmark_log_query,
+    "rerun_bridge": benchmark_rerun_bridge,
+    "rerun_frames": benchmark_rerun_frames,
+    "rerun_replay": benchmark_rerun_replay,
+    "se3": benchmark_se3,
+    "urdf_fk": benchmark_urdf_fk,
+    "workspace": benchmark_workspace,
+}
+
+
+######################### MAIN ##########################
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for lab 2")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark", help=f"any of {sorted(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {sorted(unknown)}")
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        try:
+            BENCHMARKS[name]()
+        except ImportError as error:
+            print(f"Skipping {name}: {error}")
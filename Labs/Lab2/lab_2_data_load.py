@@ -1,8 +1,9 @@
 # External libraries
-import pickle
 import math
 import matplotlib.pyplot as plt
 import numpy as np
+from lab_2_kinematics import QuadrupedKinematics
+from lab_2_logger import load_log
             
 # Utility for loading saved data
 class DataLoader:
@@ -10,43 +11,139 @@ class DataLoader:
     # Constructor
     def __init__(self, filename):
         self.filename = filename
+        self.data_dictionary = None
         
-    # Load a dictionary from file.
+    # Load a dictionary from file: a columnar log (memory-mapped, zero copy),
+    # a streaming log written by lab_2.py or a pickled dictionary.
     def load(self):
-        with open(self.filename, 'rb') as file_handle:
-            loaded_dict = pickle.load(file_handle)
+        loaded_dict = load_log(self.filename)
         return loaded_dict
-        
+
+    # Return the samples with t_start <= time_stamp <= t_end (either bound may be
+    # None), keeping every step-th one, e.g. query(120, 180, step=5).
+    # Time stamps are logged in increasing order, so the window is found by
+    # binary search over time_stamp; streaming and columnar logs are memmap
+    # views, so only the pages of that window are ever read.
+    def query(self, t_start=None, t_end=None, step=1, fields=None):
+        if step <= 0:
+            raise ValueError(f"step must be a positive integer, got {step}")
+        if self.data_dictionary is None:
+            self.data_dictionary = self.load()
+        time_stamp = self.data_dictionary['time_stamp']
+        start = 0 if t_start is None else int(np.searchsorted(time_stamp, t_start, 'left'))
+        stop = len(time_stamp) if t_end is None else int(np.searchsorted(time_stamp, t_end, 'right'))
+        window = slice(start, stop, step)
+        names = self.data_dictionary.keys() if fields is None else fields
+        return {name: self.data_dictionary[name][window] for name in names}
+
+# Re-run FK over a whole logged run in one vectorized pass
+def recompute_end_effector_positions(data_dictionary):
+    quadruped_kinematics = QuadrupedKinematics()
+    joint_angles_f = np.column_stack([data_dictionary['theta1_f'], data_dictionary['theta2_f'], data_dictionary['theta3_f']])
+    joint_angles_b = np.column_stack([data_dictionary['theta1_b'], data_dictionary['theta2_b'], data_dictionary['theta3_b']])
+    end_effector_position_f = quadruped_kinematics.forward_kinematics_leg('leg_front_l', joint_angles_f)
+    end_effector_position_b = quadruped_kinematics.forward_kinematics_leg('leg_back_l', joint_angles_b)
+    return end_effector_position_f, end_effector_position_b
+
+# Indices of the min and max of every column in each of num_buckets
+# consecutive buckets of samples, in increasing order. Drawing only these
+# samples keeps every peak of the full line. Short inputs are kept whole.
+def minmax_decimate(columns, num_buckets):
+    num_samples = len(columns[0])
+    if num_samples <= 2 * len(columns) * num_buckets:
+        return np.arange(num_samples)
+    bucket_size = -(-num_samples // num_buckets)
+    num_full_buckets = num_samples // bucket_size
+    full_size = num_full_buckets * bucket_size
+    bucket_starts = np.arange(num_full_buckets) * bucket_size
+    picks = [np.array([0, num_samples - 1])]
+    for column in columns:
+        column = np.asarray(column)
+        buckets = column[:full_size].reshape(num_full_buckets, bucket_size)
+        picks += [bucket_starts + buckets.argmin(axis=1), bucket_starts + buckets.argmax(axis=1)]
+        if full_size < num_samples:
+            tail = column[full_size:]
+            picks.append(full_size + np.array([tail.argmin(), tail.argmax()]))
+    return np.unique(np.concatenate(picks))
+
+# A line that only draws a min/max-decimated copy of its data, about one
+# bucket per horizontal pixel, and recomputes it for the visible range
+# whenever the axes are zoomed or panned. With sorted_x the visible samples
+# are found by binary search, otherwise by testing them against the view,
+# and the line is broken where the path leaves the view and comes back.
+class DecimatedLine:
+
+    def __init__(self, ax, x, y, sorted_x=False, **plot_kwargs):
+        self.ax = ax
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.sorted_x = sorted_x
+        self.line, = ax.plot([], [], **plot_kwargs)
+        # The axes only hold weak references to callbacks, the line keeps us alive
+        self.line.decimated_line = self
+        if len(self.x):
+            ax.update_datalim(np.array([[np.min(self.x), np.min(self.y)], [np.max(self.x), np.max(self.y)]]))
+            ax.autoscale_view()
+        self.update()
+        ax.callbacks.connect('xlim_changed', self.update)
+        if not sorted_x:
+            ax.callbacks.connect('ylim_changed', self.update)
+
+    def update(self, ax=None):
+        num_buckets = max(int(self.ax.get_window_extent().width), 1)
+        x_min, x_max = self.ax.get_xlim()
+        if self.sorted_x:
+            # Keep one sample past each edge so the line runs to the border
+            start = max(np.searchsorted(self.x, x_min, 'left') - 1, 0)
+            stop = min(np.searchsorted(self.x, x_max, 'right') + 1, len(self.x))
+            x = self.x[start:stop]
+            y = self.y[start:stop]
+        else:
+            y_min, y_max = self.ax.get_ylim()
+            inside = (self.x >= x_min) & (self.x <= x_max) & (self.y >= y_min) & (self.y <= y_max)
+            # Keep one sample on each side of every visible run so it runs to the border
+            kept = np.flatnonzero(inside | np.r_[inside[1:], False] | np.r_[False, inside[:-1]])
+            x = self.x[kept]
+            y = self.y[kept]
+            # The path leaves the view between runs; a NaN between them
+            # breaks the line instead of joining them with a false segment
+            starts_run = np.diff(kept, prepend=-2) > 1
+            run = np.cumsum(starts_run)
+            run_starts = np.flatnonzero(starts_run)
+            run_ends = np.r_[run_starts[1:], len(kept)] - 1
+            indices = np.union1d(minmax_decimate([x, y], num_buckets), np.r_[run_starts, run_ends])
+            gaps = np.flatnonzero(np.diff(run[indices])) + 1
+            self.line.set_data(np.insert(x[indices].astype(float), gaps, np.nan), np.insert(y[indices].astype(float), gaps, np.nan))
+            return
+        indices = minmax_decimate([x, y], num_buckets)
+        self.line.set_data(x[indices], y[indices])
+
 def plot_leg_path(data_dictionary):
-    time_stamp_list = data_dictionary['time_stamp']
-    theta1_f_list = data_dictionary['theta1_f']
-    theta2_f_list = data_dictionary['theta2_f']
-    theta3_f_list = data_dictionary['theta3_f']
-    theta1_b_list = data_dictionary['theta1_b']
-    theta2_b_list = data_dictionary['theta2_b']
-    theta3_b_list = data_dictionary['theta3_b']
-    end_effector_position_f = np.array(data_dictionary['end_effector_position_f'])
-    end_effector_position_b = data_dictionary['end_effector_position_b']
+    time_stamp_list = np.asarray(data_dictionary['time_stamp'])
+    end_effector_position_f = np.asarray(data_dictionary['end_effector_position_f'])
     x_ee_f =end_effector_position_f[:,0]
     y_ee_f =end_effector_position_f[:,1]
     z_ee_f =end_effector_position_f[:,2]
 
 
-    plt.plot(x_ee_f,z_ee_f)
-    plt.title('End Effector trajectory')
-    plt.xlabel('EE X(m)')
-    plt.ylabel('EE Z(m)')
+    fig, ax = plt.subplots()
+    DecimatedLine(ax, x_ee_f, z_ee_f)
+    ax.set_title('End Effector trajectory')
+    ax.set_xlabel('EE X(m)')
+    ax.set_ylabel('EE Z(m)')
     plt.show()
 
-    plt.plot(time_stamp_list,z_ee_f )
-    plt.title('End Effector Z vs Time')
-    plt.xlabel('Time(s)')
-    plt.ylabel('EE Z (m)')
+    fig, ax = plt.subplots()
+    DecimatedLine(ax, time_stamp_list, z_ee_f, sorted_x=True)
+    ax.set_title('End Effector Z vs Time')
+    ax.set_xlabel('Time(s)')
+    ax.set_ylabel('EE Z (m)')
     plt.show()
 
 
 
 ##### MAIN ######
-data_loader = DataLoader('./lab_2_datab.pkl')
-data_dictionary = data_loader.load()
-plot_leg_path(data_dictionary)
+if __name__ == "__main__":
+    data_loader = DataLoader('./lab_2_data.bin')
+    data_dictionary = data_loader.load()
+    plot_leg_path(data_dictionary)
@@ -0,0 +1,218 @@
+import math
+import time
+import numpy as np
+from lab_2_kinematics import L3_OFFSET, OUTPUT_FLIP
+from lab_2_se3 import from_affine_tuple, to_affine_tuple, transform_point
+
+# Damped least squares settings: starting and smallest damping (m), foot
+# position tolerance (m), and the smallest joint step (rad) and relative
+# error improvement per step before an unreachable target is given up on
+DLS_DAMPING = 1e-3
+DLS_TOLERANCE = 1e-9
+DLS_MIN_STEP = 1e-10
+DLS_MIN_IMPROVEMENT = 1e-6
+DLS_MAX_ITERATIONS = 100
+
+
+def _wrap(angle):
+    """Wrap angles to [-pi, pi)."""
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+
+def _solve_cos_sin(a, b, r):
+    """
+    Both solutions of a cos(theta) + b sin(theta) = r.
+
+    Works on floats (through math, which is much faster on scalars) and on
+    arrays. Ratios just outside [-1, 1] from rounding are clamped; targets
+    that are really out of range give nan.
+    """
+    if np.ndim(r) == 0:
+        ratio = r / math.hypot(a, b)
+        if abs(ratio) > 1 + 1e-12:
+            return math.nan, math.nan
+        offset = math.acos(min(max(ratio, -1.0), 1.0))
+        base = math.atan2(b, a)
+        return base + offset, base - offset
+    ratio = r / np.hypot(a, b)
+    ratio = np.where(np.abs(ratio) <= 1 + 1e-12, np.clip(ratio, -1.0, 1.0), np.nan)
+    offset = np.arccos(ratio)
+    base = np.arctan2(b, a)
+    return base + offset, base - offset
+
+
+class LegInverseKinematics:
+    """
+    IK for one Pupper leg, built on the constant link blocks of a LegKinematics.
+
+    Joint 1 turns about an axis through the joint 2 origin, so the leg has a
+    closed-form solution: the joint 2 to foot distance fixes theta3, the
+    foot height along the joint 1 axis then fixes theta2, and what is left
+    is the planar angle theta1. theta3 and theta2 have two branches each;
+    of the (up to) four exact solutions the one closest to the seed wins.
+    When theta3 and theta2 exist, theta1 always does, so a finite candidate
+    is an exact solution.
+
+    Targets out of reach have no exact solution and fall back to damped
+    least squares (with Levenberg-Marquardt style damping updates) from the
+    seed, which ends at a locally nearest reachable foot position. The seed
+    defaults to the previous solution, so a target moving along a
+    trajectory warm-starts from the last tick.
+
+    Like LegKinematics, the single-target methods run on Python floats and
+    the batch methods on (N, 3) arrays, through the same chain code.
+    """
+
+    def __init__(self, leg_kinematics, damping=DLS_DAMPING, tolerance=DLS_TOLERANCE, max_iterations=DLS_MAX_ITERATIONS, min_improvement=DLS_MIN_IMPROVEMENT):
+        self.leg_kinematics = leg_kinematics
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.min_improvement = min_improvement
+        self.last_solution = np.zeros(3)
+
+        T_1_2 = from_affine_tuple(leg_kinematics.T_1_2)
+        T_2_3 = from_affine_tuple(leg_kinematics.T_2_3)
+        if np.any(T_1_2[0:2, 3]):
+            raise ValueError("the closed form needs the joint 2 origin on the joint 1 axis")
+        # Output frame to the link 1 frame before the theta1 rotation
+        self.T_1_0 = to_affine_tuple(np.linalg.inv(OUTPUT_FLIP @ from_affine_tuple(leg_kinematics.T_0_1)))
+        self.T_1_2 = leg_kinematics.T_1_2
+        self.T_2_3 = leg_kinematics.T_2_3
+        self.joint_2_height = float(T_1_2[2, 3])
+        # Joint 1 axis seen from the joint 2 frame
+        self.axis_1_in_2 = tuple(float(value) for value in T_1_2[2, 0:3])
+        # |foot - joint 2 origin|^2 = a3 cos(theta3) + b3 sin(theta3) + distance_constant
+        t_2_3 = T_2_3[0:3, 3]
+        m = T_2_3[0:3, 0:3].T @ t_2_3
+        lx, ly, lz = L3_OFFSET
+        self.a3 = float(2 * (m[0] * lx + m[1] * ly))
+        self.b3 = float(2 * (m[1] * lx - m[0] * ly))
+        self.distance_constant = float(t_2_3 @ t_2_3 + lx ** 2 + ly ** 2 + lz ** 2 + 2 * m[2] * lz)
+
+    def _analytic_candidates(self, x, y, z):
+        """The four closed-form (theta1, theta2, theta3) for a target; nan where a branch has no solution."""
+        # math on floats, NumPy on arrays, as in LegKinematics
+        cos, sin, arctan2 = (math.cos, math.sin, math.atan2) if np.ndim(x) == 0 else (np.cos, np.sin, np.arctan2)
+        qx, qy, qz = transform_point(self.T_1_0, x, y, z)
+        lx, ly, lz = L3_OFFSET
+        wx, wy, wz = self.axis_1_in_2
+        dz = qz - self.joint_2_height
+        candidates = []
+        for theta3 in _solve_cos_sin(self.a3, self.b3, qx * qx + qy * qy + dz * dz - self.distance_constant):
+            c3, s3 = cos(theta3), sin(theta3)
+            # Foot in the joint 2 frame, before the theta2 rotation
+            vx, vy, vz = transform_point(self.T_2_3, c3 * lx - s3 * ly, s3 * lx + c3 * ly, lz)
+            for theta2 in _solve_cos_sin(wx * vx + wy * vy, wy * vx - wx * vy, dz - wz * vz):
+                c2, s2 = cos(theta2), sin(theta2)
+                # Foot in the link 1 frame before the theta1 rotation; theta1 turns it onto q
+                ux, uy, _ = transform_point(self.T_1_2, c2 * vx - s2 * vy, s2 * vx + c2 * vy, vz)
+                theta1 = arctan2(qy, qx) - arctan2(uy, ux)
+                candidates.append((_wrap(theta1), _wrap(theta2), _wrap(theta3)))
+        return candidates
+
+    def analytic_solutions(self, targets):
+        """All closed-form solutions of (N, 3) targets as (N, 4, 3) joint angles, nan where missing."""
+        targets = np.asarray(targets, dtype=float)
+        candidates = self._analytic_candidates(targets[..., 0], targets[..., 1], targets[..., 2])
+        return np.stack([np.stack(candidate, axis=-1) for candidate in candidates], axis=-2)
+
+    def damped_least_squares(self, targets, seeds):
+        """
+        Iterate dq = J^T (J J^T + damping^2 I)^-1 (target - fk(q)) from the
+        seeds on (N, 3) targets. A step that lowers the error is taken and
+        halves the damping (down to self.damping); one that does not is
+        retried with four times the damping. Rows stop once their foot is
+        within tolerance, their steps fall below DLS_MIN_STEP, or a taken
+        step lowers the error by less than self.min_improvement of it,
+        which is how unreachable targets end.
+
+        Returns the (N, 3) joint angles and the (N,) iteration counts.
+        """
+        targets = np.asarray(targets, dtype=float)
+        joint_angles = np.array(np.broadcast_to(seeds, targets.shape), dtype=float)
+        iterations = np.zeros(len(targets), dtype=int)
+        damping = np.full(len(targets), float(self.damping))
+        positions, jacobians = self.leg_kinematics.forward_kinematics_jacobian_batch(joint_angles)
+        errors = targets - positions
+        squared_errors = np.einsum("...i,...i", errors, errors)
+        active = np.flatnonzero(squared_errors > self.tolerance ** 2)
+        for _ in range(self.max_iterations):
+            if len(active) == 0:
+                break
+            J = jacobians[active]
+            J_transposed = np.swapaxes(J, -1, -2)
+            normal = J @ J_transposed + damping[active, None, None] ** 2 * np.eye(3)
+            steps = (J_transposed @ np.linalg.solve(normal, errors[active][..., None]))[..., 0]
+            trial_angles = joint_angles[active] + steps
+            trial_positions, trial_jacobians = self.leg_kinematics.forward_kinematics_jacobian_batch(trial_angles)
+            trial_errors = targets[active] - trial_positions
+            trial_squared_errors = np.einsum("...i,...i", trial_errors, trial_errors)
+            iterations[active] += 1
+
+            improved = trial_squared_errors < squared_errors[active]
+            # Compared as squared errors: (e - e') < k e  <=>  e'^2 > (1 - k)^2 e^2
+            stalled = improved & (trial_squared_errors > (1 - self.min_improvement) ** 2 * squared_errors[active])
+            accepted = active[improved]
+            joint_angles[accepted] = trial_angles[improved]
+            jacobians[accepted] = trial_jacobians[improved]
+            errors[accepted] = trial_errors[improved]
+            squared_errors[accepted] = trial_squared_errors[improved]
+            damping[active] = np.where(improved, np.maximum(damping[active] / 2, self.damping), damping[active] * 4)
+
+            moving = np.max(np.abs(steps), axis=-1) > DLS_MIN_STEP
+            active = active[moving & ~stalled & (squared_errors[active] > self.tolerance ** 2)]
+        return _wrap(joint_angles), iterations
+
+    def solve_batch(self, targets, seeds=None):
+        """
+        Joint angles (N, 3) for (N, 3) foot targets in the forward_kinematics frame.
+
+        seeds is (N, 3) or (3,) and defaults to the previous solution. Also
+        returns a dict with the per-target analytic (bool), iterations
+        (damped least squares iterations, 0 for analytic solves) and error
+        (m) arrays, and the latency (s) of the whole call.
+        """
+        start = time.perf_counter()
+        targets = np.asarray(targets, dtype=float).reshape(-1, 3)
+        seeds = np.broadcast_to(self.last_solution if seeds is None else seeds, targets.shape)
+        rows = np.arange(len(targets))
+
+        candidates = self.analytic_solutions(targets)
+        valid = np.all(np.isfinite(candidates), axis=-1)
+        distance = np.where(valid, np.linalg.norm(_wrap(candidates - seeds[:, None]), axis=-1), np.inf)
+        best = np.argmin(distance, axis=-1)
+        analytic = valid[rows, best]
+        joint_angles = candidates[rows, best]
+
+        iterations = np.zeros(len(targets), dtype=int)
+        if not np.all(analytic):
+            joint_angles[~analytic], iterations[~analytic] = self.damped_least_squares(targets[~analytic], seeds[~analytic])
+
+        error = np.linalg.norm(self.leg_kinematics.forward_kinematics_batch(joint_angles) - targets, axis=-1)
+        if len(targets):
+            self.last_solution = joint_angles[-1].copy()
+        info = {"analytic": analytic, "iterations": iterations, "error": error, "latency": time.perf_counter() - start}
+        return joint_angles, info
+
+    def solve(self, target, seed=None):
+        """Joint angles (3,) for one foot target; info as in solve_batch, with scalars."""
+        start = time.perf_counter()
+        x, y, z = (float(value) for value in target)
+        seed = self.last_solution if seed is None else np.asarray(seed, dtype=float)
+
+        candidates = np.array(self._analytic_candidates(x, y, z), dtype=float)
+        distance = np.sum(_wrap(candidates - seed) ** 2, axis=-1)
+        distance[np.isnan(distance)] = np.inf
+        best = int(np.argmin(distance))
+        analytic = bool(np.isfinite(distance[best]))
+        if analytic:
+            joint_angles = candidates[best]
+            iterations = 0
+        else:
+            joint_angles, iteration_counts = self.damped_least_squares(np.array([[x, y, z]]), seed)
+            joint_angles, iterations = joint_angles[0], int(iteration_counts[0])
+        self.last_solution = joint_angles
+        error = float(np.linalg.norm(self.leg_kinematics.forward_kinematics(*joint_angles) - (x, y, z)))
+        info = {"analytic": analytic, "iterations": iterations, "error": error, "latency": time.perf_counter() - start}
+        return joint_angles, info
@@ -0,0 +1,265 @@
+import collections
+import math
+import os
+import subprocess
+import xml.etree.ElementTree as ET
+import numpy as np
+from lab_2_kinematics import L3_OFFSET, OUTPUT_FLIP
+from lab_2_se3 import to_affine_tuple, transform_point, translation
+
+MOVABLE_JOINT_TYPES = ("revolute", "continuous", "prismatic")
+
+
+def _rpy_matrix(roll, pitch, yaw):
+    """URDF rpy convention: R = Rz(yaw) @ Ry(pitch) @ Rx(roll)."""
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.array(
+        [
+            [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+            [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+            [-sp, cp * sr, cp * cr],
+        ]
+    )
+
+
+def _origin_transform(joint):
+    """4x4 transform of a joint's <origin> element (identity if it has none)."""
+    origin = joint.find("origin")
+    xyz = [0.0, 0.0, 0.0]
+    rpy = [0.0, 0.0, 0.0]
+    if origin is not None:
+        xyz = [float(value) for value in origin.get("xyz", "0 0 0").split()]
+        rpy = [float(value) for value in origin.get("rpy", "0 0 0").split()]
+    T = np.eye(4)
+    T[0:3, 0:3] = _rpy_matrix(*rpy)
+    T[0:3, 3] = xyz
+    return T
+
+
+def _skew(axis):
+    x, y, z = axis
+    return np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+
+
+def load_robot_description(path, xacro_arguments=()):
+    """
+    URDF XML of a .urdf file, or of a .xacro file expanded with the xacro
+    command (which comes with ROS, e.g. for pupper_v3.urdf.xacro).
+    """
+    if not path.endswith(".xacro"):
+        with open(path) as file_handle:
+            return file_handle.read()
+    try:
+        return subprocess.run(["xacro", path, *xacro_arguments], check=True, capture_output=True, text=True).stdout
+    except FileNotFoundError as error:
+        raise RuntimeError("expanding a .xacro file needs the xacro command; source your ROS install first") from error
+
+
+def load_package_robot_description(package, relative_path, xacro_arguments=()):
+    """
+    load_robot_description of a file in a ROS package's share directory,
+    the same file a launch file finds with FindPackageShare.
+    """
+    from ament_index_python.packages import get_package_share_directory
+
+    return load_robot_description(os.path.join(get_package_share_directory(package), relative_path), xacro_arguments)
+
+
+class KinematicTree:
+    """
+    Forward kinematics of every link of a URDF.
+
+    The URDF is parsed once into flat arrays in topological (breadth-first)
+    order. Chains of fixed joints are multiplied out at construction, so
+    each movable joint stores one constant transform from the nearest
+    movable (or root) ancestor link to its own frame, and each fixed link
+    one constant transform from that ancestor. link_poses() then walks the
+    tree one depth level of movable joints at a time; all joints at the
+    same depth (e.g. the same joint of all four legs) are one batched
+    matmul, for any number of joint configurations at once.
+
+    joint_names sets the column order of the joint positions passed to
+    link_poses (default: movable joints in topological order).
+
+    link_point() is the per-tick path for one configuration: it walks only
+    the chain above one link, on Python floats, with the folded origins
+    cached as flattened 3x4 tuples as in LegKinematics.
+    """
+
+    def __init__(self, urdf, joint_names=None):
+        robot = ET.fromstring(urdf)
+        joints_by_child = {joint.find("child").get("link"): joint for joint in robot.findall("joint")}
+        child_joints = collections.defaultdict(list)
+        for joint in joints_by_child.values():
+            child_joints[joint.find("parent").get("link")].append(joint)
+        roots = [link.get("name") for link in robot.findall("link") if link.get("name") not in joints_by_child]
+        if len(roots) != 1:
+            raise ValueError(f"expected one root link, found {roots}")
+
+        # Breadth-first order, so every link comes after its parent
+        self.link_names = [roots[0]]
+        for link_name in self.link_names:
+            self.link_names.extend(joint.find("child").get("link") for joint in child_joints[link_name])
+        link_index = {link_name: index for index, link_name in enumerate(self.link_names)}
+
+        # Per link: the nearest ancestor that is the root or moves, the
+        # constant transform from it, and the number of movable joints above
+        anchor = [0] * len(self.link_names)
+        anchor_T_link = [np.eye(4)] * len(self.link_names)
+        depth = [0] * len(self.link_names)
+        moves = [False] * len(self.link_names)
+        movable = []
+        for index, link_name in enumerate(self.link_names[1:], start=1):
+            joint = joints_by_child[link_name]
+            joint_type = joint.get("type")
+            if joint_type not in MOVABLE_JOINT_TYPES and joint_type != "fixed":
+                raise ValueError(f"joint {joint.get('name')} has unsupported type {joint_type}")
+            parent = link_index[joint.find("parent").get("link")]
+            if parent == 0 or moves[parent]:
+                anchor[index] = parent
+                anchor_T_link[index] = _origin_transform(joint)
+            else:
+                # Fold the fixed joints above into one constant transform
+                anchor[index] = anchor[parent]
+                anchor_T_link[index] = anchor_T_link[parent] @ _origin_transform(joint)
+            moves[index] = joint_type in MOVABLE_JOINT_TYPES
+            depth[index] = depth[parent] + moves[index]
+            if moves[index]:
+                axis_element = joint.find("axis")
+                # URDF's default axis is x
+                axis = np.array([float(value) for value in axis_element.get("xyz").split()]) if axis_element is not None else np.array([1.0, 0.0, 0.0])
+                movable.append((index, joint.get("name"), joint_type == "prismatic", axis / np.linalg.norm(axis)))
+
+        tree_joint_names = [name for _, name, _, _ in movable]
+        self.joint_names = tree_joint_names if joint_names is None else list(joint_names)
+        if sorted(self.joint_names) != sorted(tree_joint_names):
+            raise ValueError(f"joint_names must be a permutation of the movable joints {tree_joint_names}")
+
+        # Movable joints as flat arrays, M = number of movable joints
+        self.movable_links = np.array([index for index, _, _, _ in movable], dtype=np.intp)
+        self.movable_anchors = np.array([anchor[index] for index in self.movable_links], dtype=np.intp)
+        self.movable_origins = np.array([anchor_T_link[index] for index in self.movable_links]).reshape(-1, 4, 4)
+        self.movable_columns = np.array([self.joint_names.index(name) for _, name, _, _ in movable], dtype=np.intp)
+        self.prismatic = np.array([is_prismatic for _, _, is_prismatic, _ in movable], dtype=bool)
+        self.axes = np.array([axis for _, _, _, axis in movable]).reshape(-1, 3)
+        self.axis_skew = np.array([_skew(axis) for axis in self.axes]).reshape(-1, 3, 3)
+        self.axis_skew_squared = self.axis_skew @ self.axis_skew
+        movable_depth = np.array([depth[index] for index in self.movable_links], dtype=np.intp)
+        self.levels = [np.flatnonzero(movable_depth == level) for level in range(1, movable_depth.max(initial=0) + 1)]
+
+        # Fixed links hang off their anchor through one cached transform
+        fixed_links = [index for index in range(1, len(self.link_names)) if not moves[index]]
+        self.fixed_links = np.array(fixed_links, dtype=np.intp)
+        self.fixed_anchors = np.array([anchor[index] for index in fixed_links], dtype=np.intp)
+        self.fixed_origins = np.array([anchor_T_link[index] for index in fixed_links]).reshape(-1, 4, 4)
+
+        # Child link of each movable joint, e.g. to find a leg's links by joint name
+        self.joint_links = {name: self.link_names[index] for index, name, _, _ in movable}
+        # For link_point: each link's step up to its anchor, as (joint position
+        # column or None if fixed, prismatic, axis, origin as a flattened 3x4
+        # tuple), and the steps of every link from its own frame to the root
+        steps = {}
+        for m, index in enumerate(self.movable_links.tolist()):
+            step = (int(self.movable_columns[m]), bool(self.prismatic[m]), tuple(self.axes[m].tolist()), to_affine_tuple(self.movable_origins[m]))
+            steps[index] = (step, int(self.movable_anchors[m]))
+        for f, index in enumerate(fixed_links):
+            steps[index] = ((None, False, None, to_affine_tuple(self.fixed_origins[f])), int(self.fixed_anchors[f]))
+        self._link_chains = {}
+        for index, link_name in enumerate(self.link_names):
+            chain = []
+            while index != 0:
+                step, index = steps[index]
+                chain.append(step)
+            self._link_chains[link_name] = chain
+
+    def _joint_motions(self, joint_positions):
+        """(..., M, 4, 4) motion of each movable joint (Rodrigues rotation or slide along the axis)."""
+        q = joint_positions[..., self.movable_columns]
+        angle = np.where(self.prismatic, 0.0, q)[..., None, None]
+        motion = np.zeros(q.shape + (4, 4))
+        motion[..., 0:3, 0:3] = np.eye(3) + np.sin(angle) * self.axis_skew + (1 - np.cos(angle)) * self.axis_skew_squared
+        motion[..., 0:3, 3] = np.where(self.prismatic, q, 0.0)[..., None] * self.axes
+        motion[..., 3, 3] = 1.0
+        return motion
+
+    def link_poses(self, joint_positions):
+        """
+        Poses of all links in the root frame.
+
+        joint_positions is (J,) or (N, J) in joint_names order; the result
+        is (L, 4, 4) or (N, L, 4, 4) in link_names order.
+        """
+        joint_positions = np.asarray(joint_positions, dtype=float)
+        batch_shape = joint_positions.shape[:-1]
+        poses = np.empty(batch_shape + (len(self.link_names), 4, 4))
+        poses[..., 0, :, :] = np.eye(4)
+        anchor_T_link = self.movable_origins @ self._joint_motions(joint_positions)
+        for level in self.levels:
+            poses[..., self.movable_links[level], :, :] = poses[..., self.movable_anchors[level], :, :] @ anchor_T_link[..., level, :, :]
+        if len(self.fixed_links):
+            poses[..., self.fixed_links, :, :] = poses[..., self.fixed_anchors, :, :] @ self.fixed_origins
+        return poses
+
+    def link_index(self, link_name):
+        return self.link_names.index(link_name)
+
+    def link_point(self, joint_positions, link_name, point=(0.0, 0.0, 0.0)):
+        """
+        Root frame (x, y, z) of a point fixed in one link, for one configuration.
+
+        joint_positions is indexed by joint_names column and only needs the
+        joints above the link (a dict of column -> position works too).
+        """
+        x, y, z = point
+        for column, prismatic, axis, origin in self._link_chains[link_name]:
+            if column is not None:
+                q = joint_positions[column]
+                kx, ky, kz = axis
+                if prismatic:
+                    x, y, z = x + q * kx, y + q * ky, z + q * kz
+                else:
+                    # Rodrigues: v cos(q) + (k x v) sin(q) + k (k . v)(1 - cos(q))
+                    c, s = math.cos(q), math.sin(q)
+                    k_dot_v = (kx * x + ky * y + kz * z) * (1 - c)
+                    x, y, z = (
+                        x * c + (ky * z - kz * y) * s + kx * k_dot_v,
+                        y * c + (kz * x - kx * z) * s + ky * k_dot_v,
+                        z * c + (kx * y - ky * x) * s + kz * k_dot_v,
+                    )
+            x, y, z = transform_point(origin, x, y, z)
+        return x, y, z
+
+
+class UrdfLegKinematics:
+    """
+    The LegKinematics interface (forward_kinematics, link_transforms) for
+    one leg of a KinematicTree, e.g. the Pupper URDF from robot_description.
+
+    joint_names are the leg's three joints, hip first; the foot sits at
+    foot_offset in the frame of the last joint's child link. Outputs are in
+    the same flipped root frame as LegKinematics.
+    """
+
+    def __init__(self, kinematic_tree, joint_names, foot_offset=L3_OFFSET):
+        self.kinematic_tree = kinematic_tree
+        self.columns = [kinematic_tree.joint_names.index(name) for name in joint_names]
+        self.links = [kinematic_tree.link_index(kinematic_tree.joint_links[name]) for name in joint_names]
+        self.foot_link = kinematic_tree.joint_links[joint_names[-1]]
+        self.foot_offset = tuple(foot_offset)
+        self.T_3_ee = translation(*self.foot_offset)
+
+    def forward_kinematics(self, theta1, theta2, theta3):
+        """End-effector position, through KinematicTree.link_point."""
+        x, y, z = self.kinematic_tree.link_point(dict(zip(self.columns, (theta1, theta2, theta3))), self.foot_link, self.foot_offset)
+        return np.array((x, -y, -z))
+
+    def link_transforms(self, joint_angles):
+        """(..., 4, 4, 4) poses of the three joint links and the foot, as LegKinematics.link_transforms."""
+        joint_angles = np.asarray(joint_angles, dtype=float)
+        joint_positions = np.zeros(joint_angles.shape[:-1] + (len(self.kinematic_tree.joint_names),))
+        joint_positions[..., self.columns] = joint_angles
+        poses = self.kinematic_tree.link_poses(joint_positions)[..., self.links, :, :]
+        foot = poses[..., -1:, :, :] @ self.T_3_ee
+        return OUTPUT_FLIP @ np.concatenate([poses, foot], axis=-3)
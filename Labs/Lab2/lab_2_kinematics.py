@@ -0,0 +1,310 @@
+import math
+import numpy as np
+from lab_2_se3 import (
+    compose, constant_rotation, from_affine_tuple, rotate_vector, rotation_z, rotation_z_sincos, to_affine_tuple, transform_point, translation,
+)
+
+# Stanford Pupper V3 Dimensions
+# Rounded quarter and half turns used by the link transforms. They are kept at
+# the same precision as the original chain so every FK path agrees with it.
+QUARTER_TURN = 1.57080
+HALF_TURN = 3.14159
+# Hip (leg_*_1) positions in base_link
+FRONT_LEFT_HIP_OFFSET = (0.07500, 0.0445, 0.0)
+BACK_LEFT_HIP_OFFSET = (-0.07500, 0.0445, 0.0)
+FRONT_RIGHT_HIP_OFFSET = (0.07500, -0.0445, 0.0)
+BACK_RIGHT_HIP_OFFSET = (-0.07500, -0.0445, 0.0)
+# Link 1 to link 2 offset along the hip axis
+L1_Z = 0.04
+# Link 2 (Upper Leg) Offsets
+L2_OFFSET = (0.0, -0.0494, 0.0685)
+# Link 3 (Lower Leg) Offsets
+L3_OFFSET = (0.06231, 0.06216, 0.018)
+
+# Legs in joint_state_broadcaster order (see lab_2.yaml), three joints each
+LEG_NAMES = ["leg_front_r", "leg_front_l", "leg_back_r", "leg_back_l"]
+JOINT_NAMES = [f"{leg_name}_{joint}" for leg_name in LEG_NAMES for joint in (1, 2, 3)]
+LEG_HIP_OFFSETS = {
+    "leg_front_r": FRONT_RIGHT_HIP_OFFSET,
+    "leg_front_l": FRONT_LEFT_HIP_OFFSET,
+    "leg_back_r": BACK_RIGHT_HIP_OFFSET,
+    "leg_back_l": BACK_LEFT_HIP_OFFSET,
+}
+# Mirrors the leg geometry through the base_link x-z plane
+MIRROR_Y = np.diag([1.0, -1.0, 1.0, 1.0])
+# The FK outputs are expressed in base_link with y and z flipped
+OUTPUT_FLIP = np.diag([1.0, -1.0, -1.0, 1.0])
+# Frames returned by LegKinematics.link_transforms, root to tip
+LINK_FRAME_NAMES = ["link_1", "link_2", "link_3", "foot"]
+
+
+def forward_kinematics_chain(theta1, theta2, theta3, hip_offset=FRONT_LEFT_HIP_OFFSET):
+    """Reference FK for a left leg, built from the full 4x4 transform chain."""
+    # T_0_1 (base_link to leg_*_1)
+    T_0_1 = translation(*hip_offset) @ constant_rotation("x", QUARTER_TURN) @ rotation_z(theta1)
+
+    # T_1_2 (leg_*_1 to leg_*_2)
+    T_1_2 = (
+        translation(0, 0, L1_Z) @ constant_rotation("z", -QUARTER_TURN) @ constant_rotation("y", QUARTER_TURN)
+        @ constant_rotation("x", QUARTER_TURN) @ rotation_z(theta2)
+    )
+
+    # T_2_3 (leg_*_2 to leg_*_3)
+    T_2_3 = translation(*L2_OFFSET) @ constant_rotation("z", HALF_TURN) @ constant_rotation("y", QUARTER_TURN) @ rotation_z(theta3)
+
+    # T_3_ee (leg_*_3 to end-effector)
+    T_3_ee = translation(*L3_OFFSET)
+
+    # Compute the final transformation
+    T_0_ee = T_0_1 @ T_1_2 @ T_2_3 @ T_3_ee
+
+    # Extract the end-effector position
+    end_effector_position = T_0_ee[0:3, 3]
+    end_effector_position[1] = -end_effector_position[1]
+    end_effector_position[2] = -end_effector_position[2]
+
+    return end_effector_position
+
+
+def _rotation_z_stack(theta):
+    """Rz(theta) for an array of angles, as a (..., 4, 4) stack."""
+    c = np.cos(theta)
+    s = np.sin(theta)
+    T = np.zeros(np.shape(theta) + (4, 4))
+    T[..., 0, 0] = c
+    T[..., 0, 1] = -s
+    T[..., 1, 0] = s
+    T[..., 1, 1] = c
+    T[..., 2, 2] = 1.0
+    T[..., 3, 3] = 1.0
+    return T
+
+
+def _leg_chain(T_0_1, T_1_2, T_2_3, c1, s1, c2, s2, c3, s3):
+    """Foot position from the constant link blocks and the joint cos/sin."""
+    x, y, z = L3_OFFSET
+
+    x, y = c3 * x - s3 * y, s3 * x + c3 * y
+    x, y, z = transform_point(T_2_3, x, y, z)
+
+    x, y = c2 * x - s2 * y, s2 * x + c2 * y
+    x, y, z = transform_point(T_1_2, x, y, z)
+
+    x, y = c1 * x - s1 * y, s1 * x + c1 * y
+    x, y, z = transform_point(T_0_1, x, y, z)
+
+    return x, -y, -z
+
+
+def _leg_chain_jacobian(T_0_1, T_1_2, T_2_3, c1, s1, c2, s2, c3, s3):
+    """
+    Foot position and its derivatives with respect to theta1..3.
+
+    Follows _leg_chain. Rotating a point (x, y, z) by Rz(theta) has the
+    derivative (-y, x, 0), so each joint's column starts as that vector
+    right after its rotation and is carried through the rest of the chain
+    by the rotation parts of the same blocks that move the point.
+    Returns (x, y, z) and the three columns as (x, y, z) tuples.
+    """
+    x, y, z = L3_OFFSET
+
+    x, y = c3 * x - s3 * y, s3 * x + c3 * y
+    d3 = (-y, x, 0.0)
+    x, y, z = transform_point(T_2_3, x, y, z)
+    d3 = rotate_vector(T_2_3, *d3)
+
+    x, y = c2 * x - s2 * y, s2 * x + c2 * y
+    d3 = (c2 * d3[0] - s2 * d3[1], s2 * d3[0] + c2 * d3[1], d3[2])
+    d2 = (-y, x, 0.0)
+    x, y, z = transform_point(T_1_2, x, y, z)
+    d2 = rotate_vector(T_1_2, *d2)
+    d3 = rotate_vector(T_1_2, *d3)
+
+    x, y = c1 * x - s1 * y, s1 * x + c1 * y
+    d2 = (c1 * d2[0] - s1 * d2[1], s1 * d2[0] + c1 * d2[1], d2[2])
+    d3 = (c1 * d3[0] - s1 * d3[1], s1 * d3[0] + c1 * d3[1], d3[2])
+    d1 = (-y, x, 0.0)
+    x, y, z = transform_point(T_0_1, x, y, z)
+    columns = [rotate_vector(T_0_1, *d) for d in (d1, d2, d3)]
+
+    return (x, -y, -z), [(dx, -dy, -dz) for dx, dy, dz in columns]
+
+
+class LegKinematics:
+    """
+    Closed-form FK for one Pupper leg.
+
+    Only the three Rz(theta) factors of the chain in forward_kinematics_chain
+    depend on the joint angles. The constant blocks between them are
+    multiplied out once here, so FK reduces to three planar rotations and
+    three 3x4 transforms evaluated on Python floats.
+
+    Right legs (mirror=True) are modelled as the mirror image of the left
+    leg geometry through the x-z plane at the same joint angles. This is an
+    assumption, not checked against the pupper_v3 URDF; see
+    QuadrupedKinematics.
+    """
+
+    def __init__(self, hip_offset, mirror=False):
+        self.hip_offset = hip_offset
+        self.mirror = mirror
+        mirror_block = MIRROR_Y if mirror else np.eye(4)
+        self.T_0_1 = to_affine_tuple(translation(*hip_offset) @ mirror_block @ constant_rotation("x", QUARTER_TURN))
+        self.T_1_2 = to_affine_tuple(
+            translation(0, 0, L1_Z) @ constant_rotation("z", -QUARTER_TURN) @ constant_rotation("y", QUARTER_TURN) @ constant_rotation("x", QUARTER_TURN)
+        )
+        self.T_2_3 = to_affine_tuple(translation(*L2_OFFSET) @ constant_rotation("z", HALF_TURN) @ constant_rotation("y", QUARTER_TURN))
+
+    def forward_kinematics(self, theta1, theta2, theta3):
+        """Return the end-effector position, matching forward_kinematics_chain."""
+        return np.array(
+            _leg_chain(
+                self.T_0_1, self.T_1_2, self.T_2_3,
+                math.cos(theta1), math.sin(theta1),
+                math.cos(theta2), math.sin(theta2),
+                math.cos(theta3), math.sin(theta3),
+            )
+        )
+
+    def forward_kinematics_batch(self, joint_angles):
+        """End-effector positions (..., 3) for (..., 3) joint angles."""
+        theta = np.ascontiguousarray(np.moveaxis(np.asarray(joint_angles, dtype=float), -1, 0))
+        c = np.cos(theta)
+        s = np.sin(theta)
+        return np.stack(_leg_chain(self.T_0_1, self.T_1_2, self.T_2_3, c[0], s[0], c[1], s[1], c[2], s[2]), axis=-1)
+
+    def forward_kinematics_jacobian(self, theta1, theta2, theta3):
+        """
+        End-effector position (3,) and its 3x3 Jacobian with respect to
+        (theta1, theta2, theta3), from one pass over the chain.
+        """
+        position, columns = _leg_chain_jacobian(
+            self.T_0_1, self.T_1_2, self.T_2_3,
+            math.cos(theta1), math.sin(theta1),
+            math.cos(theta2), math.sin(theta2),
+            math.cos(theta3), math.sin(theta3),
+        )
+        return np.array(position), np.array(columns).T
+
+    def forward_kinematics_jacobian_batch(self, joint_angles):
+        """Positions (..., 3) and Jacobians (..., 3, 3) for (..., 3) joint angles."""
+        # Joint axis first so each joint's angles are contiguous
+        theta = np.ascontiguousarray(np.moveaxis(np.asarray(joint_angles, dtype=float), -1, 0))
+        c = np.cos(theta)
+        s = np.sin(theta)
+        position, columns = _leg_chain_jacobian(self.T_0_1, self.T_1_2, self.T_2_3, c[0], s[0], c[1], s[1], c[2], s[2])
+        jacobian = np.empty(theta.shape[1:] + (3, 3))
+        for joint, column in enumerate(columns):
+            for axis in range(3):
+                jacobian[..., axis, joint] = column[axis]
+        return np.stack(position, axis=-1), jacobian
+
+    def link_transforms(self, joint_angles):
+        """
+        Poses of the LINK_FRAME_NAMES frames for (..., 3) joint angles.
+
+        Returns a (..., 4, 4, 4) stack of homogeneous transforms in the same
+        flipped base_link frame as forward_kinematics, so the last frame's
+        translation is the foot position. For mirrored legs the rotation blocks
+        are reflections, not rotations.
+        """
+        joint_angles = np.asarray(joint_angles, dtype=float)
+        rotations = _rotation_z_stack(joint_angles)
+        T_0_1 = OUTPUT_FLIP @ from_affine_tuple(self.T_0_1) @ rotations[..., 0, :, :]
+        T_0_2 = T_0_1 @ from_affine_tuple(self.T_1_2) @ rotations[..., 1, :, :]
+        T_0_3 = T_0_2 @ from_affine_tuple(self.T_2_3) @ rotations[..., 2, :, :]
+        T_0_ee = T_0_3 @ translation(*L3_OFFSET)
+        return np.stack([T_0_1, T_0_2, T_0_3, T_0_ee], axis=-3)
+
+
+class LegTransformChain:
+    """
+    The 4x4 chain of forward_kinematics_chain on preallocated buffers.
+
+    The constant blocks between the joint rotations are multiplied out once
+    in the constructor. Each update() writes math.cos / math.sin of the three
+    joint angles into the three Rz buffers and multiplies
+    the chain into the T_0_1 ... T_0_ee buffers, so a tick allocates no
+    transforms. The buffers are overwritten by the next update(); copy them
+    to keep them.
+    """
+
+    def __init__(self, hip_offset=FRONT_LEFT_HIP_OFFSET):
+        self.hip_offset = hip_offset
+        self.T_0_1_constant = translation(*hip_offset) @ constant_rotation("x", QUARTER_TURN)
+        self.T_1_2_constant = compose(
+            translation(0, 0, L1_Z), constant_rotation("z", -QUARTER_TURN), constant_rotation("y", QUARTER_TURN), constant_rotation("x", QUARTER_TURN)
+        )
+        self.T_2_3_constant = compose(translation(*L2_OFFSET), constant_rotation("z", HALF_TURN), constant_rotation("y", QUARTER_TURN))
+        self.T_3_ee = translation(*L3_OFFSET)
+        self.joint_rotations = [rotation_z(0.0) for _ in range(3)]
+        self.T_0_1, self.T_0_2, self.T_0_3, self.T_0_ee = (np.empty((4, 4)) for _ in range(4))
+        self._scratch = np.empty((4, 4))
+
+    def update(self, theta1, theta2, theta3):
+        """Recompute the link frames in base_link; returns the T_0_ee buffer."""
+        rotation_1, rotation_2, rotation_3 = self.joint_rotations
+        rotation_z_sincos(math.cos(theta1), math.sin(theta1), out=rotation_1)
+        rotation_z_sincos(math.cos(theta2), math.sin(theta2), out=rotation_2)
+        rotation_z_sincos(math.cos(theta3), math.sin(theta3), out=rotation_3)
+        np.matmul(self.T_0_1_constant, rotation_1, out=self.T_0_1)
+        np.matmul(self.T_0_1, self.T_1_2_constant, out=self._scratch)
+        np.matmul(self._scratch, rotation_2, out=self.T_0_2)
+        np.matmul(self.T_0_2, self.T_2_3_constant, out=self._scratch)
+        np.matmul(self._scratch, rotation_3, out=self.T_0_3)
+        np.matmul(self.T_0_3, self.T_3_ee, out=self.T_0_ee)
+        return self.T_0_ee
+
+    def forward_kinematics(self, theta1, theta2, theta3):
+        """End-effector position, matching forward_kinematics_chain."""
+        return self.update(theta1, theta2, theta3)[0:3, 3] * (1.0, -1.0, -1.0)
+
+
+class QuadrupedKinematics:
+    """
+    Vectorized FK for all four Pupper legs.
+
+    Uses the same constant link blocks as LegKinematics, stacked per leg, so
+    a whole trajectory of joint angles is evaluated in one NumPy pass.
+
+    Limitation: the right legs use LegKinematics(mirror=True), i.e. they are
+    assumed to be the x-z reflection of the left leg at the same joint
+    angles. That has not been verified against the pupper_v3 URDF (the joint
+    axis signs of the right legs may differ), and the unit tests only check
+    that the reflection is self-consistent. Compare against
+    UrdfLegKinematics on the real robot_description before relying on the
+    right-leg results.
+    """
+
+    def __init__(self, hip_offsets=LEG_HIP_OFFSETS):
+        self.leg_names = list(LEG_NAMES)
+        self.legs = [LegKinematics(hip_offsets[leg_name], mirror=leg_name.endswith("_r")) for leg_name in self.leg_names]
+        # Hip blocks stacked as (12, 4) so each entry broadcasts over (N, 4)
+        # joint angle columns; the other blocks are shared by all legs
+        self.T_0_1 = np.array([leg.T_0_1 for leg in self.legs]).T
+        self.T_1_2 = self.legs[0].T_1_2
+        self.T_2_3 = self.legs[0].T_2_3
+
+    def _forward_kinematics(self, theta, T_0_1):
+        # Joint axis first so each joint's angles are contiguous
+        theta = np.ascontiguousarray(np.moveaxis(theta, -1, 0))
+        c = np.cos(theta)
+        s = np.sin(theta)
+        position = _leg_chain(T_0_1, self.T_1_2, self.T_2_3, c[0], s[0], c[1], s[1], c[2], s[2])
+        return np.stack(position, axis=-1)
+
+    def forward_kinematics(self, joint_angles):
+        """
+        Foot positions for all legs.
+
+        joint_angles is (N, 12) (or (12,)) in JOINT_NAMES order; the result is
+        (N, 4, 3) (or (4, 3)) in LEG_NAMES order.
+        """
+        joint_angles = np.asarray(joint_angles, dtype=float)
+        theta = joint_angles.reshape(joint_angles.shape[:-1] + (len(self.leg_names), 3))
+        return self._forward_kinematics(theta, self.T_0_1)
+
+    def forward_kinematics_leg(self, leg_name, joint_angles):
+        """Foot positions (N, 3) of one leg from its (N, 3) joint angles."""
+        leg = self.legs[self.leg_names.index(leg_name)]
+        return self._forward_kinematics(np.asarray(joint_angles, dtype=float), leg.T_0_1)
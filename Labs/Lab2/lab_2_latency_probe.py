@@ -0,0 +1,71 @@
+import collections
+import os
+import sys
+import time
+import rclpy
+from rclpy.node import Node
+from sensor_msgs.msg import JointState
+from visualization_msgs.msg import Marker
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from lab_common.instrumentation import DurationHistogram
+from lab_common.qos import DEFAULT_JOINT_STATES_QOS, JOINT_STATES_QOS
+
+# Joint state arrival times kept for matching markers against
+MAX_PENDING_STAMPS = 1000
+
+
+class LatencyProbe(Node):
+    """
+    Measures how long a joint state takes to come back out as a marker.
+
+    The FK node stamps each marker with the JointState it was computed from.
+    The probe subscribes to both topics and records, per marker:
+      joint_state_to_marker: marker arrival - arrival of that joint state here
+      stamp_to_marker:       marker arrival (ROS clock) - joint state stamp
+    Run it once with the default joint_states_qos (sensor_data) and once
+    with joint_states_qos:=default to compare.
+    """
+
+    def __init__(self):
+        super().__init__("lab_2_latency_probe")
+        joint_states_qos = self.declare_parameter("joint_states_qos", DEFAULT_JOINT_STATES_QOS).value
+        self.create_subscription(JointState, "joint_states", self.joint_state_callback, JOINT_STATES_QOS[joint_states_qos])
+        self.create_subscription(Marker, "marker", self.marker_callback, 10)
+        # (sec, nanosec) stamp -> perf_counter() arrival time
+        self.joint_state_arrivals = collections.OrderedDict()
+        self.joint_state_to_marker = DurationHistogram("joint_state_to_marker", bin_width=1e-4, max_duration=0.2)
+        self.stamp_to_marker = DurationHistogram("stamp_to_marker", bin_width=1e-4, max_duration=0.2)
+        self.create_timer(5.0, self.report)
+
+    def joint_state_callback(self, msg):
+        self.joint_state_arrivals[(msg.header.stamp.sec, msg.header.stamp.nanosec)] = time.perf_counter()
+        if len(self.joint_state_arrivals) > MAX_PENDING_STAMPS:
+            self.joint_state_arrivals.popitem(last=False)
+
+    def marker_callback(self, msg):
+        arrival = time.perf_counter()
+        stamp = msg.header.stamp
+        self.stamp_to_marker.record((self.get_clock().now().nanoseconds - (stamp.sec * 10**9 + stamp.nanosec)) * 1e-9)
+        # pop, so a marker republished by the FK timer for the same joint
+        # state is not recorded again with a longer delay
+        joint_state_arrival = self.joint_state_arrivals.pop((stamp.sec, stamp.nanosec), None)
+        if joint_state_arrival is not None:
+            self.joint_state_to_marker.record(arrival - joint_state_arrival)
+
+    def report(self):
+        self.get_logger().info(self.joint_state_to_marker.summary())
+        self.get_logger().info(self.stamp_to_marker.summary())
+
+
+def main(args=None):
+    rclpy.init(args=args)
+    latency_probe = LatencyProbe()
+    try:
+        rclpy.spin(latency_probe)
+    except KeyboardInterrupt:
+        latency_probe.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import pickle
+import queue
+import struct
+import threading
+import numpy as np
+
+# Streaming log layout: LOG_MAGIC, a little-endian uint32 header length, a
+# JSON header padded to a multiple of 8 bytes, then fixed-size float64
+# records appended one chunk at a time.
+LOG_MAGIC = b"LAB2LOG1"
+LOG_DTYPE = np.dtype("<f8")
+# Columnar log layout: COLUMNAR_MAGIC, a little-endian uint32 header length, a
+# JSON header padded to a multiple of COLUMN_ALIGNMENT bytes, then one
+# contiguous float64 column (or (N, width) block) per field, each starting
+# at a multiple of COLUMN_ALIGNMENT bytes.
+COLUMNAR_MAGIC = b"LAB2COL1"
+COLUMN_ALIGNMENT = 64
+
+
+def _encode_header(header, magic=LOG_MAGIC, alignment=8):
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad so the data starts aligned
+    prefix_size = len(magic) + 4
+    header_bytes += b" " * (-(prefix_size + len(header_bytes)) % alignment)
+    return magic + struct.pack("<I", len(header_bytes)) + header_bytes
+
+
+def read_log_header(file_handle, magic=LOG_MAGIC):
+    """Read the JSON header of a log file; returns (header, data_offset)."""
+    if file_handle.read(len(magic)) != magic:
+        raise ValueError(f"{getattr(file_handle, 'name', 'file')} is not a {magic.decode()} file")
+    (header_size,) = struct.unpack("<I", file_handle.read(4))
+    header = json.loads(file_handle.read(header_size).decode("utf-8"))
+    return header, len(magic) + 4 + header_size
+
+
+class StreamingLogWriter:
+    """
+    Append-only log of fixed-size float64 records.
+
+    log() only copies one record into a preallocated chunk. Full chunks are
+    handed to a background thread that appends them to the file and fsyncs
+    it, so the per-tick cost stays constant however long the run gets. A
+    crash loses the chunk that was being filled and the full chunks still
+    queued for the writer, at most max_chunks of them in all.
+
+    If the writer falls behind, up to max_chunks chunks are kept in memory;
+    past that the rows of further chunks are dropped and counted in
+    num_dropped_rows. If writing fails (e.g. the disk is full), the next
+    log() that fills a chunk, flush() or close() raises a RuntimeError from
+    the writer's error.
+
+    fields is a list of (name, width) pairs, e.g. [('time_stamp', 1),
+    ('end_effector_position_f', 3)].
+    """
+
+    def __init__(self, filename, fields, chunk_size=50, max_chunks=64):
+        self.filename = filename
+        self.fields = [(name, int(width)) for name, width in fields]
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.num_dropped_rows = 0
+        self._slices = []
+        record_width = 0
+        for _, width in self.fields:
+            self._slices.append(slice(record_width, record_width + width))
+            record_width += width
+        self.record_width = record_width
+
+        self._file = open(filename, "wb")
+        self._file.write(_encode_header({"fields": self.fields, "record_width": record_width, "dtype": LOG_DTYPE.str}))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        # Chunks cycle between the logging thread and the writer thread
+        self._free_chunks = queue.SimpleQueue()
+        self._full_chunks = queue.SimpleQueue()
+        self._num_chunks = 2
+        for _ in range(self._num_chunks):
+            self._free_chunks.put(np.empty((chunk_size, record_width), dtype=LOG_DTYPE))
+        self._chunk = self._free_chunks.get()
+        self._num_rows = 0
+        self._closed = False
+        # Set by the writer thread if writing fails; it stops writing after that
+        self._writer_error = None
+        self._writer_thread = threading.Thread(target=self._write_chunks, name="lab_2_log_writer", daemon=True)
+        self._writer_thread.start()
+
+    def log(self, *values):
+        """Append one record; values are given in field order."""
+        row = self._chunk[self._num_rows]
+        for field_slice, value in zip(self._slices, values):
+            row[field_slice] = value
+        self._num_rows += 1
+        if self._num_rows == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Hand the rows logged so far to the writer thread."""
+        self._check_writer()
+        if self._num_rows == 0:
+            return
+        try:
+            next_chunk = self._free_chunks.get_nowait()
+        except queue.Empty:
+            if self._num_chunks == self.max_chunks:
+                # The writer is too far behind; drop these rows rather than block the caller
+                self.num_dropped_rows += self._num_rows
+                self._num_rows = 0
+                return
+            # The writer is behind; grow the pool rather than block the caller
+            next_chunk = np.empty((self.chunk_size, self.record_width), dtype=LOG_DTYPE)
+            self._num_chunks += 1
+        self._full_chunks.put((self._chunk, self._num_rows))
+        self._chunk = next_chunk
+        self._num_rows = 0
+
+    def _check_writer(self):
+        if self._writer_error is not None:
+            raise RuntimeError(f"writing {self.filename} failed; rows logged since then are lost") from self._writer_error
+
+    def close(self):
+        """Write out any buffered rows and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            self._full_chunks.put(None)
+            self._writer_thread.join()
+            self._file.close()
+        self._check_writer()
+
+    def _write_chunks(self):
+        while True:
+            item = self._full_chunks.get()
+            if item is None:
+                return
+            chunk, num_rows = item
+            try:
+                self._file.write(memoryview(chunk[:num_rows]).cast("B"))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except Exception as error:
+                self._writer_error = error
+                return
+            self._free_chunks.put(chunk)
+
+
+def load_streaming_log(filename):
+    """
+    Open a StreamingLogWriter file as a dict of read-only np.memmap views.
+
+    The records are fixed-size after the header, so the file is mapped as
+    one (N, record_width) block and nothing is read until a field is
+    accessed, and then only the pages that are touched. Width-1 fields
+    become (N,) views and wider fields (N, width) views. A torn record at
+    the end of the file (e.g. after a crash) is ignored.
+    """
+    with open(filename, "rb") as file_handle:
+        header, data_offset = read_log_header(file_handle)
+    record_width = header["record_width"]
+    dtype = np.dtype(header["dtype"])
+    num_records = (os.path.getsize(filename) - data_offset) // (record_width * dtype.itemsize)
+    if num_records == 0:
+        records = np.zeros((0, record_width), dtype=dtype)
+    else:
+        records = np.memmap(filename, dtype=dtype, mode="r", offset=data_offset, shape=(num_records, record_width))
+
+    data_dictionary = {}
+    column = 0
+    for name, width in header["fields"]:
+        data_dictionary[name] = records[:, column] if width == 1 else records[:, column : column + width]
+        column += width
+    return data_dictionary
+
+
+def write_columnar_log(filename, data_dictionary):
+    """
+    Write a dict of equal-length fields as a columnar log.
+
+    Each field is stored as one contiguous float64 block: (N,) for scalar
+    fields and (N, width) for vector fields such as end-effector positions.
+    """
+    columns = []
+    offset = 0
+    for name, values in data_dictionary.items():
+        column = np.ascontiguousarray(np.asarray(values, dtype=LOG_DTYPE))
+        width = 1 if column.ndim == 1 else column.shape[1]
+        columns.append((name, width, offset, column))
+        offset += column.nbytes + (-column.nbytes % COLUMN_ALIGNMENT)
+
+    num_records = {len(column) for _, _, _, column in columns}
+    if len(num_records) > 1:
+        raise ValueError(f"fields have different lengths: {sorted(num_records)}")
+    header = {
+        "num_records": num_records.pop() if num_records else 0,
+        "dtype": LOG_DTYPE.str,
+        "fields": [[name, width, offset] for name, width, offset, _ in columns],
+    }
+    with open(filename, "wb") as file_handle:
+        file_handle.write(_encode_header(header, COLUMNAR_MAGIC, COLUMN_ALIGNMENT))
+        for _, _, _, column in columns:
+            column.tofile(file_handle)
+            file_handle.write(b"\0" * (-column.nbytes % COLUMN_ALIGNMENT))
+
+
+def load_columnar_log(filename):
+    """
+    Open a columnar log as a dict of read-only np.memmap columns.
+
+    Nothing is read until a column is accessed, and then only the pages
+    that are touched.
+    """
+    with open(filename, "rb") as file_handle:
+        header, data_offset = read_log_header(file_handle, COLUMNAR_MAGIC)
+    num_records = header["num_records"]
+    dtype = np.dtype(header["dtype"])
+
+    data_dictionary = {}
+    for name, width, offset in header["fields"]:
+        shape = (num_records,) if width == 1 else (num_records, width)
+        if num_records == 0:
+            data_dictionary[name] = np.zeros(shape, dtype=dtype)
+        else:
+            data_dictionary[name] = np.memmap(filename, dtype=dtype, mode="r", offset=data_offset + offset, shape=shape)
+    return data_dictionary
+
+
+def load_log(filename):
+    """Load a columnar log, a streaming log or a pickled data_dictionary."""
+    with open(filename, "rb") as file_handle:
+        magic = file_handle.read(len(LOG_MAGIC))
+    if magic == COLUMNAR_MAGIC:
+        return load_columnar_log(filename)
+    if magic == LOG_MAGIC:
+        return load_streaming_log(filename)
+    with open(filename, "rb") as file_handle:
+        return pickle.load(file_handle)
+
+
+def convert_to_columnar(source_filename, filename):
+    """Convert a .pkl data_dictionary or a streaming log into a columnar log."""
+    write_columnar_log(filename, load_log(source_filename))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a Lab 2 log (.pkl or streaming .bin) into the columnar format")
+    parser.add_argument("source", help="existing .pkl or streaming .bin log")
+    parser.add_argument("destination", help="columnar log to write, e.g. lab_2_data.col")
+    args = parser.parse_args()
+    convert_to_columnar(args.source, args.destination)
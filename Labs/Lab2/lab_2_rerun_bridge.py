@@ -0,0 +1,104 @@
+import collections
+import threading
+import numpy as np
+from lab_2_kinematics import LINK_FRAME_NAMES
+
+
+class RerunStreamBridge:
+    """
+    Streams FK results from the ROS timer into a vis_tool.Visualizer.
+
+    push() only appends one (time, joint angles, foot positions) frame to a
+    bounded deque, which drops the oldest frames once it is full. A
+    background thread drains the deque every period, computes the link
+    frames of the whole batch at once and logs it with the Visualizer
+    time-series methods, so a slow or disconnected viewer can never stall
+    the caller.
+
+    legs is a list of (leg_name, LegKinematics) pairs; the joint angles
+    passed to push() hold three angles per leg in the same order.
+
+    A batch that fails to log (e.g. a frame of the wrong shape or a rerun
+    error) is counted in num_failed and reported through emit, and the
+    consumer keeps going with the next batch.
+    """
+
+    def __init__(self, visualizer, legs, capacity=256, period=0.1, log_path="pupper", axis_length=0.02, emit=print):
+        self.visualizer = visualizer
+        self.legs = list(legs)
+        self.period = period
+        self.log_path = log_path
+        self.axis_length = axis_length
+        self.emit = emit
+        self.num_failed = 0
+        # The counters and the deque are shared with the consumer thread
+        self._lock = threading.Lock()
+        self._num_pushed = 0
+        self._num_logged = 0
+        self._frames = collections.deque(maxlen=capacity)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lab_2_rerun_bridge", daemon=True)
+        self._thread.start()
+
+    @property
+    def num_pushed(self):
+        with self._lock:
+            return self._num_pushed
+
+    @property
+    def num_logged(self):
+        """Frames the consumer has taken from the queue (including failed ones)."""
+        with self._lock:
+            return self._num_logged
+
+    @property
+    def num_dropped(self):
+        """Frames overwritten in the queue before the consumer got to them."""
+        with self._lock:
+            return self._num_pushed - self._num_logged - len(self._frames)
+
+    def push(self, time_stamp, joint_angles, foot_positions):
+        """Queue one frame; only waits for the lock, the oldest frame is dropped when full."""
+        with self._lock:
+            self._frames.append((time_stamp, joint_angles, foot_positions))
+            self._num_pushed += 1
+
+    def close(self):
+        """Log the frames still queued and stop the consumer thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.period):
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        # Only the hand-over holds the lock, not the logging
+        with self._lock:
+            batch = list(self._frames)
+            self._frames.clear()
+            self._num_logged += len(batch)
+        if not batch:
+            return
+        try:
+            self._log_batch(batch)
+        except Exception as error:
+            self.num_failed += len(batch)
+            self.emit(f"rerun bridge: failed to log {len(batch)} frames: {error!r}")
+
+    def _log_batch(self, batch):
+        time_stamps = np.array([frame[0] for frame in batch], dtype=float)
+        joint_angles = np.array([frame[1] for frame in batch], dtype=float).reshape(len(batch), len(self.legs), 3)
+        foot_positions = np.array([frame[2] for frame in batch], dtype=float).reshape(len(batch), -1, 3)
+
+        self.visualizer.logPointsTimeSeries(time_stamps, foot_positions, log_path=f"{self.log_path}/feet", radii=0.01)
+        for leg_index, (leg_name, leg_kinematics) in enumerate(self.legs):
+            link_frames = leg_kinematics.link_transforms(joint_angles[:, leg_index])
+            for link_index, link_name in enumerate(LINK_FRAME_NAMES):
+                self.visualizer.logTransformsTimeSeries(
+                    time_stamps,
+                    link_frames[:, link_index],
+                    f"{self.log_path}/{leg_name}/{link_name}",
+                    axis_length=self.axis_length,
+                )
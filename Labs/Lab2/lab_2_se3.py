@@ -0,0 +1,130 @@
+import functools
+import math
+import numpy as np
+
+# Homogeneous transform helpers for scalar angles.
+#
+# Each rotation comes in two forms: rotation_x(angle) takes an angle and
+# uses math.cos / math.sin, which are several times faster than NumPy on
+# Python floats, and rotation_x_sincos(c, s) takes the cosine and sine
+# when they are already known, e.g. from one sincos() call for all joint
+# angles of a tick. Both write into out when it is given instead of
+# allocating a new array. out must hold a transform made by the same
+# helper (e.g. rotation_z(0.0)), since only the entries that depend on the
+# angle are written.
+
+
+def sincos(angles):
+    """Cosines and sines of all angles in one NumPy call each, as lists of floats."""
+    angles = np.asarray(angles, dtype=float)
+    return np.cos(angles).tolist(), np.sin(angles).tolist()
+
+
+def rotation_x_sincos(c, s, out=None):
+    if out is None:
+        return np.array([[1.0, 0.0, 0.0, 0.0], [0.0, c, -s, 0.0], [0.0, s, c, 0.0], [0.0, 0.0, 0.0, 1.0]])
+    out[1, 1] = c
+    out[1, 2] = -s
+    out[2, 1] = s
+    out[2, 2] = c
+    return out
+
+
+def rotation_y_sincos(c, s, out=None):
+    if out is None:
+        return np.array([[c, 0.0, s, 0.0], [0.0, 1.0, 0.0, 0.0], [-s, 0.0, c, 0.0], [0.0, 0.0, 0.0, 1.0]])
+    out[0, 0] = c
+    out[0, 2] = s
+    out[2, 0] = -s
+    out[2, 2] = c
+    return out
+
+
+def rotation_z_sincos(c, s, out=None):
+    if out is None:
+        return np.array([[c, -s, 0.0, 0.0], [s, c, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]])
+    out[0, 0] = c
+    out[0, 1] = -s
+    out[1, 0] = s
+    out[1, 1] = c
+    return out
+
+
+def rotation_x(angle, out=None):
+    return rotation_x_sincos(math.cos(angle), math.sin(angle), out)
+
+
+def rotation_y(angle, out=None):
+    return rotation_y_sincos(math.cos(angle), math.sin(angle), out)
+
+
+def rotation_z(angle, out=None):
+    return rotation_z_sincos(math.cos(angle), math.sin(angle), out)
+
+
+def translation(x, y, z, out=None):
+    if out is None:
+        return np.array([[1.0, 0.0, 0.0, x], [0.0, 1.0, 0.0, y], [0.0, 0.0, 1.0, z], [0.0, 0.0, 0.0, 1.0]])
+    out[0:3, 3] = (x, y, z)
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def constant_rotation(axis, angle):
+    """
+    Read-only rotation about axis ("x", "y" or "z") by a constant angle,
+    computed on the first call only.
+    """
+    T = {"x": rotation_x, "y": rotation_y, "z": rotation_z}[axis](angle)
+    T.flags.writeable = False
+    return T
+
+
+def compose(*transforms, out=None):
+    """Product of the transforms, left to right, written into out if given."""
+    if len(transforms) == 1:
+        # A copy, so the result can be written to like any other product
+        if out is None:
+            return np.array(transforms[0], dtype=float)
+        np.copyto(out, transforms[0])
+        return out
+    if len(transforms) == 2:
+        return np.matmul(transforms[0], transforms[1], out=out)
+    return np.matmul(functools.reduce(np.matmul, transforms[:-1]), transforms[-1], out=out)
+
+
+# Affine tuples: the top 3x4 block of a homogeneous transform flattened
+# into 12 Python floats, for chains evaluated on scalars without NumPy.
+
+
+def to_affine_tuple(T):
+    """Flatten the top 3x4 block of a homogeneous transform into Python floats."""
+    return tuple(float(value) for value in T[0:3, 0:4].ravel())
+
+
+def from_affine_tuple(T):
+    """Inverse of to_affine_tuple: a 4x4 homogeneous transform."""
+    return np.vstack([np.reshape(T, (3, 4)), [0.0, 0.0, 0.0, 1.0]])
+
+
+def transform_point(T, x, y, z):
+    """
+    Apply a flattened 3x4 transform (see to_affine_tuple) to a point.
+
+    Works on Python floats as well as on NumPy arrays, where T may also be a
+    (12, ...) stack of transforms that broadcasts against the coordinates.
+    """
+    return (
+        T[0] * x + T[1] * y + T[2] * z + T[3],
+        T[4] * x + T[5] * y + T[6] * z + T[7],
+        T[8] * x + T[9] * y + T[10] * z + T[11],
+    )
+
+
+def rotate_vector(T, x, y, z):
+    """Apply only the rotation part of a flattened 3x4 transform (for derivatives)."""
+    return (
+        T[0] * x + T[1] * y + T[2] * z,
+        T[4] * x + T[5] * y + T[6] * z,
+        T[8] * x + T[9] * y + T[10] * z,
+    )
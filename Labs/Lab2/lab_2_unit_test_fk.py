@@ -0,0 +1,90 @@
+import numpy as np
+from lab_2_kinematics import LegKinematics, LegTransformChain, QuadrupedKinematics, forward_kinematics_chain, FRONT_LEFT_HIP_OFFSET, BACK_LEFT_HIP_OFFSET
+from lab_2_se3 import rotation_x, rotation_y, rotation_z, translation
+
+TOLERANCE = 1e-9
+
+def unit_test(test_number, position, position_des):
+    error = np.max(np.abs(np.asarray(position) - np.asarray(position_des)))
+    if np.shape(position) == np.shape(position_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", position)
+    return False
+
+rng = np.random.default_rng(0)
+joint_angles = rng.uniform(-np.pi, np.pi, size=(200, 3))
+leg_kinematics_f = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+leg_kinematics_b = LegKinematics(BACK_LEFT_HIP_OFFSET)
+quadruped_kinematics = QuadrupedKinematics()
+trajectory = rng.uniform(-np.pi, np.pi, size=(100, 12))
+trajectory_positions = quadruped_kinematics.forward_kinematics(trajectory)
+mirror_y = np.array([1, -1, 1])
+
+def numerical_jacobian(fk, angles, step=1e-6):
+    """Central differences of fk(theta1, theta2, theta3), one column per joint."""
+    return np.array([(fk(*(angles + step * e)) - fk(*(angles - step * e))) / (2 * step) for e in np.eye(3)]).T
+
+positions_b, jacobians_b = leg_kinematics_b.forward_kinematics_jacobian_batch(joint_angles)
+mirrored_leg = quadruped_kinematics.legs[0]
+
+transform_chain_b = LegTransformChain(BACK_LEFT_HIP_OFFSET)
+chain_frames_b = []
+for angles in joint_angles[0:20]:
+    transform_chain_b.update(*angles)
+    chain_frames_b.append(np.stack([transform_chain_b.T_0_1, transform_chain_b.T_0_2, transform_chain_b.T_0_3, transform_chain_b.T_0_ee]))
+# the helpers write the same transforms into a reused buffer as they allocate
+buffers = [rotation_x(0.0), rotation_y(0.0), rotation_z(0.0), translation(0.0, 0.0, 0.0)]
+buffer_outputs = [np.array(helper(*arguments, out=buffer)) for helper, arguments, buffer in
+                  zip([rotation_x, rotation_y, rotation_z, translation], [(0.3,), (-1.2,), (2.5,), (0.1, 0.2, 0.3)], buffers)]
+
+# format is position, position from the reference 4x4 chain
+test_input_output_list = [
+[leg_kinematics_f.forward_kinematics(0, 0, 0), forward_kinematics_chain(0, 0, 0, FRONT_LEFT_HIP_OFFSET)],
+[leg_kinematics_b.forward_kinematics(0, 0, 0), forward_kinematics_chain(0, 0, 0, BACK_LEFT_HIP_OFFSET)],
+[np.array([leg_kinematics_f.forward_kinematics(*angles) for angles in joint_angles]),
+ np.array([forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET) for angles in joint_angles])],
+[np.array([leg_kinematics_b.forward_kinematics(*angles) for angles in joint_angles]),
+ np.array([forward_kinematics_chain(*angles, BACK_LEFT_HIP_OFFSET) for angles in joint_angles])],
+# batched FK for all four legs, legs ordered front_r, front_l, back_r, back_l
+[trajectory_positions[:, 1], np.array([forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET) for angles in trajectory[:, 3:6]])],
+[trajectory_positions[:, 3], np.array([forward_kinematics_chain(*angles, BACK_LEFT_HIP_OFFSET) for angles in trajectory[:, 9:12]])],
+# right legs mirror the left legs at the same joint angles
+[trajectory_positions[:, 0], mirror_y * np.array([forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET) for angles in trajectory[:, 0:3]])],
+[trajectory_positions[:, 2], mirror_y * np.array([forward_kinematics_chain(*angles, BACK_LEFT_HIP_OFFSET) for angles in trajectory[:, 6:9]])],
+[quadruped_kinematics.forward_kinematics(trajectory[0]), trajectory_positions[0]],
+[quadruped_kinematics.forward_kinematics_leg("leg_front_l", joint_angles), np.array([leg_kinematics_f.forward_kinematics(*angles) for angles in joint_angles])],
+[np.array([leg.forward_kinematics(*angles) for leg, angles in zip(quadruped_kinematics.legs, trajectory[7].reshape(4, 3))]), trajectory_positions[7]],
+# link frames: the foot frame sits at the FK position and link_1 at the (flipped) hip
+[leg_kinematics_f.link_transforms(joint_angles)[:, 3, 0:3, 3], np.array([forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET) for angles in joint_angles])],
+[leg_kinematics_b.link_transforms(joint_angles[0])[0, 0:3, 3], np.array(BACK_LEFT_HIP_OFFSET) * np.array([1, -1, -1])],
+# analytic Jacobians against central differences of the reference chain
+[leg_kinematics_f.forward_kinematics_jacobian(*joint_angles[0])[1],
+ numerical_jacobian(lambda *angles: forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET), joint_angles[0])],
+[jacobians_b, np.array([numerical_jacobian(lambda *angles: forward_kinematics_chain(*angles, BACK_LEFT_HIP_OFFSET), angles) for angles in joint_angles])],
+[positions_b, np.array([leg_kinematics_b.forward_kinematics(*angles) for angles in joint_angles])],
+[np.array([LegTransformChain(FRONT_LEFT_HIP_OFFSET).forward_kinematics(*angles) for angles in joint_angles]),
+ np.array([forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET) for angles in joint_angles])],
+# preallocated-buffer chain frames are the link_transforms frames before the output flip
+[np.diag([1, -1, -1, 1]) @ np.array(chain_frames_b), leg_kinematics_b.link_transforms(joint_angles[0:20])],
+[np.array(buffer_outputs), np.array([rotation_x(0.3), rotation_y(-1.2), rotation_z(2.5), translation(0.1, 0.2, 0.3)])],
+[mirrored_leg.forward_kinematics_jacobian_batch(joint_angles[0:20])[1], np.array([numerical_jacobian(mirrored_leg.forward_kinematics, angles) for angles in joint_angles[0:20]])],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 forward kinematics:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    position = row[0]
+    position_des = row[1]
+    if unit_test(test_number, position, position_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
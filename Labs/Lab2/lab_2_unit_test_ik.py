@@ -0,0 +1,83 @@
+import numpy as np
+from lab_2_inverse_kinematics import LegInverseKinematics
+from lab_2_kinematics import LegKinematics, FRONT_LEFT_HIP_OFFSET, BACK_LEFT_HIP_OFFSET, FRONT_RIGHT_HIP_OFFSET
+
+TOLERANCE = 1e-8
+
+def unit_test(test_number, output, output_des):
+    error = np.max(np.abs(np.asarray(output, dtype=float) - np.asarray(output_des, dtype=float)))
+    if np.shape(output) == np.shape(output_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", output)
+    return False
+
+def angle_difference(a, b):
+    return (np.asarray(a) - np.asarray(b) + np.pi) % (2 * np.pi) - np.pi
+
+rng = np.random.default_rng(0)
+joint_angles = rng.uniform(-np.pi, np.pi, size=(500, 3))
+leg_kinematics_f = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+leg_kinematics_b = LegKinematics(BACK_LEFT_HIP_OFFSET)
+leg_kinematics_r = LegKinematics(FRONT_RIGHT_HIP_OFFSET, mirror=True)
+ik_f = LegInverseKinematics(leg_kinematics_f)
+ik_b = LegInverseKinematics(leg_kinematics_b)
+ik_r = LegInverseKinematics(leg_kinematics_r)
+targets_f = leg_kinematics_f.forward_kinematics_batch(joint_angles)
+targets_b = leg_kinematics_b.forward_kinematics_batch(joint_angles)
+targets_r = leg_kinematics_r.forward_kinematics_batch(joint_angles)
+
+solution_f, info_f = ik_f.solve_batch(targets_f, seeds=joint_angles)
+solution_b, info_b = ik_b.solve_batch(targets_b)
+solution_r, _ = ik_r.solve_batch(targets_r, seeds=joint_angles)
+single_solution, single_info = ik_f.solve(targets_f[7], seed=joint_angles[7])
+
+# Warm start: a slowly moving target keeps the branch of the previous solution
+ik_f.solve(targets_f[0], seed=joint_angles[0])
+trajectory = joint_angles[0] + np.linspace(0, 0.2, 20)[:, None]
+tracked = np.array([ik_f.solve(target)[0] for target in leg_kinematics_f.forward_kinematics_batch(trajectory)])
+
+# Out of reach: run to convergence, damped least squares ends where the
+# error is orthogonal to the leg's motion; by default it stops once the
+# error stalls, close to that point and in fewer iterations
+far_targets = np.array([[0.3, -0.2, 0.1], [0.1, -0.05, -0.25]])
+far_solution, far_info = ik_b.solve_batch(far_targets, seeds=np.zeros(3))
+converged_solution, converged_info = LegInverseKinematics(leg_kinematics_b, min_improvement=0.0).solve_batch(far_targets, seeds=np.zeros(3))
+far_positions, far_jacobians = leg_kinematics_b.forward_kinematics_jacobian_batch(converged_solution)
+far_gradient = np.einsum("nji,nj->ni", far_jacobians, far_targets - far_positions)
+
+# format is output, expected output
+test_input_output_list = [
+[leg_kinematics_f.forward_kinematics_batch(solution_f), targets_f],
+[leg_kinematics_b.forward_kinematics_batch(solution_b), targets_b],
+[leg_kinematics_r.forward_kinematics_batch(solution_r), targets_r],
+# seeded with the angles that made the targets, the same branch comes back
+[angle_difference(solution_f, joint_angles), np.zeros_like(joint_angles)],
+[angle_difference(solution_r, joint_angles), np.zeros_like(joint_angles)],
+[[info_f["analytic"].all(), info_b["analytic"].all(), info_f["iterations"].max()], [True, True, 0]],
+[single_solution, solution_f[7]],
+[[single_info["analytic"], single_info["iterations"]], [True, 0]],
+[angle_difference(tracked, trajectory), np.zeros_like(trajectory)],
+[[far_info["analytic"].any(), far_info["iterations"].min() > 0], [False, True]],
+[far_gradient, np.zeros_like(far_gradient)],
+[far_info["error"] <= converged_info["error"] * (1 + 1e-6), [True, True]],
+[far_info["iterations"] < converged_info["iterations"], [True, True]],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 inverse kinematics:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    output = row[0]
+    output_des = row[1]
+    if unit_test(test_number, output, output_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+import threading
+import pickle
+import numpy as np
+from lab_2_data_load import DataLoader
+from lab_2_logger import StreamingLogWriter, convert_to_columnar
+
+TOLERANCE = 1e-12
+LOG_FIELDS = [('time_stamp', 1), ('theta1_f', 1), ('end_effector_position_f', 3)]
+
+def unit_test(test_number, value, value_des):
+    value = np.asarray(value)
+    value_des = np.asarray(value_des)
+    if value.shape == value_des.shape and (value.size == 0 or np.max(np.abs(value - value_des)) < TOLERANCE):
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " for output with shape ", value.shape)
+    return False
+
+def write_log(filename, num_records, chunk_size):
+    writer = StreamingLogWriter(filename, LOG_FIELDS, chunk_size=chunk_size)
+    for i in range(num_records):
+        writer.log(0.02 * i, -0.5 * i, np.array([i, 2 * i, 3 * i]))
+    writer.close()
+
+class BlockingFile:
+    """Stands in for a writer's log file; write() waits for release, or raises once failed."""
+    def __init__(self, file_handle):
+        self.file_handle = file_handle
+        self.release = threading.Event()
+        self.failed = False
+    def write(self, data):
+        self.release.wait()
+        if self.failed:
+            raise OSError(28, "No space left on device")
+        return self.file_handle.write(data)
+    def flush(self):
+        self.file_handle.flush()
+    def fileno(self):
+        return self.file_handle.fileno()
+    def close(self):
+        self.file_handle.close()
+
+def log_chunks(writer, num_chunks):
+    for i in range(num_chunks * writer.chunk_size):
+        writer.log(0.0, 0.0, np.zeros(3))
+
+num_records = 123
+time_stamp_des = 0.02 * np.arange(num_records)
+theta1_f_des = -0.5 * np.arange(num_records)
+end_effector_position_f_des = np.arange(num_records)[:, None] * np.array([1, 2, 3])
+
+test_dir = tempfile.mkdtemp()
+filename = os.path.join(test_dir, 'lab_2_data.bin')
+write_log(filename, num_records, chunk_size=10)
+data_dictionary = DataLoader(filename).load()
+
+# simulate a crash that tore the last record
+torn_filename = os.path.join(test_dir, 'lab_2_data_torn.bin')
+with open(filename, 'rb') as file_handle:
+    file_bytes = file_handle.read()
+with open(torn_filename, 'wb') as file_handle:
+    file_handle.write(file_bytes[:-12])
+torn_data_dictionary = DataLoader(torn_filename).load()
+
+empty_filename = os.path.join(test_dir, 'lab_2_data_empty.bin')
+write_log(empty_filename, 0, chunk_size=10)
+empty_data_dictionary = DataLoader(empty_filename).load()
+
+# columnar logs converted from a streaming log and from a pickled dictionary
+columnar_filename = os.path.join(test_dir, 'lab_2_data.col')
+convert_to_columnar(filename, columnar_filename)
+columnar_data_dictionary = DataLoader(columnar_filename).load()
+pickle_filename = os.path.join(test_dir, 'lab_2_data.pkl')
+with open(pickle_filename, 'wb') as file_handle:
+    pickle.dump({'time_stamp': list(time_stamp_des), 'end_effector_position_f': list(end_effector_position_f_des)}, file_handle)
+pickle_columnar_filename = os.path.join(test_dir, 'lab_2_data_pkl.col')
+convert_to_columnar(pickle_filename, pickle_columnar_filename)
+pickle_columnar_data_dictionary = DataLoader(pickle_columnar_filename).load()
+empty_columnar_filename = os.path.join(test_dir, 'lab_2_data_empty.col')
+convert_to_columnar(empty_filename, empty_columnar_filename)
+empty_columnar_data_dictionary = DataLoader(empty_columnar_filename).load()
+
+# time-windowed queries, t in [0.5 s, 1.0 s] is samples 25 to 50
+columnar_data_loader = DataLoader(columnar_filename)
+window_data_dictionary = columnar_data_loader.query(0.5, 1.0)
+decimated_data_dictionary = columnar_data_loader.query(0.5, 1.0, step=5, fields=['end_effector_position_f'])
+pickle_window_data_dictionary = DataLoader(pickle_filename).query(t_start=2.0)
+streaming_window_data_dictionary = DataLoader(filename).query(0.5, 1.0, step=5)
+try:
+    columnar_data_loader.query(0.5, 1.0, step=0)
+    zero_step_raised = 0
+except ValueError:
+    zero_step_raised = 1
+
+# A stalled writer holds at most max_chunks chunks; the rows of further chunks are dropped and counted
+stalled_filename = os.path.join(test_dir, 'lab_2_data_stalled.bin')
+stalled_writer = StreamingLogWriter(stalled_filename, LOG_FIELDS, chunk_size=10, max_chunks=3)
+stalled_writer._file = BlockingFile(stalled_writer._file)
+log_chunks(stalled_writer, 6)
+stalled_num_dropped_rows = stalled_writer.num_dropped_rows
+stalled_writer._file.release.set()
+stalled_writer.close()
+stalled_data_dictionary = DataLoader(stalled_filename).load()
+
+# A failed write is raised from the logging thread instead of being lost in the writer thread
+def raises_write_error(action):
+    try:
+        action()
+    except RuntimeError as error:
+        return isinstance(error.__cause__, OSError)
+    return False
+failed_writer = StreamingLogWriter(os.path.join(test_dir, 'lab_2_data_failed.bin'), LOG_FIELDS, chunk_size=10)
+failed_writer._file = BlockingFile(failed_writer._file)
+failed_writer._file.failed = True
+failed_writer._file.release.set()
+log_chunks(failed_writer, 1)
+failed_writer._writer_thread.join()
+failed_log_raised = raises_write_error(lambda: log_chunks(failed_writer, 1))
+failed_close_raised = raises_write_error(failed_writer.close)
+
+# format is loaded value, expected value
+test_input_output_list = [
+[data_dictionary['time_stamp'], time_stamp_des],
+[data_dictionary['theta1_f'], theta1_f_des],
+[data_dictionary['end_effector_position_f'], end_effector_position_f_des],
+[torn_data_dictionary['time_stamp'], time_stamp_des[:-1]],
+[torn_data_dictionary['end_effector_position_f'], end_effector_position_f_des[:-1]],
+[empty_data_dictionary['end_effector_position_f'], np.zeros((0, 3))],
+# the streaming log the node writes is memory-mapped too
+[int(isinstance(data_dictionary['end_effector_position_f'], np.memmap)), 1],
+[columnar_data_dictionary['time_stamp'], time_stamp_des],
+[columnar_data_dictionary['theta1_f'], theta1_f_des],
+[columnar_data_dictionary['end_effector_position_f'], end_effector_position_f_des],
+[int(isinstance(columnar_data_dictionary['end_effector_position_f'], np.memmap)), 1],
+[pickle_columnar_data_dictionary['time_stamp'], time_stamp_des],
+[pickle_columnar_data_dictionary['end_effector_position_f'], end_effector_position_f_des],
+[empty_columnar_data_dictionary['end_effector_position_f'], np.zeros((0, 3))],
+[window_data_dictionary['time_stamp'], time_stamp_des[25:51]],
+[window_data_dictionary['end_effector_position_f'], end_effector_position_f_des[25:51]],
+[decimated_data_dictionary['end_effector_position_f'], end_effector_position_f_des[25:51:5]],
+[len(decimated_data_dictionary), 1],
+[pickle_window_data_dictionary['time_stamp'], time_stamp_des[100:]],
+[columnar_data_loader.query(10.0, 20.0)['time_stamp'], np.zeros(0)],
+[streaming_window_data_dictionary['theta1_f'], theta1_f_des[25:51:5]],
+[zero_step_raised, 1],
+# two chunks are queued (the third is the one being filled), the other four dropped
+[stalled_num_dropped_rows, 4 * 10],
+[len(stalled_data_dictionary['time_stamp']), 2 * 10],
+[[int(failed_log_raised), int(failed_close_raised)], [1, 1]],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 logging:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    value = row[0]
+    value_des = row[1]
+    if unit_test(test_number, value, value_des):
+        num_test_successes += 1
+    test_number += 1
+shutil.rmtree(test_dir)
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
@@ -0,0 +1,84 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from lab_2_data_load import DecimatedLine, minmax_decimate
+
+def unit_test(test_number, passed, description):
+    if passed:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, ": ", description)
+    return False
+
+rng = np.random.default_rng(0)
+num_samples = 1000003
+time_stamp = 0.02 * np.arange(num_samples)
+z_ee = np.cumsum(rng.normal(size=num_samples))
+x_ee = np.sin(time_stamp) + 0.01 * rng.normal(size=num_samples)
+
+indices = minmax_decimate([z_ee], 500)
+few_indices = minmax_decimate([z_ee[:100]], 500)
+
+fig, ax = plt.subplots(figsize=(5, 4), dpi=100)
+z_line = DecimatedLine(ax, time_stamp, z_ee, sorted_x=True)
+fig.canvas.draw()
+full_view_points = len(z_line.line.get_xdata())
+ax.set_xlim(1000, 1060)
+zoomed_x = z_line.line.get_xdata()
+zoomed_y = z_line.line.get_ydata()
+zoomed_des = z_ee[(time_stamp >= 1000) & (time_stamp <= 1060)]
+
+fig, ax = plt.subplots(figsize=(5, 4), dpi=100)
+trajectory_line = DecimatedLine(ax, x_ee, z_ee)
+fig.canvas.draw()
+trajectory_points = len(trajectory_line.line.get_xdata())
+
+# A path that leaves the zoomed view and comes back: each visit is drawn as
+# its own run, to one sample past the border, and never joined to the next
+turns = np.linspace(0, 6 * np.pi, 30001)
+fig, ax = plt.subplots(figsize=(5, 4), dpi=100)
+circle_line = DecimatedLine(ax, np.cos(turns), np.sin(turns))
+fig.canvas.draw()
+ax.set_xlim(0.5, 1.5)
+ax.set_ylim(-1.5, 1.5)
+circle_x = circle_line.line.get_xdata()
+circle_y = circle_line.line.get_ydata()
+circle_breaks = np.isnan(circle_x)
+circle_steps = np.hypot(np.diff(circle_x), np.diff(circle_y))
+sample_step = np.hypot(np.diff(np.cos(turns)), np.diff(np.sin(turns))).max()
+
+# format is passed, description
+test_input_output_list = [
+[np.all(np.diff(indices) > 0), "indices are not increasing"],
+[len(indices) <= 2 * 500 + 4, "too many samples kept"],
+[z_ee[indices].min() == z_ee.min() and z_ee[indices].max() == z_ee.max(), "global min/max not kept"],
+[indices[0] == 0 and indices[-1] == num_samples - 1, "end points not kept"],
+[np.array_equal(few_indices, np.arange(100)), "short inputs are not kept whole"],
+[full_view_points <= 4 * 500 + 10, "full view draws too many points"],
+[zoomed_x.min() <= 1000 and zoomed_x.max() >= 1060 and zoomed_x.max() < 1061, "zoomed view does not cover the window"],
+[zoomed_y.min() == zoomed_des.min() and zoomed_y.max() == zoomed_des.max(), "zoomed view lost the window min/max"],
+[trajectory_points <= 4 * 500 + 10, "trajectory draws too many points"],
+[circle_breaks.sum() == 3, "visits to the view are not separated"],
+[np.nanmax(circle_steps) < 300 * sample_step, "a false segment joins two visits"],
+[np.nanmin(circle_x) < 0.5, "runs do not reach the view border"],
+]
+plt.close('all')
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 plotting:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    passed = row[0]
+    description = row[1]
+    if unit_test(test_number, passed, description):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
@@ -0,0 +1,91 @@
+import numpy as np
+from lab_2_kinematics import LegKinematics, LegTransformChain, forward_kinematics_chain, LEG_HIP_OFFSETS
+from lab_2_se3 import compose, constant_rotation, rotation_x, rotation_y, rotation_z, translation
+
+TOLERANCE = 1e-12
+
+def unit_test(test_number, output, output_des):
+    error = np.max(np.abs(np.asarray(output, dtype=float) - np.asarray(output_des, dtype=float)))
+    if np.shape(output) == np.shape(output_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", output)
+    return False
+
+# Frozen copy of the original Lab 2 transform helpers and FK chain, before
+# lab_2_se3. Do not change these: every other FK path is checked against them.
+def original_rotation_x(angle):
+    return np.array([[1, 0, 0, 0], [0, np.cos(angle), -np.sin(angle), 0], [0, np.sin(angle), np.cos(angle), 0], [0, 0, 0, 1]])
+
+def original_rotation_y(angle):
+    return np.array([[np.cos(angle), 0, np.sin(angle), 0], [0, 1, 0, 0], [-np.sin(angle), 0, np.cos(angle), 0], [0, 0, 0, 1]])
+
+def original_rotation_z(angle):
+    return np.array([[np.cos(angle), -np.sin(angle), 0, 0], [np.sin(angle), np.cos(angle), 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+
+def original_translation(x, y, z):
+    return np.array([[1, 0, 0, x], [0, 1, 0, y], [0, 0, 1, z], [0, 0, 0, 1]])
+
+def original_forward_kinematics_chain(theta1, theta2, theta3, hip_offset):
+    T_0_1 = original_translation(*hip_offset) @ original_rotation_x(1.57080) @ original_rotation_z(theta1)
+    T_1_2 = original_translation(0, 0, 0.04) @ original_rotation_z(-1.57080) @ original_rotation_y(1.57080) @ original_rotation_x(1.57080) @ original_rotation_z(theta2)
+    T_2_3 = original_translation(0.0, -0.0494, 0.0685) @ original_rotation_z(3.14159) @ original_rotation_y(1.57080) @ original_rotation_z(theta3)
+    T_3_ee = original_translation(0.06231, 0.06216, 0.018)
+    end_effector_position = (T_0_1 @ T_1_2 @ T_2_3 @ T_3_ee)[0:3, 3]
+    end_effector_position[1] = -end_effector_position[1]
+    end_effector_position[2] = -end_effector_position[2]
+    return end_effector_position
+
+rng = np.random.default_rng(0)
+joint_angles = rng.uniform(-np.pi, np.pi, size=(50, 3))
+angles = rng.uniform(-np.pi, np.pi, size=20)
+hip_offsets = [LEG_HIP_OFFSETS[leg_name] for leg_name in sorted(LEG_HIP_OFFSETS)]
+
+# Every FK path for a left leg at each of the four hip offsets, against the frozen chain
+original_positions = np.array([[original_forward_kinematics_chain(*q, hip_offset) for q in joint_angles] for hip_offset in hip_offsets])
+chain_positions = np.array([[forward_kinematics_chain(*q, hip_offset=hip_offset) for q in joint_angles] for hip_offset in hip_offsets])
+transform_chains = [LegTransformChain(hip_offset) for hip_offset in hip_offsets]
+transform_chain_positions = np.array([[transform_chain.forward_kinematics(*q) for q in joint_angles] for transform_chain in transform_chains])
+leg_kinematics = [LegKinematics(hip_offset) for hip_offset in hip_offsets]
+closed_form_positions = np.array([[leg.forward_kinematics(*q) for q in joint_angles] for leg in leg_kinematics])
+batch_positions = np.array([leg.forward_kinematics_batch(joint_angles) for leg in leg_kinematics])
+
+# compose() of one transform is a writable copy of it
+single = translation(0.1, 0.2, 0.3)
+single_copy = compose(single)
+single_copy[0, 3] = 1.0
+single_out = compose(rotation_z(0.4), out=np.empty((4, 4)))
+
+# format is output, expected output
+test_input_output_list = [
+[np.array([rotation_x(angle) for angle in angles]), np.array([original_rotation_x(angle) for angle in angles])],
+[np.array([rotation_y(angle) for angle in angles]), np.array([original_rotation_y(angle) for angle in angles])],
+[np.array([rotation_z(angle) for angle in angles]), np.array([original_rotation_z(angle) for angle in angles])],
+[translation(0.07500, -0.0445, 0.0), original_translation(0.07500, -0.0445, 0.0)],
+[np.array([constant_rotation(axis, 1.57080) for axis in "xyz"]), np.array([original_rotation_x(1.57080), original_rotation_y(1.57080), original_rotation_z(1.57080)])],
+[chain_positions, original_positions],
+[transform_chain_positions, original_positions],
+[closed_form_positions, original_positions],
+[batch_positions, original_positions],
+[compose(rotation_x(0.3), translation(0.1, 0.2, 0.3), rotation_z(-1.1)), original_rotation_x(0.3) @ original_translation(0.1, 0.2, 0.3) @ original_rotation_z(-1.1)],
+[single, original_translation(0.1, 0.2, 0.3)],
+[single_out, original_rotation_z(0.4)],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 SE(3) helpers:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    output = row[0]
+    output_des = row[1]
+    if unit_test(test_number, output, output_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
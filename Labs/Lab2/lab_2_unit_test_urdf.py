@@ -0,0 +1,103 @@
+import numpy as np
+from lab_2_kinematic_tree import KinematicTree, UrdfLegKinematics
+from lab_2_kinematics import (
+    LegKinematics, forward_kinematics_chain, FRONT_LEFT_HIP_OFFSET, BACK_LEFT_HIP_OFFSET, L1_Z, L2_OFFSET, L3_OFFSET,
+    QUARTER_TURN, HALF_TURN, OUTPUT_FLIP,
+)
+
+TOLERANCE = 1e-9
+
+def unit_test(test_number, output, output_des):
+    error = np.max(np.abs(np.asarray(output) - np.asarray(output_des)))
+    if np.shape(output) == np.shape(output_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", output)
+    return False
+
+def leg_urdf(leg_name, hip_offset):
+    """The transform chain of forward_kinematics_chain written as URDF joints."""
+    xyz = lambda offset: " ".join(str(value) for value in offset)
+    return f"""
+  <link name="{leg_name}_1"/><link name="{leg_name}_2"/><link name="{leg_name}_3"/><link name="{leg_name}_foot"/>
+  <joint name="{leg_name}_1" type="revolute">
+    <parent link="body"/><child link="{leg_name}_1"/>
+    <origin xyz="{xyz(hip_offset)}" rpy="{QUARTER_TURN} 0 0"/><axis xyz="0 0 1"/>
+  </joint>
+  <joint name="{leg_name}_2" type="revolute">
+    <parent link="{leg_name}_1"/><child link="{leg_name}_2"/>
+    <origin xyz="0 0 {L1_Z}" rpy="{QUARTER_TURN} {QUARTER_TURN} {-QUARTER_TURN}"/><axis xyz="0 0 1"/>
+  </joint>
+  <joint name="{leg_name}_3" type="revolute">
+    <parent link="{leg_name}_2"/><child link="{leg_name}_3"/>
+    <origin xyz="{xyz(L2_OFFSET)}" rpy="0 {QUARTER_TURN} {HALF_TURN}"/><axis xyz="0 0 1"/>
+  </joint>
+  <joint name="{leg_name}_foot" type="fixed">
+    <parent link="{leg_name}_3"/><child link="{leg_name}_foot"/>
+    <origin xyz="{xyz(L3_OFFSET)}"/>
+  </joint>"""
+
+# base_link -> body is an identity fixed joint, so the hips sit behind a folded fixed chain
+URDF = f"""<robot name="pupper_left_legs">
+  <link name="base_link"/><link name="body"/>
+  <joint name="body_joint" type="fixed"><parent link="base_link"/><child link="body"/></joint>
+  {leg_urdf("leg_front_l", FRONT_LEFT_HIP_OFFSET)}
+  {leg_urdf("leg_back_l", BACK_LEFT_HIP_OFFSET)}
+  <link name="slider"/>
+  <joint name="slider_joint" type="prismatic">
+    <parent link="body"/><child link="slider"/><origin xyz="0 0 0.1" rpy="0 0 {np.pi / 2}"/><axis xyz="1 0 0"/>
+  </joint>
+</robot>"""
+
+JOINT_NAMES = ["leg_front_l_1", "leg_front_l_2", "leg_front_l_3", "leg_back_l_1", "leg_back_l_2", "leg_back_l_3", "slider_joint"]
+tree = KinematicTree(URDF, joint_names=JOINT_NAMES)
+reversed_tree = KinematicTree(URDF, joint_names=JOINT_NAMES[::-1])
+
+rng = np.random.default_rng(0)
+joint_positions = rng.uniform(-np.pi, np.pi, size=(100, len(JOINT_NAMES)))
+poses = tree.link_poses(joint_positions)
+flip = np.array([1, -1, -1])
+front_foot = poses[:, tree.link_index("leg_front_l_foot"), 0:3, 3] * flip
+back_foot = poses[:, tree.link_index("leg_back_l_foot"), 0:3, 3] * flip
+
+# The per-tick paths: one point of one link, and one leg behind the LegKinematics interface
+link_points = np.array([[tree.link_point(q, link_name, (0.01, -0.02, 0.03)) for link_name in ("leg_back_l_foot", "slider")] for q in joint_positions[0:20]])
+link_pose_points = np.array([poses[0:20, tree.link_index(link_name)] @ [0.01, -0.02, 0.03, 1.0] for link_name in ("leg_back_l_foot", "slider")])
+urdf_leg = UrdfLegKinematics(tree, ["leg_front_l_1", "leg_front_l_2", "leg_front_l_3"])
+urdf_leg_positions = np.array([urdf_leg.forward_kinematics(*angles) for angles in joint_positions[0:20, 0:3]])
+
+# format is output, expected output
+test_input_output_list = [
+[front_foot, np.array([forward_kinematics_chain(*angles, FRONT_LEFT_HIP_OFFSET) for angles in joint_positions[:, 0:3]])],
+[back_foot, np.array([forward_kinematics_chain(*angles, BACK_LEFT_HIP_OFFSET) for angles in joint_positions[:, 3:6]])],
+# Every link frame of a leg matches LegKinematics.link_transforms (in its flipped frame)
+[OUTPUT_FLIP @ poses[:, [tree.link_index(f"leg_back_l_{link}") for link in ("1", "2", "3", "foot")]],
+ LegKinematics(BACK_LEFT_HIP_OFFSET).link_transforms(joint_positions[:, 3:6])],
+[tree.link_poses(joint_positions[0]), poses[0]],
+[reversed_tree.link_poses(joint_positions[:, ::-1]), poses],
+# Prismatic joint: slides along its rotated x axis, i.e. base_link y
+[poses[:, tree.link_index("slider"), 0:3, 3], np.stack([np.zeros(100), joint_positions[:, 6], np.full(100, 0.1)], axis=-1)],
+# body_joint and the two feet are fixed; the slider is the only joint at depth 1 besides the hips
+[[len(tree.levels), len(tree.fixed_links), len(tree.levels[0])], [3, 3, 3]],
+[link_points, np.swapaxes(link_pose_points, 0, 1)[..., 0:3]],
+[urdf_leg_positions, front_foot[0:20]],
+[urdf_leg.link_transforms(joint_positions[:, 0:3]), LegKinematics(FRONT_LEFT_HIP_OFFSET).link_transforms(joint_positions[:, 0:3])],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 URDF kinematic tree:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    output = row[0]
+    output_des = row[1]
+    if unit_test(test_number, output, output_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+import numpy as np
+from lab_2_inverse_kinematics import LegInverseKinematics
+from lab_2_kinematics import LegKinematics, FRONT_LEFT_HIP_OFFSET
+from lab_2_workspace_map import WorkspaceMap, build_workspace_map
+
+# Stored positions are float32
+TOLERANCE = 1e-6
+
+def unit_test(test_number, output, output_des):
+    error = np.max(np.abs(np.asarray(output, dtype=float) - np.asarray(output_des, dtype=float)))
+    if np.shape(output) == np.shape(output_des) and error < TOLERANCE:
+        print(" Passed unit test number ", test_number)
+        return True
+
+    print(" Failed unit test number ", test_number, " with error ", error, "for output ", output)
+    return False
+
+rng = np.random.default_rng(0)
+leg_kinematics = LegKinematics(FRONT_LEFT_HIP_OFFSET)
+leg_ik = LegInverseKinematics(leg_kinematics)
+map_directory = tempfile.mkdtemp()
+built_map = build_workspace_map(leg_kinematics, map_directory, samples_per_joint=48)
+workspace_map = WorkspaceMap(map_directory)
+# A map of a leg whose joints only turn part of the way
+joint_limits = [(-0.5, 0.5), (-1.0, 0.25), (0.0, 2.0)]
+limited_map = build_workspace_map(leg_kinematics, map_directory + "_limited", samples_per_joint=8, joint_limits=joint_limits)
+
+# Random reachable targets, and points far outside the leg's reach
+joint_angles = rng.uniform(-np.pi, np.pi, size=(200, 3))
+targets = leg_kinematics.forward_kinematics_batch(joint_angles)
+far_points = np.array([[0.5, 0.3, 0.2], [-0.5, 0.0, 0.0], [0.075, -0.0445, 0.5]])
+
+sample_rows = rng.integers(len(workspace_map.positions), size=50)
+nearest_angles, nearest_positions = workspace_map.nearest_configurations(workspace_map.positions[sample_rows])
+seeds, seed_positions = workspace_map.nearest_configurations(targets)
+solved, iterations = leg_ik.damped_least_squares(targets, seeds)
+cold_solved, cold_iterations = leg_ik.damped_least_squares(targets, np.zeros(3))
+num_failed = np.sum(np.linalg.norm(leg_kinematics.forward_kinematics_batch(solved) - targets, axis=-1) > TOLERANCE)
+num_cold_failed = np.sum(np.linalg.norm(leg_kinematics.forward_kinematics_batch(cold_solved) - targets, axis=-1) > TOLERANCE)
+
+# format is output, expected output
+test_input_output_list = [
+[leg_kinematics.forward_kinematics_batch(workspace_map.joint_angles), workspace_map.positions],
+[np.diff(workspace_map.voxel_offsets).sum(), 48 ** 3],
+[workspace_map.positions, built_map.positions],
+[[workspace_map.positions.flags.writeable, workspace_map.joint_angles.flags.writeable], [False, False]],
+[limited_map.joint_angles.min(axis=0), np.array(joint_limits)[:, 0]],
+[limited_map.joint_angles.max(axis=0), np.array(joint_limits)[:, 1]],
+[limited_map.metadata["joint_limits"], joint_limits],
+[workspace_map.is_reachable(workspace_map.positions), np.ones(48 ** 3)],
+[workspace_map.is_reachable(far_points), np.zeros(3)],
+[[workspace_map.is_reachable(point) for point in far_points[0:1]] + [workspace_map.is_reachable(targets[0])], [False, True]],
+[workspace_map.is_reachable(targets.reshape(10, 20, 3)).shape, (10, 20)],
+# a stored sample is its own nearest configuration
+[nearest_positions, workspace_map.positions[sample_rows]],
+[leg_kinematics.forward_kinematics_batch(nearest_angles), nearest_positions],
+# seeds are within a voxel diagonal of the target, and damped least squares
+# from them fails less often and takes fewer iterations than from zero
+[np.linalg.norm(seed_positions - targets, axis=-1) <= np.sqrt(3) * workspace_map.voxel_size, np.ones(len(targets))],
+[[num_failed < num_cold_failed, iterations.mean() < cold_iterations.mean()], [True, True]],
+# out of reach, the nearest stored foot position is still found
+[np.linalg.norm(workspace_map.nearest_configuration(far_points[0])[1] - far_points[0]) <= np.min(np.linalg.norm(workspace_map.positions - far_points[0], axis=-1)) + 2 * workspace_map.voxel_size, True],
+]
+
+
+######################### MAIN ##########################
+print("Running unit tests for lab 2 workspace map:")
+num_test_successes = 0
+test_number = 1
+for row in test_input_output_list:
+    output = row[0]
+    output_des = row[1]
+    if unit_test(test_number, output, output_des):
+        num_test_successes += 1
+    test_number += 1
+
+print("---------------")
+print("")
+print("Num successful tests = ",num_test_successes, " / ", len(test_input_output_list))
+print("")
+
+shutil.rmtree(map_directory)
+shutil.rmtree(map_directory + "_limited")
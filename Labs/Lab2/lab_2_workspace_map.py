@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import numpy as np
+from lab_2_kinematics import LegKinematics, LEG_HIP_OFFSETS
+
+# Workspace map layout: a directory holding WORKSPACE_METADATA (JSON) and
+# one .npy file per array, so a map loads memory-mapped and only the pages
+# of the voxels that are queried are ever read.
+WORKSPACE_METADATA = "workspace.json"
+WORKSPACE_ARRAYS = ("positions", "joint_angles", "voxel_offsets")
+# Defaults: joint samples per axis, voxel edge (m) and the (low, high)
+# range (rad) sampled for each joint. The voxels are coarser than the
+# spacing of the foot samples inside the workspace, so reachable voxels are
+# not left empty between samples. By default every joint is assumed to
+# turn all the way; pass the robot's limits to leave out foot positions
+# only a full turn reaches.
+SAMPLES_PER_JOINT = 96
+VOXEL_SIZE = 0.01
+JOINT_LIMITS = ((-np.pi, np.pi),) * 3
+
+
+def build_workspace_map(leg_kinematics, directory, samples_per_joint=SAMPLES_PER_JOINT, voxel_size=VOXEL_SIZE, joint_limits=JOINT_LIMITS):
+    """
+    Sample the joint space of one leg on a regular grid within joint_limits,
+    run the batched FK over all samples and save them bucketed by voxel
+    into directory. A full turn is sampled as [low, high), so -pi and pi
+    are not both stored; narrower ranges include both limits.
+
+    Samples are sorted by voxel index (x-major), so the samples of voxel v
+    are rows voxel_offsets[v]:voxel_offsets[v + 1] of positions and
+    joint_angles. Returns the map loaded from directory.
+    """
+    joint_limits = [(float(low), float(high)) for low, high in joint_limits]
+    axes = [np.linspace(low, high, samples_per_joint, endpoint=high - low < 2 * np.pi) for low, high in joint_limits]
+    joint_angles = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+    positions = leg_kinematics.forward_kinematics_batch(joint_angles)
+
+    origin = positions.min(axis=0) - voxel_size / 2
+    shape = (np.floor((positions.max(axis=0) - origin) / voxel_size) + 2).astype(int)
+    voxel = np.ravel_multi_index(tuple(np.floor((positions - origin) / voxel_size).astype(int).T), shape)
+    order = np.argsort(voxel, kind="stable")
+    voxel_offsets = np.zeros(np.prod(shape) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(voxel, minlength=np.prod(shape)), out=voxel_offsets[1:])
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "positions.npy"), positions[order].astype(np.float32))
+    np.save(os.path.join(directory, "joint_angles.npy"), joint_angles[order].astype(np.float32))
+    np.save(os.path.join(directory, "voxel_offsets.npy"), voxel_offsets)
+    metadata = {
+        "hip_offset": list(leg_kinematics.hip_offset),
+        "mirror": leg_kinematics.mirror,
+        "samples_per_joint": samples_per_joint,
+        "joint_limits": joint_limits,
+        "voxel_size": voxel_size,
+        "origin": origin.tolist(),
+        "shape": shape.tolist(),
+    }
+    with open(os.path.join(directory, WORKSPACE_METADATA), "w") as file_handle:
+        json.dump(metadata, file_handle, indent=2)
+    return WorkspaceMap(directory)
+
+
+class WorkspaceMap:
+    """
+    Precomputed foot positions of one leg, bucketed in a voxel grid.
+
+    Built by build_workspace_map and opened memory-mapped. A point is
+    reachable if its voxel holds at least one sampled foot position, so
+    the answer is exact to about one voxel at the workspace boundary.
+    nearest_configuration() returns the sampled joint angles whose foot is
+    closest to a point, e.g. as the seed of LegInverseKinematics.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, WORKSPACE_METADATA)) as file_handle:
+            self.metadata = json.load(file_handle)
+        self.voxel_size = self.metadata["voxel_size"]
+        self.origin = np.array(self.metadata["origin"])
+        self.shape = np.array(self.metadata["shape"])
+        for name in WORKSPACE_ARRAYS:
+            # Plain ndarray views of the maps; memmap slicing is slow on the query path
+            setattr(self, name, np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")))
+
+    def _voxel_indices(self, points):
+        return np.floor((np.asarray(points, dtype=float) - self.origin) / self.voxel_size).astype(int)
+
+    def is_reachable(self, points):
+        """Whether the (..., 3) points lie in a voxel the sampled foot positions reach."""
+        indices = self._voxel_indices(points)
+        if indices.ndim == 1:
+            # One point: plain integers are much faster than the array path
+            (x, y, z), (nx, ny, nz) = indices.tolist(), self.shape.tolist()
+            if not (0 <= x < nx and 0 <= y < ny and 0 <= z < nz):
+                return False
+            voxel = (x * ny + y) * nz + z
+            return bool(self.voxel_offsets[voxel + 1] > self.voxel_offsets[voxel])
+        inside = np.all((indices >= 0) & (indices < self.shape), axis=-1)
+        voxel = np.ravel_multi_index(tuple(np.moveaxis(np.where(inside[..., None], indices, 0), -1, 0)), self.shape)
+        return inside & (self.voxel_offsets[voxel + 1] > self.voxel_offsets[voxel])
+
+    def nearest_configuration(self, point):
+        """
+        Joint angles (3,) and foot position (3,) of the sample closest to point.
+
+        Searches the point's voxel (clamped to the grid) and, if that is
+        empty, a block of voxels around it, grown one voxel at a time until
+        it holds a sample. The result is the nearest sample of that block,
+        which is within about a voxel diagonal of the true nearest sample.
+        """
+        point = np.asarray(point, dtype=float)
+        cx, cy, cz = (int(index) for index in np.clip(self._voxel_indices(point), 0, self.shape - 1))
+        nx, ny, nz = (int(size) for size in self.shape)
+        voxel = (cx * ny + cy) * nz + cz
+        start, stop = int(self.voxel_offsets[voxel]), int(self.voxel_offsets[voxel + 1])
+        if start < stop:
+            index = np.arange(start, stop)
+        else:
+            for radius in range(1, max(nx, ny, nz)):
+                low = (max(cx - radius, 0), max(cy - radius, 0), max(cz - radius, 0))
+                high = (min(cx + radius, nx - 1), min(cy + radius, ny - 1), min(cz + radius, nz - 1))
+                # Voxels along z are contiguous, so the block is one run of samples per (x, y)
+                x, y = np.meshgrid(np.arange(low[0], high[0] + 1), np.arange(low[1], high[1] + 1), indexing="ij")
+                first = (x.ravel() * ny + y.ravel()) * nz
+                starts = self.voxel_offsets[first + low[2]]
+                lengths = self.voxel_offsets[first + high[2] + 1] - starts
+                if lengths.sum() > 0:
+                    break
+            # Concatenate the runs without a Python loop
+            index = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        positions = self.positions[index]
+        best = index[np.argmin(np.sum((positions - point) ** 2, axis=-1))]
+        return np.array(self.joint_angles[best], dtype=float), np.array(self.positions[best], dtype=float)
+
+    def nearest_configurations(self, points):
+        """nearest_configuration for each of (N, 3) points; returns (N, 3) joint angles and (N, 3) positions."""
+        results = [self.nearest_configuration(point) for point in np.asarray(points, dtype=float).reshape(-1, 3)]
+        return np.array([joint_angles for joint_angles, _ in results]).reshape(-1, 3), np.array([position for _, position in results]).reshape(-1, 3)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the workspace map of a Pupper leg")
+    parser.add_argument("leg", choices=sorted(LEG_HIP_OFFSETS), help="leg to sample")
+    parser.add_argument("directory", help="directory to write the map to, e.g. workspace_leg_front_l")
+    parser.add_argument("--samples-per-joint", type=int, default=SAMPLES_PER_JOINT)
+    parser.add_argument("--voxel-size", type=float, default=VOXEL_SIZE)
+    parser.add_argument("--joint-limits", type=float, nargs=6, metavar=("LOW1", "HIGH1", "LOW2", "HIGH2", "LOW3", "HIGH3"),
+                        default=np.ravel(JOINT_LIMITS).tolist(), help="sampled range (rad) of each joint")
+    args = parser.parse_args()
+    leg_kinematics = LegKinematics(LEG_HIP_OFFSETS[args.leg], mirror=args.leg.endswith("_r"))
+    joint_limits = np.reshape(args.joint_limits, (3, 2))
+    build_workspace_map(leg_kinematics, args.directory, args.samples_per_joint, args.voxel_size, joint_limits)
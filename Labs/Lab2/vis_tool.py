@@ -1,3 +1,4 @@
+import functools
 import os
 import rerun as rr
 import numpy as np
@@ -33,21 +34,103 @@ def scene_to_trimeshes(scene: trimesh.Scene) -> list[trimesh.Trimesh]:
             trimeshes.extend(scene_to_trimeshes(geometry))
     return trimeshes
 
+@functools.lru_cache(maxsize=32)
+def _load_mesh_archetypes(mesh_file_path, mtime, alpha):
+    """
+    Parse a mesh file into one rr.Mesh3D per sub-mesh.
+
+    Cached by path + modification time (see load_mesh_archetypes), so the
+    file is only parsed again after it changes on disk.
+    """
+    mesh_or_scene = trimesh.load_mesh(mesh_file_path)
+    if isinstance(mesh_or_scene, trimesh.Scene):
+        meshes = scene_to_trimeshes(mesh_or_scene)
+    else:
+        meshes = [mesh_or_scene]
+
+    archetypes = []
+    for mesh in meshes:
+        vertex_colors = albedo_texture = vertex_texcoords = None
+        # If the mesh has vertex colors, use them. Otherwise, use the texture if it exists.
+        if isinstance(mesh.visual, trimesh.visual.color.ColorVisuals):
+            vertex_colors = mesh.visual.vertex_colors
+        elif isinstance(mesh.visual, trimesh.visual.texture.TextureVisuals):
+            trimesh_material = mesh.visual.material
+
+            if mesh.visual.uv is not None:
+                vertex_texcoords = mesh.visual.uv
+                # Trimesh uses the OpenGL convention for UV coordinates, so we need to flip the V coordinate
+                # since Rerun uses the Vulkan/Metal/DX12/WebGPU convention.
+                vertex_texcoords[:, 1] = 1.0 - vertex_texcoords[:, 1]
+
+            if isinstance(trimesh_material, trimesh.visual.material.PBRMaterial):
+                if trimesh_material.baseColorTexture is not None:
+                    albedo_texture = pil_image_to_albedo_texture(
+                        trimesh_material.baseColorTexture
+                    )
+                elif trimesh_material.baseColorFactor is not None:
+                    vertex_colors = trimesh_material.baseColorFactor
+            elif isinstance(trimesh_material, trimesh.visual.material.SimpleMaterial):
+                if trimesh_material.image is not None:
+                    albedo_texture = pil_image_to_albedo_texture(trimesh_material.image)
+                else:
+                    vertex_colors = mesh.visual.to_color().vertex_colors
+        if vertex_colors is not None:
+            vertex_colors[..., -1] = alpha
+        archetypes.append(
+            rr.Mesh3D(
+                vertex_positions=mesh.vertices,
+                triangle_indices=mesh.faces,
+                vertex_normals=mesh.vertex_normals,
+                vertex_colors=vertex_colors,
+                albedo_texture=albedo_texture,
+                vertex_texcoords=vertex_texcoords,
+            )
+        )
+    return tuple(archetypes)
+
+def load_mesh_archetypes(mesh_file_path, alpha=0.5):
+    """The (cached) rr.Mesh3D archetypes of a mesh file."""
+    return _load_mesh_archetypes(os.path.abspath(mesh_file_path), os.path.getmtime(mesh_file_path), alpha)
+
+def matrix_to_transform3d(world_T_frame):
+    """rr.Transform3D of a 4x4 (or 3x4) homogeneous transform."""
+    xyzw = R.from_matrix(world_T_frame[0:3,0:3]).as_quat()
+    quat = rr.Quaternion.identity()
+    quat.xyzw = xyzw
+    return rr.Transform3D(translation=world_T_frame[:3,-1].squeeze(), rotation=quat)
+
 def GenerateRandomColors(n):
     cmap = plt.get_cmap('tab10')  # You can change this to other palettes
     colors = [cmap(i / n) for i in range(n)]    
     rgb_colors = [(int(c[0] * 255), int(c[1] * 255), int(c[2] * 255)) for c in colors]
     return rgb_colors
 
+def matrices_to_quaternions(world_T_frames):
+    """xyzw quaternions (K, 4) of a (K, 4, 4) or (K, 3, 4) stack of transforms, in one call."""
+    world_T_frames = np.asarray(world_T_frames)
+    return R.from_matrix(world_T_frames[:, 0:3, 0:3]).as_quat()
+
+# Rows sent per rr.send_columns call by the time-series methods
+TIME_SERIES_CHUNK_SIZE = 10000
+
 class Visualizer:
-    def __init__(self, app_name="RerunVisualizer", log_time_label='logtime', spawn=True, port=9876):
+    def __init__(self, app_name="RerunVisualizer", log_time_label='logtime', spawn=True, port=9876, save_path=None):
         # Initialize Rerun session
-        if spawn == False:
+        if save_path is not None:
+            # Record to an .rrd file instead of a viewer, e.g. for offline replays
+            rr.init(app_name, spawn=False)
+            rr.save(save_path)
+        elif spawn == False:
             rr.init(app_name, spawn=False)
             rr.connect(f'127.0.0.1:{port}')
         else:
             rr.init(app_name, spawn=True)
         self.log_time_label = log_time_label
+        # Entity path -> rr.Mesh3D already logged there as static geometry
+        self.static_meshes = {}
+        # Entity path -> axis length of the static arrows logged there (None: up-axis only)
+        self.static_frames = {}
     
     def logPoints(self, points, colors=None, radii=None, log_path='/points', log_time=None):
         ps = []
@@ -58,64 +141,34 @@ class Visualizer:
         if radii is None:
             radii = [0.002] * points.shape[0]
 
-        rr.log(log_path, rr.Points3D(points, colors = colors, radii=radii))   
         if log_time is not None:
             rr.set_time_seconds(self.log_time_label, log_time)
+        rr.log(log_path, rr.Points3D(points, colors = colors, radii=radii))
     
-    def logMeshFile(self, mesh_file_path, world_T_mesh, log_path='/mesh', log_time=None, alpha=0.5):
-        mesh_or_scene = trimesh.load_mesh(mesh_file_path)
-        if isinstance(mesh_or_scene, trimesh.Scene):
-            meshes = scene_to_trimeshes(mesh_or_scene)
-        else:
-            meshes = [mesh_or_scene]
-        
-        for i, mesh in enumerate(meshes):
-            vertex_colors = albedo_texture = vertex_texcoords = None
-            # If the mesh has vertex colors, use them. Otherwise, use the texture if it exists.
-            if isinstance(mesh.visual, trimesh.visual.color.ColorVisuals):
-                vertex_colors = mesh.visual.vertex_colors
-            elif isinstance(mesh.visual, trimesh.visual.texture.TextureVisuals):
-                trimesh_material = mesh.visual.material
-
-                if mesh.visual.uv is not None:
-                    vertex_texcoords = mesh.visual.uv
-                    # Trimesh uses the OpenGL convention for UV coordinates, so we need to flip the V coordinate
-                    # since Rerun uses the Vulkan/Metal/DX12/WebGPU convention.
-                    vertex_texcoords[:, 1] = 1.0 - vertex_texcoords[:, 1]
-
-                if isinstance(trimesh_material, trimesh.visual.material.PBRMaterial):
-                    if trimesh_material.baseColorTexture is not None:
-                        albedo_texture = pil_image_to_albedo_texture(
-                            trimesh_material.baseColorTexture
-                        )
-                    elif trimesh_material.baseColorFactor is not None:
-                        vertex_colors = trimesh_material.baseColorFactor
-                elif isinstance(trimesh_material, trimesh.visual.material.SimpleMaterial):
-                    if trimesh_material.image is not None:
-                        albedo_texture = pil_image_to_albedo_texture(trimesh_material.image)
-                    else:
-                        vertex_colors = mesh.visual.to_color().vertex_colors
-            vertex_colors[:, -1] = alpha
-            rr.log(
-                f"{log_path}/{i}",
-                rr.Mesh3D(
-                    vertex_positions=mesh.vertices,
-                    triangle_indices=mesh.faces,
-                    vertex_normals=mesh.vertex_normals,
-                    vertex_colors=vertex_colors,
-                    albedo_texture=albedo_texture,
-                    vertex_texcoords=vertex_texcoords,
-                ),
-            )
-            # Transoform the mesh into its world pose
-            xyzw = R.from_matrix(world_T_mesh[0:3,0:3]).as_quat()
-            quat = rr.Quaternion.identity()
-            quat.xyzw = xyzw
-            rr.log(f"{log_path}/{i}", rr.Transform3D(translation=world_T_mesh[:3,-1].squeeze(), rotation=quat))
+    def logMeshFile(self, mesh_file_path, world_T_mesh, log_path='/mesh', log_time=None, alpha=0.5, static_geometry=False):
+        """
+        Log a mesh file at the world_T_mesh pose.
+
+        Parsed meshes are cached by path + mtime. With static_geometry=True the
+        geometry is logged once as static data per log_path and later calls
+        only log the Transform3D, which is what animating links needs.
+        """
+        archetypes = load_mesh_archetypes(mesh_file_path, alpha)
+        # Transoform the mesh into its world pose
+        transform = matrix_to_transform3d(world_T_mesh)
         if log_time is not None:
             rr.set_time_seconds(self.log_time_label, log_time)
+        for i, archetype in enumerate(archetypes):
+            if not static_geometry:
+                rr.log(f"{log_path}/{i}", archetype)
+            elif self.static_meshes.get(f"{log_path}/{i}") is not archetype:
+                rr.log(f"{log_path}/{i}", archetype, static=True)
+                self.static_meshes[f"{log_path}/{i}"] = archetype
+            rr.log(f"{log_path}/{i}", transform)
     
     def logCoordinateFrame(self, world_T_frame, log_path, axis_length=0.2, log_time=None):
+        if log_time is not None:
+            rr.set_time_seconds(self.log_time_label, log_time)
         rr.log(log_path, rr.ViewCoordinates.LEFT_HAND_Z_UP, static=True)  # Set an up-axis
         rr.log(
             f"{log_path}",
@@ -125,9 +178,97 @@ class Visualizer:
                 radii = [axis_length/30, axis_length/30, axis_length/30]
             ),
         )
-        xyzw = R.from_matrix(world_T_frame[0:3,0:3]).as_quat()
-        quat = rr.Quaternion.identity()
-        quat.xyzw = xyzw
-        rr.log(log_path, rr.Transform3D(translation=world_T_frame[:3,-1].squeeze(), rotation=quat))
+        rr.log(log_path, matrix_to_transform3d(world_T_frame))
+
+    def _logStaticAxes(self, log_path, axis_length):
+        # Axis arrows are static, so they are only (re)logged when they change
+        if self.static_frames.get(log_path) == axis_length:
+            return
+        rr.log(log_path, rr.ViewCoordinates.LEFT_HAND_Z_UP, static=True)  # Set an up-axis
+        rr.log(
+            log_path,
+            rr.Arrows3D(
+                vectors=[[axis_length, 0, 0], [0, axis_length, 0], [0, 0, axis_length]],
+                colors=[[255, 0, 0], [0, 255, 0], [0, 0, 255]],
+                radii = [axis_length/30, axis_length/30, axis_length/30]
+            ),
+            static=True,
+        )
+        self.static_frames[log_path] = axis_length
+
+    def logCoordinateFrames(self, world_T_frames, log_path='/frames', axis_length=0.2, log_time=None):
+        """
+        Log K coordinate frames as one entity, e.g. the whole kinematic tree of a tick.
+
+        world_T_frames is a (K, 4, 4) or (K, 3, 4) stack. The three axes of
+        every frame go out in a single rr.Arrows3D call: each frame's origin
+        repeated three times, and its rotation columns scaled by axis_length
+        as the arrow vectors.
+        """
+        world_T_frames = np.asarray(world_T_frames, dtype=float)
+        num_frames = len(world_T_frames)
+        if log_path not in self.static_frames:
+            rr.log(log_path, rr.ViewCoordinates.LEFT_HAND_Z_UP, static=True)  # Set an up-axis
+            self.static_frames[log_path] = None
         if log_time is not None:
-            rr.set_time_seconds(self.log_time_label, log_time)
\ No newline at end of file
+            rr.set_time_seconds(self.log_time_label, log_time)
+        rr.log(
+            log_path,
+            rr.Arrows3D(
+                origins=np.repeat(world_T_frames[:, 0:3, 3], 3, axis=0),
+                # Row 3k + j is column j (the j-th axis) of frame k
+                vectors=np.swapaxes(world_T_frames[:, 0:3, 0:3], 1, 2).reshape(-1, 3) * axis_length,
+                colors=np.tile([[255, 0, 0], [0, 255, 0], [0, 0, 255]], (num_frames, 1)),
+                radii=np.full(3 * num_frames, axis_length / 30),
+            ),
+        )
+
+    def logPointsTimeSeries(self, log_times, points, colors=None, radii=0.002, log_path='/points', chunk_size=TIME_SERIES_CHUNK_SIZE):
+        """
+        Log a whole time series of point clouds with a few rr.send_columns calls.
+
+        points is (T, P, 3), one cloud of P points per entry of log_times (T,).
+        colors / radii are shared by every time step and logged once as static
+        data; the per-step path is logPoints.
+        """
+        log_times = np.asarray(log_times, dtype=float)
+        points = np.asarray(points, dtype=np.float32).reshape(len(log_times), -1, 3)
+        if colors is None:
+            colors = [0, 255, 0]
+        rr.log(log_path, [rr.Points3D.indicator(), rr.components.ColorBatch(colors), rr.components.RadiusBatch(radii)], static=True)
+        partition_lengths = np.full(len(log_times), points.shape[1])
+        for start in range(0, len(log_times), chunk_size):
+            stop = min(start + chunk_size, len(log_times))
+            rr.send_columns(
+                log_path,
+                times=[rr.TimeSecondsColumn(self.log_time_label, log_times[start:stop])],
+                components=[
+                    rr.components.Position3DBatch(points[start:stop].reshape(-1, 3)).partition(partition_lengths[start:stop]),
+                ],
+            )
+
+    def logTransformsTimeSeries(self, log_times, world_T_frames, log_path, chunk_size=TIME_SERIES_CHUNK_SIZE, axis_length=None):
+        """
+        Log the pose of one entity over time with a few rr.send_columns calls.
+
+        world_T_frames is a (T, 4, 4) or (T, 3, 4) stack, one per entry of
+        log_times (T,). All rotations are converted to quaternions in one call.
+        With axis_length set, static axis arrows are drawn at log_path as in
+        logCoordinateFrames.
+        """
+        if axis_length is not None:
+            self._logStaticAxes(log_path, axis_length)
+        log_times = np.asarray(log_times, dtype=float)
+        world_T_frames = np.asarray(world_T_frames)
+        translations = world_T_frames[:, 0:3, 3]
+        quaternions = matrices_to_quaternions(world_T_frames)
+        for start in range(0, len(log_times), chunk_size):
+            stop = min(start + chunk_size, len(log_times))
+            rr.send_columns(
+                log_path,
+                times=[rr.TimeSecondsColumn(self.log_time_label, log_times[start:stop])],
+                components=[
+                    rr.components.Translation3DBatch(translations[start:stop]),
+                    rr.components.RotationQuatBatch(quaternions[start:stop]),
+                ],
+            )
\ No newline at end of file
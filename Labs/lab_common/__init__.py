@@ -0,0 +1,2 @@
+# Helpers shared by the lab nodes. Lab scripts run from their own directory,
+# so they add Labs/ to sys.path before importing from here.
@@ -0,0 +1,119 @@
+import time
+import numpy as np
+
+
+class LatencyRecorder:
+    """
+    Fixed-size ring buffer of durations (seconds) for hot-path callbacks.
+
+    record() is a single array store, so it can run inside timer and
+    subscription callbacks; the statistics are only computed by summary().
+    """
+
+    def __init__(self, name, capacity=1000):
+        self.name = name
+        self.samples = np.zeros(capacity)
+        self.count = 0
+
+    def record(self, duration):
+        self.samples[self.count % len(self.samples)] = duration
+        self.count += 1
+
+    def recent(self):
+        """The most recent durations, up to capacity of them, in ring order."""
+        return self.samples[: min(self.count, len(self.samples))]
+
+    def summary(self):
+        """One line with mean / p50 / p99 / max over the recent samples, in microseconds."""
+        samples = self.recent()
+        if len(samples) == 0:
+            return f"{self.name}: no samples"
+        p50, p99 = np.percentile(samples, [50, 99]) * 1e6
+        return (
+            f"{self.name}: n={self.count} mean={samples.mean() * 1e6:.1f}us "
+            f"p50={p50:.1f}us p99={p99:.1f}us max={samples.max() * 1e6:.1f}us"
+        )
+
+
+class DurationHistogram:
+    """
+    Fixed-size histogram of durations (seconds).
+
+    Bins are bin_width wide from 0 to max_duration, plus one overflow bin,
+    so record() is O(1) and the memory use does not grow with the run.
+    Percentiles are resolved to the upper edge of a bin.
+    """
+
+    def __init__(self, name, bin_width=1e-5, max_duration=0.05):
+        self.name = name
+        self.bin_width = bin_width
+        self.counts = np.zeros(int(round(max_duration / bin_width)) + 1, dtype=np.int64)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, duration):
+        self.counts[min(max(int(duration / self.bin_width), 0), len(self.counts) - 1)] += 1
+        self.count += 1
+        if duration > self.max:
+            self.max = duration
+
+    def percentiles(self, qs):
+        """Durations (seconds) below which qs percent of the samples fall."""
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        bins = np.searchsorted(np.cumsum(self.counts), np.asarray(qs) / 100 * self.count)
+        # The largest sample bounds the last bin, including the overflow bin
+        return np.minimum((bins + 1) * self.bin_width, self.max)
+
+    def summary(self):
+        """One line with p50 / p99 / p99.9 / max, in microseconds."""
+        if self.count == 0:
+            return f"{self.name}: no samples"
+        p50, p99, p999 = self.percentiles([50, 99, 99.9]) * 1e6
+        return f"{self.name}: n={self.count} p50={p50:.0f}us p99={p99:.0f}us p99.9={p999:.0f}us max={self.max * 1e6:.0f}us"
+
+
+class LoopTimingMonitor:
+    """
+    Timing of a periodic control loop.
+
+    Call start_tick() at the top of the loop and end_tick() once the command
+    is published. Three DurationHistograms are kept: the period between
+    tick starts and the execution time of each tick, both from
+    time.perf_counter(), and the age of the sensor reading the tick acted
+    on. The caller measures that age, from the reading's header stamp to
+    the node clock at the end of the tick, so it also covers the transport
+    and executor delay before the reading's callback ran.
+    """
+
+    def __init__(self, name, bin_width=1e-5, max_duration=0.05):
+        self.name = name
+        self.period = DurationHistogram("period", bin_width, max_duration)
+        self.execution = DurationHistogram("execution", bin_width, max_duration)
+        self.latency = DurationHistogram("sensor_to_command", bin_width, max_duration)
+        self._last_start = None
+
+    def start_tick(self):
+        """Record the period since the previous tick; returns the tick start time."""
+        start = time.perf_counter()
+        if self._last_start is not None:
+            self.period.record(start - self._last_start)
+        self._last_start = start
+        return start
+
+    def end_tick(self, start, sensor_age=None):
+        """Record the tick's execution time and, if given, the sensor age (seconds)."""
+        self.execution.record(time.perf_counter() - start)
+        if sensor_age is not None:
+            self.latency.record(sensor_age)
+
+    def summary(self):
+        return "\n".join(f"{self.name} {histogram.summary()}" for histogram in (self.period, self.execution, self.latency))
+
+    def save(self, filename):
+        """Dump the histograms to an .npz file (bin_width, <name>_counts and <name>_max)."""
+        arrays = {"bin_width": self.period.bin_width}
+        for histogram in (self.period, self.execution, self.latency):
+            arrays[f"{histogram.name}_counts"] = histogram.counts
+            arrays[f"{histogram.name}_max"] = histogram.max
+        np.savez(filename, **arrays)
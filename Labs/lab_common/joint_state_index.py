@@ -0,0 +1,28 @@
+import numpy as np
+
+
+class JointIndexCache:
+    """
+    Maps a fixed list of joint names to their indices in JointState.name.
+
+    The indices are resolved once and only re-resolved when a message
+    arrives with a different name list, so each callback extracts all the
+    joints of interest with one fancy-index instead of a list.index() scan
+    per joint.
+    """
+
+    def __init__(self, joint_names):
+        self.joint_names = list(joint_names)
+        self.names = None
+        self.indices = None
+
+    def update(self, names):
+        """Resolve the indices against names unless it matches the last list seen."""
+        if names != self.names:
+            self.names = list(names)
+            self.indices = np.array([self.names.index(joint) for joint in self.joint_names], dtype=np.intp)
+        return self.indices
+
+    def select(self, values):
+        """Pick the joints of interest out of msg.position / msg.velocity / msg.effort."""
+        return np.asarray(values, dtype=float)[self.indices]
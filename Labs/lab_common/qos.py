@@ -0,0 +1,11 @@
+from rclpy.qos import HistoryPolicy, QoSProfile, ReliabilityPolicy
+
+# QoS profiles for joint_states subscribers, selected by name (e.g. from a
+# joint_states_qos parameter). sensor_data only keeps the newest sample and
+# never waits for retransmits, which is all a periodic FK / control loop needs.
+JOINT_STATES_QOS = {
+    "default": QoSProfile(depth=10),
+    "sensor_data": QoSProfile(reliability=ReliabilityPolicy.BEST_EFFORT, history=HistoryPolicy.KEEP_LAST, depth=1),
+}
+# Default of the joint_states_qos parameters, the same as lab_2.launch.py's
+DEFAULT_JOINT_STATES_QOS = "sensor_data"
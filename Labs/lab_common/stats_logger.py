@@ -0,0 +1,66 @@
+import threading
+import time
+import numpy as np
+
+
+class ThrottledStatsLogger:
+    """
+    Hot-path logging for timer callbacks.
+
+    record() only stores one row of values in a preallocated ring buffer. A
+    background thread wakes up every period, summarises the rows recorded
+    since its last report (rate and min / max / mean per field) and hands
+    one formatted line to emit, so string formatting and console I/O never
+    run on the executor thread.
+
+    The rate counts every row recorded in the period. The min / max / mean
+    only cover the last capacity rows; older rows are overwritten, and the
+    summary reports how many were.
+    """
+
+    def __init__(self, name, field_names, emit=print, period=1.0, capacity=1024):
+        self.name = name
+        self.field_names = list(field_names)
+        self.emit = emit
+        self.period = period
+        self.samples = np.zeros((capacity, len(self.field_names)))
+        self.count = 0
+        self._reported_count = 0
+        self._reported_time = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{name}_stats", daemon=True)
+        self._thread.start()
+
+    def record(self, *values):
+        """Store the latest values, in field_names order."""
+        self.samples[self.count % len(self.samples)] = values
+        self.count += 1
+
+    def summary(self):
+        """One line summarising the rows recorded since the previous summary."""
+        now = time.monotonic()
+        count = self.count
+        num_recorded = count - self._reported_count
+        # Only the newest capacity rows are still in the ring buffer
+        num_rows = min(num_recorded, len(self.samples))
+        elapsed = now - self._reported_time
+        self._reported_count = count
+        self._reported_time = now
+        if num_rows == 0:
+            return f"{self.name}: no samples"
+        rows = self.samples[np.arange(count - num_rows, count) % len(self.samples)]
+        fields = " ".join(
+            f"{field_name}[min={low:.3f} max={high:.3f} mean={mean:.3f}]"
+            for field_name, low, high, mean in zip(self.field_names, rows.min(axis=0), rows.max(axis=0), rows.mean(axis=0))
+        )
+        overwritten = f" overwritten={num_recorded - num_rows}" if num_recorded > num_rows else ""
+        return f"{self.name}: rate={num_recorded / elapsed:.1f}Hz{overwritten} {fields}"
+
+    def close(self):
+        """Stop the reporting thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.period):
+            self.emit(self.summary())